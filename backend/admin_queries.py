@@ -0,0 +1,217 @@
+"""
+Admin Applicant Queries for HICRA
+One outer-joined, column-projected users x applicant_profiles query with
+server-side filters, index-backed sort keys and keyset pagination, shared by
+the admin table and exports.
+
+A cursor is the (sort value, user id) of the last row of a page, so the next
+page is a range scan on the matching composite index instead of an OFFSET
+that re-reads every skipped row.
+"""
+
+import base64
+import json
+import math
+
+from sqlalchemy import select, func, and_, or_
+
+from models_db import User, ApplicantProfile
+
+# sort key -> column; each has a composite (column, user_id / id) index
+SORT_COLUMNS = {
+    "id": User.id,
+    "name": User.name,
+    "income": ApplicantProfile.annual_income,
+    "loan": ApplicantProfile.loan_amount,
+    "risk": ApplicantProfile.risk_score,
+}
+DEFAULT_ORDER = {"id": "asc", "name": "asc", "income": "desc", "loan": "desc", "risk": "desc"}
+# sort key -> JSON types a cursor's sort value may have (None: NULL sorts last)
+CURSOR_VALUE_TYPES = {"id": (int,), "name": (str,), "income": (int, float), "loan": (int, float), "risk": (int, float)}
+MAX_ID = 2 ** 63 - 1
+
+RISK_BANDS = ("low", "medium", "high")
+
+COLUMNS = (
+    User.id,
+    User.name,
+    User.email,
+    ApplicantProfile.id.label("profile_id"),
+    ApplicantProfile.annual_income,
+    ApplicantProfile.loan_amount,
+    ApplicantProfile.length_of_credit_history,
+    ApplicantProfile.debt_to_income_ratio,
+    ApplicantProfile.employment_status,
+    ApplicantProfile.risk_score,
+    ApplicantProfile.age,
+    ApplicantProfile.number_of_open_credit_lines,
+)
+
+
+class InvalidQuery(ValueError):
+    """Raised for unknown sort keys, risk bands or malformed cursors."""
+
+
+def encode_cursor(value, user_id):
+    return base64.urlsafe_b64encode(json.dumps([value, user_id]).encode()).rstrip(b"=").decode("ascii")
+
+
+def _reject_constant(name):
+    raise ValueError(f"{name} is not a valid cursor value")
+
+
+def decode_cursor(cursor, value_types=(str, int, float)):
+    """
+    Return (value, id) from an encode_cursor() string. The payload must be a
+    two-element list of a scalar (None or one of value_types) and an integer
+    id; anything else raises InvalidQuery rather than reaching the query.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)),
+                             parse_constant=_reject_constant)
+    except (ValueError, TypeError):
+        raise InvalidQuery("Malformed cursor")
+    if not isinstance(payload, list) or len(payload) != 2:
+        raise InvalidQuery("Malformed cursor")
+
+    value, user_id = payload
+    # bool is an int subclass but never a valid sort value or id
+    if isinstance(value, bool) or not (value is None or isinstance(value, value_types)):
+        raise InvalidQuery("Malformed cursor")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise InvalidQuery("Malformed cursor")
+    if isinstance(user_id, bool) or not isinstance(user_id, int) or not 0 <= user_id <= MAX_ID:
+        raise InvalidQuery("Malformed cursor")
+    return value, user_id
+
+
+def risk_band_condition(band):
+    """Same bands as the dashboard: <40 low, <70 medium, else high (no score counts as medium)."""
+    score = ApplicantProfile.risk_score
+    if band == "low":
+        return score < 40
+    if band == "medium":
+        return or_(and_(score >= 40, score < 70), score.is_(None))
+    if band == "high":
+        return score >= 70
+    raise InvalidQuery(f"Unknown risk band '{band}' (expected one of {', '.join(RISK_BANDS)})")
+
+
+def filter_conditions(risk=None, employment=None, min_income=None, max_income=None, search=None):
+    conditions = [User.role == "user"]
+    if risk:
+        conditions.append(risk_band_condition(risk))
+    if employment:
+        conditions.append(ApplicantProfile.employment_status == employment)
+    if min_income is not None:
+        conditions.append(ApplicantProfile.annual_income >= min_income)
+    if max_income is not None:
+        conditions.append(ApplicantProfile.annual_income <= max_income)
+    if search:
+        conditions.append(or_(
+            User.name.contains(search, autoescape=True),
+            User.email.contains(search, autoescape=True)
+        ))
+    return conditions
+
+
+def _after(column, descending, value, user_id):
+    """
+    Rows strictly after (value, user_id) in (column, User.id) order.
+    NULLs sort first ascending and last descending, as in both MySQL and SQLite.
+    """
+    if descending:
+        if value is None:
+            return and_(column.is_(None), User.id < user_id)
+        return or_(column < value, and_(column == value, User.id < user_id), column.is_(None))
+    if value is None:
+        return or_(and_(column.is_(None), User.id > user_id), column.is_not(None))
+    return or_(column > value, and_(column == value, User.id > user_id))
+
+
+def applicants_query(filters, sort="name", order=None, cursor=None, limit=None):
+    """
+    Build the projected SELECT for one page (or, without limit, the whole
+    filtered set in order). Returns (statement, sort key name).
+    """
+    if sort not in SORT_COLUMNS:
+        raise InvalidQuery(f"Unknown sort key '{sort}' (expected one of {', '.join(SORT_COLUMNS)})")
+    order = order or DEFAULT_ORDER[sort]
+    if order not in ("asc", "desc"):
+        raise InvalidQuery("order must be 'asc' or 'desc'")
+    column = SORT_COLUMNS[sort]
+    descending = order == "desc"
+
+    conditions = list(filters)
+    if cursor:
+        value, user_id = decode_cursor(cursor, CURSOR_VALUE_TYPES[sort])
+        if column is User.id:
+            conditions.append(User.id < user_id if descending else User.id > user_id)
+        else:
+            conditions.append(_after(column, descending, value, user_id))
+
+    if column is User.id:
+        order_by = (User.id.desc() if descending else User.id.asc(),)
+    else:
+        order_by = (column.desc(), User.id.desc()) if descending else (column.asc(), User.id.asc())
+
+    statement = (
+        select(*COLUMNS)
+        .outerjoin(ApplicantProfile, ApplicantProfile.user_id == User.id)
+        .where(*conditions)
+        .order_by(*order_by)
+    )
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement, sort
+
+
+def count_query(filters):
+    return (
+        select(func.count(User.id))
+        .outerjoin(ApplicantProfile, ApplicantProfile.user_id == User.id)
+        .where(*filters)
+    )
+
+
+def sort_value(row, sort):
+    return {
+        "id": row.id,
+        "name": row.name,
+        "income": row.annual_income,
+        "loan": row.loan_amount,
+        "risk": row.risk_score,
+    }[sort]
+
+
+def row_to_dict(row):
+    """Admin table row, in the shape the dashboard has always received."""
+    if row.profile_id is None:
+        # User without profile
+        return {
+            "id": row.id,
+            "user_id": row.id,
+            "name": row.name,
+            "email": row.email,
+            "AnnualIncome": 0,
+            "LoanAmount": 0,
+            "LengthOfCreditHistory": 0,
+            "DebtToIncomeRatio": 0,
+            "EmploymentStatus": "Unknown",
+            "RiskScore": 50,
+            "Age": 0
+        }
+    return {
+        "id": row.id,
+        "user_id": row.id,
+        "name": row.name,
+        "email": row.email,
+        "AnnualIncome": row.annual_income,
+        "LoanAmount": row.loan_amount,
+        "LengthOfCreditHistory": row.length_of_credit_history,
+        "DebtToIncomeRatio": row.debt_to_income_ratio,
+        "EmploymentStatus": row.employment_status,
+        "RiskScore": row.risk_score,
+        "Age": row.age,
+        "NumberOfOpenCreditLines": row.number_of_open_credit_lines
+    }
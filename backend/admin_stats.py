@@ -0,0 +1,142 @@
+"""
+Admin Dashboard Statistics for HICRA
+/admin/stats reads one pre-aggregated row (admin_stats_summary) instead of
+scanning users, applicant_profiles and predictions on every dashboard load.
+
+- Writers (register, add-applicant, user delete, prediction inserts) adjust
+  the row with `column = column + delta` in their own transaction.
+- reconcile() recounts everything in a single conditional-aggregation query
+  and overwrites the row; it runs at startup and periodically to correct
+  drift from writes that bypass the API (seed_database.py, manual SQL).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select, update, func, case
+
+from models_db import User, ApplicantProfile, Prediction, AdminStatsSummary
+
+SUMMARY_ID = 1
+
+COUNTERS = (
+    "total_users", "total_profiles", "total_predictions",
+    "income_sum", "income_count", "loan_sum", "loan_count",
+    "low_risk", "medium_risk", "high_risk",
+)
+
+
+def risk_band(risk_score):
+    if risk_score is None:
+        return None
+    if risk_score < 40:
+        return "low_risk"
+    if risk_score < 70:
+        return "medium_risk"
+    return "high_risk"
+
+
+def profile_delta(annual_income, loan_amount, risk_score, sign=1):
+    """Counter changes for adding (sign=1) or removing (sign=-1) one profile."""
+    delta = {"total_profiles": sign}
+    if annual_income is not None:
+        delta["income_sum"] = sign * annual_income
+        delta["income_count"] = sign
+    if loan_amount is not None:
+        delta["loan_sum"] = sign * loan_amount
+        delta["loan_count"] = sign
+    band = risk_band(risk_score)
+    if band is not None:
+        delta[band] = sign
+    return delta
+
+
+def increment(**deltas):
+    """
+    UPDATE statement applying counter deltas atomically in the database, so
+    concurrent workers never overwrite each other. A missing row is left
+    alone; the next read or reconciliation builds it from a full count.
+    """
+    columns = AdminStatsSummary.__table__.c
+    return (
+        update(AdminStatsSummary)
+        .where(AdminStatsSummary.id == SUMMARY_ID)
+        .values({name: columns[name] + value for name, value in deltas.items() if value})
+    )
+
+
+def full_count_statement():
+    """Every counter in one pass over applicant_profiles (users/predictions as scalar subqueries)."""
+    score = ApplicantProfile.risk_score
+    return select(
+        select(func.count()).select_from(User).where(User.role == "user").scalar_subquery().label("total_users"),
+        func.count(ApplicantProfile.id).label("total_profiles"),
+        select(func.count()).select_from(Prediction).scalar_subquery().label("total_predictions"),
+        func.coalesce(func.sum(ApplicantProfile.annual_income), 0).label("income_sum"),
+        func.count(ApplicantProfile.annual_income).label("income_count"),
+        func.coalesce(func.sum(ApplicantProfile.loan_amount), 0).label("loan_sum"),
+        func.count(ApplicantProfile.loan_amount).label("loan_count"),
+        func.coalesce(func.sum(case((score < 40, 1), else_=0)), 0).label("low_risk"),
+        func.coalesce(func.sum(case(((score >= 40) & (score < 70), 1), else_=0)), 0).label("medium_risk"),
+        func.coalesce(func.sum(case((score >= 70, 1), else_=0)), 0).label("high_risk"),
+    ).select_from(ApplicantProfile)
+
+
+def _counted(row):
+    return {name: (float(row[name]) if name.endswith("_sum") else int(row[name])) for name in COUNTERS}
+
+
+def reconcile(db):
+    """
+    Recount from the base tables and overwrite the summary row (sync Session).
+    Returns {counter: (stored, actual)} for every counter that had drifted.
+    """
+    actual = _counted(db.execute(full_count_statement()).mappings().one())
+    summary = db.get(AdminStatsSummary, SUMMARY_ID)
+    if summary is None:
+        summary = AdminStatsSummary(id=SUMMARY_ID)
+        db.add(summary)
+        drift = {}
+    else:
+        drift = {
+            name: (getattr(summary, name), value)
+            for name, value in actual.items()
+            if abs((getattr(summary, name) or 0) - value) > 1e-6 * max(1.0, abs(value))
+        }
+    for name, value in actual.items():
+        setattr(summary, name, value)
+    summary.reconciled_at = datetime.utcnow()
+    db.commit()
+    return drift
+
+
+async def read_summary(db):
+    """The summary row as a dict, or None before the first reconciliation."""
+    row = (await db.execute(
+        select(*[AdminStatsSummary.__table__.c[name] for name in COUNTERS], AdminStatsSummary.reconciled_at)
+        .where(AdminStatsSummary.id == SUMMARY_ID)
+    )).mappings().first()
+    return dict(row) if row is not None else None
+
+
+async def count_now(db):
+    """Full single-pass count, for when no summary row exists yet."""
+    return _counted((await db.execute(full_count_statement())).mappings().one())
+
+
+def to_response(counters):
+    """The /admin/stats response shape the dashboard expects."""
+    income_count = counters["income_count"]
+    loan_count = counters["loan_count"]
+    return {
+        "total_users": counters["total_users"],
+        "total_profiles": counters["total_profiles"],
+        "total_predictions": counters["total_predictions"],
+        "avg_income": round(counters["income_sum"] / income_count, 2) if income_count else 0.0,
+        "avg_loan": round(counters["loan_sum"] / loan_count, 2) if loan_count else 0.0,
+        "risk_distribution": {
+            "low": counters["low_risk"],
+            "medium": counters["medium_risk"],
+            "high": counters["high_risk"]
+        },
+        "reconciled_at": counters["reconciled_at"].isoformat() if counters.get("reconciled_at") else None
+    }
@@ -0,0 +1,148 @@
+"""
+Flat Model Artifact Format for HICRA
+A single versioned file holding every array the NumPy engine scores with
+(tree structure, scaler statistics, MLP weights), so workers can memory-map
+it read-only instead of unpickling sklearn estimators.
+
+Layout:
+    8 bytes   magic b"HICRAMDL"
+    8 bytes   little-endian uint64 header length
+    N bytes   JSON header (format version, array table, metadata, checksum)
+    padding   to a 64-byte boundary
+    data      raw little-endian arrays, each starting on a 64-byte boundary
+"""
+
+import hashlib
+import json
+import os
+import struct
+from datetime import datetime
+
+import numpy as np
+
+ARTIFACT_FILE = "hicra_model.bin"
+ARTIFACT_MAGIC = b"HICRAMDL"
+ARTIFACT_FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+
+class ArtifactError(Exception):
+    """Raised when an artifact is missing, corrupt or from an unknown format version."""
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def engine_arrays(engine):
+    """Collect the arrays of a NumpyInferenceEngine under stable artifact names."""
+    arrays = {
+        "tree_feature": engine.feature,
+        "tree_threshold": engine.threshold,
+        "tree_children_left": engine.children_left,
+        "tree_children_right": engine.children_right,
+        "tree_value": engine.value,
+        "classes": engine.classes,
+        "feature_importances": engine.feature_importances,
+        "scaler_mean": engine.scaler_mean,
+        "scaler_scale": engine.scaler_scale,
+    }
+    for i, (coef, intercept) in enumerate(zip(engine.coefs, engine.intercepts)):
+        arrays[f"nn_coef_{i}"] = coef
+        arrays[f"nn_intercept_{i}"] = intercept
+    return arrays
+
+
+def engine_kwargs(arrays):
+    """Inverse of engine_arrays(): keyword arguments for NumpyInferenceEngine."""
+    n_layers = sum(1 for name in arrays if name.startswith("nn_coef_"))
+    return {
+        "feature": arrays["tree_feature"],
+        "threshold": arrays["tree_threshold"],
+        "children_left": arrays["tree_children_left"],
+        "children_right": arrays["tree_children_right"],
+        "value": arrays["tree_value"],
+        "classes": arrays["classes"],
+        "feature_importances": arrays["feature_importances"],
+        "scaler_mean": arrays["scaler_mean"],
+        "scaler_scale": arrays["scaler_scale"],
+        "coefs": [arrays[f"nn_coef_{i}"] for i in range(n_layers)],
+        "intercepts": [arrays[f"nn_intercept_{i}"] for i in range(n_layers)],
+    }
+
+
+def write_artifact(path, arrays, metadata=None):
+    """
+    Write arrays + metadata to `path` atomically.
+    The header records a sha256 checksum of the data section.
+    """
+    table = {}
+    offset = 0
+    blobs = []
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        # Store everything little-endian so the file is portable
+        array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+        offset = _align(offset)
+        table[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        blobs.append((offset, array.tobytes()))
+        offset += array.nbytes
+
+    data = bytearray(_align(offset))
+    for start, blob in blobs:
+        data[start:start + len(blob)] = blob
+
+    header = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "arrays": table,
+        "metadata": metadata or {},
+        "checksum": {"algorithm": "sha256", "value": hashlib.sha256(data).hexdigest()},
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    prefix_len = len(ARTIFACT_MAGIC) + 8 + len(header_bytes)
+    padding = b"\0" * (_align(prefix_len) - prefix_len)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(ARTIFACT_MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(padding)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_artifact(path, verify=True):
+    """
+    Memory-map an artifact read-only.
+    Returns (arrays, header); arrays are zero-copy views into the shared mapping,
+    so every worker process on the host uses the same physical pages.
+    """
+    if not os.path.exists(path):
+        raise ArtifactError(f"Artifact not found: {path}")
+
+    try:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(buffer[:len(ARTIFACT_MAGIC)]) != ARTIFACT_MAGIC:
+            raise ArtifactError(f"{path} is not a HICRA model artifact")
+
+        header_start = len(ARTIFACT_MAGIC) + 8
+        (header_len,) = struct.unpack("<Q", bytes(buffer[len(ARTIFACT_MAGIC):header_start]))
+        header = json.loads(bytes(buffer[header_start:header_start + header_len]).decode("utf-8"))
+        if header.get("format_version") != ARTIFACT_FORMAT_VERSION:
+            raise ArtifactError(f"Unsupported artifact format version: {header.get('format_version')}")
+
+        data = buffer[_align(header_start + header_len):]
+        if verify and hashlib.sha256(data).hexdigest() != header["checksum"]["value"]:
+            raise ArtifactError(f"Checksum mismatch in {path}")
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=spec["offset"]).reshape(spec["shape"])
+    except (struct.error, ValueError, KeyError, TypeError, AttributeError) as e:
+        # Truncated or corrupt header/sections (JSONDecodeError is a ValueError)
+        raise ArtifactError(f"Corrupt artifact {path}: {e!r}")
+    return arrays, header
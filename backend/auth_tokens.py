@@ -0,0 +1,163 @@
+"""
+Signed Session Tokens for HICRA
+/login issues a stateless token carrying the user id, role and signing key
+id, HMAC-SHA256 signed and with an expiry. Requests are authenticated in
+process: no users-table lookup, just a signature check plus an in-memory
+revocation set that is refreshed from the revoked_tokens table.
+
+Token format:
+    base64url(json payload) "." base64url(hmac_sha256(key[kid], payload part))
+
+Key rotation: AUTH_SIGNING_KEYS lists "kid:secret" pairs. The first key signs
+new tokens and every listed key is accepted for verification, so prepend a
+new key and drop the old one once AUTH_TOKEN_TTL_SECONDS has passed.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+from models_db import RevokedToken
+
+
+class TokenError(Exception):
+    """Raised for malformed, forged, expired or revoked tokens."""
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def parse_keys(spec):
+    """'kid1:secret1,kid2:secret2' -> ordered {kid: secret bytes} (first one signs)."""
+    keys = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        kid, sep, secret = item.partition(":")
+        if not sep or not kid or not secret:
+            raise ValueError(f"Invalid signing key entry '{kid}' (expected kid:secret)")
+        keys[kid] = secret.encode()
+    return keys
+
+
+class TokenSigner:
+    """
+    keys: ordered {kid: secret}; the first key signs, all of them verify.
+    ttl_seconds: lifetime of issued tokens.
+    """
+
+    def __init__(self, keys=None, ttl_seconds=8 * 3600):
+        if not keys:
+            # Fine for a single dev worker; tokens die with the process
+            print("⚠️  AUTH_SIGNING_KEYS not set, using an ephemeral signing key")
+            keys = {"ephemeral": secrets.token_bytes(32)}
+        self.keys = dict(keys)
+        self.active_kid = next(iter(self.keys))
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._revoked_jtis = set()
+        self._revoked_users = {}  # user_id -> revoked-at timestamp; older tokens are invalid
+        self.revocations_refreshed_at = None
+
+    def issue(self, user_id, role):
+        now = int(time.time())
+        claims = {
+            "sub": user_id,
+            "role": role,
+            "kid": self.active_kid,
+            "iat": now,
+            "exp": now + self.ttl_seconds,
+            "jti": secrets.token_hex(8),
+        }
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{payload}.{self._sign(self.active_kid, payload)}", claims
+
+    def _sign(self, kid, payload):
+        return _b64encode(hmac.new(self.keys[kid], payload.encode("ascii"), hashlib.sha256).digest())
+
+    def verify(self, token):
+        """Return the claims of a valid token or raise TokenError."""
+        payload, sep, signature = (token or "").partition(".")
+        if not sep:
+            raise TokenError("Malformed token")
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            raise TokenError("Malformed token")
+        if not isinstance(claims, dict) or claims.get("kid") not in self.keys:
+            raise TokenError("Unknown signing key")
+        expected = self._sign(claims["kid"], payload).encode("ascii")
+        # compare bytes: compare_digest rejects non-ASCII str with TypeError
+        if not hmac.compare_digest(signature.encode("utf-8", "surrogatepass"), expected):
+            raise TokenError("Invalid token signature")
+        if claims.get("exp", 0) < time.time():
+            raise TokenError("Token expired")
+        if self.is_revoked(claims):
+            raise TokenError("Token revoked")
+        return claims
+
+    # ============ Revocation ============
+
+    def is_revoked(self, claims):
+        if claims["jti"] in self._revoked_jtis:
+            return True
+        revoked_at = self._revoked_users.get(claims["sub"])
+        return revoked_at is not None and claims["iat"] <= revoked_at
+
+    def revoke(self, claims):
+        """Revoke one token in this worker now; returns the row that makes it stick everywhere."""
+        with self._lock:
+            self._revoked_jtis.add(claims["jti"])
+        return RevokedToken(
+            jti=claims["jti"],
+            user_id=claims["sub"],
+            expires_at=datetime.utcfromtimestamp(claims["exp"])
+        )
+
+    def revoke_user(self, user_id):
+        """Revoke every token issued to `user_id` so far (account deleted or disabled)."""
+        now = int(time.time()) + 1  # iat has second resolution
+        with self._lock:
+            self._revoked_users[user_id] = now
+        return RevokedToken(
+            user_id=user_id,
+            revoked_at=datetime.utcfromtimestamp(now),
+            expires_at=datetime.utcfromtimestamp(now + self.ttl_seconds)
+        )
+
+    def refresh_revocations(self, db):
+        """Reload the unexpired revocations (other workers' logouts included)."""
+        rows = db.query(RevokedToken.jti, RevokedToken.user_id, RevokedToken.revoked_at).filter(
+            RevokedToken.expires_at > datetime.utcnow()
+        ).all()
+        jtis, users = set(), {}
+        for jti, user_id, revoked_at in rows:
+            if jti is not None:
+                jtis.add(jti)
+            elif user_id is not None:
+                users[user_id] = max(users.get(user_id, 0), int(revoked_at.replace(tzinfo=timezone.utc).timestamp()))
+        with self._lock:
+            self._revoked_jtis = jtis
+            self._revoked_users = users
+        self.revocations_refreshed_at = time.time()
+
+    def stats(self):
+        return {
+            "active_kid": self.active_kid,
+            "kids": list(self.keys),
+            "ttl_seconds": self.ttl_seconds,
+            "revoked_tokens": len(self._revoked_jtis),
+            "revoked_users": len(self._revoked_users),
+            "revocations_refreshed_at": self.revocations_refreshed_at,
+        }
@@ -0,0 +1,172 @@
+"""
+Async Micro-Batching for HICRA
+Single-row /predict calls that arrive within a short window (or until the
+batch is full) are scored together in one vectorized
+HybridModel.predict_and_explain_batch call, and each waiting request gets
+its own result back. Scoring runs on one dedicated thread, so the event loop
+keeps collecting the next batch while the current one is scored.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """Fixed-bucket histogram: observations counted per upper bound (not cumulative)."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self):
+        labels = [f"<={bound}" for bound in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+        }
+
+
+class MicroBatcher:
+    """
+    Collects (model, input) pairs on the event loop and scores them in batches.
+    window_ms: how long the first request of a batch may wait for company.
+    max_batch_size: dispatch immediately once this many requests are waiting.
+    """
+
+    def __init__(self, window_ms=2.0, max_batch_size=64):
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self.batches = 0
+        self.fallbacks = 0
+        self._pending = []  # (model, input_data, future, enqueued_at)
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict-batch")
+
+    async def submit(self, hm, input_data):
+        """Queue one input for `hm` and wait for its predict_and_explain result."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._start(loop)
+
+        future = loop.create_future()
+        self._pending.append((hm, input_data, future, time.perf_counter()))
+        if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+            self._wakeup.set()
+        return await future
+
+    def _start(self, loop):
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._pending:
+                continue
+
+            # Give the first waiting request up to window_ms to gather company
+            deadline = self._pending[0][3] + self.window_ms / 1000
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                self._wakeup.clear()
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            if self._pending:
+                self._wakeup.set()
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        now = time.perf_counter()
+        self.batches += 1
+        self.batch_sizes.observe(len(batch))
+        for _, _, _, enqueued_at in batch:
+            self.queue_wait_ms.observe((now - enqueued_at) * 1000)
+
+        # Requests can straddle a model hot-swap; score each model's rows with that model
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+
+        for items in groups.values():
+            hm = items[0][0]
+            rows = [item[1] for item in items]
+            try:
+                results = await self._loop.run_in_executor(self._executor, hm.predict_and_explain_batch, rows)
+            except Exception:
+                # One bad row must not fail its neighbours: score them one by one
+                self.fallbacks += 1
+                results = []
+                for row in rows:
+                    try:
+                        results.append(await self._loop.run_in_executor(self._executor, hm.predict_and_explain, row))
+                    except Exception as e:
+                        results.append(e)
+
+            for (_, _, future, _), result in zip(items, results):
+                if future.done():
+                    continue  # client went away
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def close(self):
+        """Stop the dispatcher task (on application shutdown)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self):
+        return {
+            "enabled": True,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
+
+    def reset_stats(self):
+        self.batches = 0
+        self.fallbacks = 0
+        self.batch_sizes.reset()
+        self.queue_wait_ms.reset()
@@ -0,0 +1,368 @@
+"""
+Benchmarks for HICRA
+Usage:
+    python benchmark.py tree        # decision-tree scoring: sklearn vs NumPy walk vs compiled
+    python benchmark.py nn          # MLP batch throughput per precision (float64/float32/int8)
+    python benchmark.py generator   # synthetic data generation rows/sec (1e4, 1e6, 1e7 rows)
+    python benchmark.py batching    # concurrent single-row requests: threadpool vs micro-batching
+    python benchmark.py db          # DB endpoints under concurrency: DATABASE_MODE=sync vs async
+"""
+
+import argparse
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+
+def _timeit(fn, repeat=5):
+    """Best-of-N wall-clock time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _random_rows(hm, n_samples, seed):
+    """Boundary-stressed encoded inputs for a loaded model, from its engine's tree arrays."""
+    from tree_compiler import random_inputs
+
+    return random_inputs(hm._numpy_engine, n_samples, seed=seed)
+
+
+def bench_tree(model_dir="models", n_single=2000, n_batch=100000):
+    from inference import NumpyInferenceEngine
+    from tree_compiler import compile_tree, random_inputs, verify_parity, COMPILED_TREE_FILE
+
+    dt_model = joblib.load(os.path.join(model_dir, "dt_model.pkl"))
+    scaler = joblib.load(os.path.join(model_dir, "scaler.pkl"))
+    nn_model = joblib.load(os.path.join(model_dir, "nn_model.pkl"))
+
+    walk_engine = NumpyInferenceEngine.from_sklearn(dt_model, scaler, nn_model)
+    compiled_engine = NumpyInferenceEngine.from_sklearn(dt_model, scaler, nn_model)
+    compiled = compile_tree(
+        walk_engine.feature, walk_engine.threshold, walk_engine.children_left, walk_engine.children_right,
+        os.path.join(model_dir, COMPILED_TREE_FILE)
+    )
+    compiled_engine.use_compiled_tree(compiled)
+
+    print(f"📊 Parity: {verify_parity(dt_model, compiled, n_samples=20000)}")
+
+    X = random_inputs(dt_model.tree_, n_batch, seed=1)
+    rows = [X[i:i + 1] for i in range(n_single)]
+
+    print(f"\n🌳 Single-row leaf lookup ({n_single} rows, µs/row)")
+    single = {
+        "sklearn apply": lambda: [dt_model.apply(r) for r in rows],
+        "numpy walk": lambda: [walk_engine.apply(r) for r in rows],
+        "compiled": lambda: [compiled_engine.apply(r) for r in rows],
+    }
+    for name, fn in single.items():
+        print(f"   {name:<16} {_timeit(fn, repeat=3) / n_single * 1e6:10.2f}")
+
+    print(f"\n🌲 Batch leaf lookup ({n_batch} rows, rows/sec)")
+    batch = {
+        "sklearn apply": lambda: dt_model.apply(X),
+        "numpy walk": lambda: walk_engine.apply_batch(X),
+        "compiled": lambda: compiled_engine.apply_batch(X),
+    }
+    for name, fn in batch.items():
+        print(f"   {name:<16} {n_batch / _timeit(fn):14,.0f}")
+
+
+def bench_nn(model_dir="models", n_batch=100000):
+    from inference import quantize_mlp
+    from model import HybridModel
+
+    hm = HybridModel(model_dir=model_dir, engine="numpy")
+    hm.load()
+    X = _random_rows(hm, n_batch, seed=2)
+
+    # Quantize in memory: export_quantized_nn() would overwrite the serving nn_*.npz files
+    engine = hm._numpy_engine
+    reference = np.argmax(engine.nn_predict_proba_float64(X), axis=1)
+    print(f"🧠 MLP forward pass ({n_batch} rows, rows/sec)")
+    for precision in ("float64", "float32", "int8"):
+        if precision == "float64":
+            engine.use_nn_weights(None)
+        else:
+            engine.use_nn_weights(quantize_mlp(engine.coefs, engine.intercepts, precision))
+            agreement = float(np.mean(np.argmax(engine.nn_predict_proba(X), axis=1) == reference))
+            print(f"   {precision} agreement with float64: {agreement:.4f}")
+        print(f"   {precision:<10} {n_batch / _timeit(lambda: engine.nn_predict_proba(X)):14,.0f}")
+    engine.use_nn_weights(None)
+
+
+def _legacy_generate(n_samples, seed=42):
+    """The original row-wise generator (DataFrame.apply labelling), for comparison."""
+    import pandas as pd
+
+    np.random.seed(seed)
+    data = pd.DataFrame({
+        'age': np.random.randint(18, 70, n_samples),
+        'income': np.random.normal(50000, 15000, n_samples).astype(int),
+        'credit_history_length': np.random.randint(0, 20, n_samples),
+        'existing_loans': np.random.randint(0, 5, n_samples),
+        'debt_to_income_ratio': np.random.uniform(0.1, 0.9, n_samples),
+        'loan_amount': np.random.randint(1000, 50000, n_samples),
+        'repayment_duration': np.random.randint(6, 60, n_samples),
+        'employment_type': np.random.choice(['employed', 'self-employed', 'unemployed'], n_samples)
+    })
+
+    def assign_risk(row):
+        risk_score = 0
+        if row['income'] < 30000: risk_score += 2
+        if row['debt_to_income_ratio'] > 0.5: risk_score += 2
+        if row['employment_type'] == 'unemployed': risk_score += 3
+        if row['credit_history_length'] < 2: risk_score += 1
+        if row['age'] < 22: risk_score += 1
+        if risk_score <= 1: return 0
+        elif risk_score <= 3: return 1
+        else: return 2
+
+    data['risk_classification'] = data.apply(assign_risk, axis=1)
+    return data
+
+
+def bench_generator(sizes=(10_000, 1_000_000, 10_000_000), chunk_size=100000, legacy_max=100_000):
+    from model import HybridModel
+
+    hm = HybridModel()
+    check = hm.generate_synthetic_data(1000, seed=42)
+    print(f"📊 Matches original generator (n=1000, seed=42): {check.equals(_legacy_generate(1000))}")
+
+    print(f"\n🧪 Synthetic data generation (rows/sec, chunk size {chunk_size:,})")
+    print(f"   {'rows':>12} {'legacy apply':>14} {'vectorized':>14} {'chunked arrays':>16}")
+    for n in sizes:
+        repeat = 3 if n <= 1_000_000 else 1
+        legacy = f"{n / _timeit(lambda: _legacy_generate(n), repeat=1):14,.0f}" if n <= legacy_max else f"{'-':>14}"
+        vectorized = n / _timeit(lambda: hm.generate_synthetic_data(n), repeat=repeat)
+        chunked = n / _timeit(lambda: hm._synthetic_training_arrays(n, chunk_size), repeat=repeat)
+        print(f"   {n:>12,} {legacy} {vectorized:14,.0f} {chunked:16,.0f}")
+
+
+def bench_batching(model_dir="models", n_requests=5000, concurrency=200, window_ms=2.0, max_batch_size=64):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from batching import MicroBatcher
+    from inference import FEATURE_ORDER
+    from model import HybridModel
+
+    hm = HybridModel(model_dir=model_dir, engine="numpy")
+    hm.load()
+    hm.cache = None  # measure model calls, not cache hits
+    X = _random_rows(hm, n_requests, seed=4)
+    employment = ["employed", "self-employed", "unemployed"]
+    rows = [
+        {**dict(zip(FEATURE_ORDER[:-1], map(float, row[:-1]))), "employment_type": employment[int(row[-1])]}
+        for row in X
+    ]
+
+    async def drive(score):
+        """`concurrency` clients issuing single-row requests back to back."""
+        queue = asyncio.Queue()
+        for row in rows:
+            queue.put_nowait(row)
+
+        async def client():
+            while not queue.empty():
+                await score(queue.get_nowait())
+
+        start = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(concurrency)])
+        return n_requests / (time.perf_counter() - start)
+
+    async def main():
+        # Starlette runs sync endpoints on a 40-thread pool
+        pool = ThreadPoolExecutor(max_workers=40)
+        loop = asyncio.get_running_loop()
+        threaded = await drive(lambda row: loop.run_in_executor(pool, hm.predict_and_explain, row))
+
+        batcher = MicroBatcher(window_ms=window_ms, max_batch_size=max_batch_size)
+        batched = await drive(lambda row: batcher.submit(hm, row))
+        stats = batcher.stats()
+        await batcher.close()
+        return threaded, batched, stats
+
+    threaded, batched, stats = asyncio.run(main())
+    print(f"⚡ {n_requests} single-row requests, {concurrency} concurrent (requests/sec)")
+    print(f"   threadpool (40 threads)    {threaded:12,.0f}")
+    print(f"   micro-batched ({window_ms} ms / {max_batch_size}) {batched:10,.0f}   ({batched / threaded:.1f}x)")
+    print(f"   batch size:    {stats['batch_size']}")
+    print(f"   queue wait ms: {stats['queue_wait_ms']}")
+
+
+def _slow_sqlite_connection(latency_ms):
+    """sqlite3 connection class whose cursors sleep before each statement,
+    standing in for a network round trip to MySQL. The sleep happens in the
+    driver's thread: a threadpool thread for sync, aiosqlite's own thread for async."""
+    import sqlite3
+
+    delay = latency_ms / 1000
+
+    class SlowCursor(sqlite3.Cursor):
+        def execute(self, *args, **kwargs):
+            time.sleep(delay)
+            return super().execute(*args, **kwargs)
+
+    class SlowConnection(sqlite3.Connection):
+        def cursor(self, factory=SlowCursor):
+            return super().cursor(factory)
+
+    return SlowConnection
+
+
+def _seed_benchmark_db(url, n_users=500, predictions_per_user=5):
+    from sqlalchemy import create_engine, insert
+    from models_db import Base, User, ApplicantProfile, Prediction
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"id": i, "email": f"user{i}@bench.local", "name": f"User {i}", "password_hash": "x", "role": "user"}
+            for i in range(1, n_users + 1)
+        ])
+        connection.execute(insert(ApplicantProfile), [
+            {"user_id": i, "age": 30 + i % 30, "annual_income": 20000 + 97 * i, "loan_amount": 5000 + 13 * i,
+             "risk_score": i % 100, "employment_status": "Employed"}
+            for i in range(1, n_users + 1)
+        ])
+        connection.execute(insert(Prediction), [
+            {"user_id": i, "risk_level": "Low", "final_confidence": 0.9, "agreement": True}
+            for i in range(1, n_users + 1) for _ in range(predictions_per_user)
+        ])
+    engine.dispose()
+
+
+def _db_worker(n_requests, concurrency, latency_ms, n_users):
+    """Runs in a subprocess with DATABASE_URL / DATABASE_MODE set; prints one JSON line."""
+    import asyncio
+    import json
+    import httpx
+    from sqlalchemy import create_engine
+
+    import database
+
+    url = os.environ["DATABASE_URL"]
+    connection_class = _slow_sqlite_connection(latency_ms)
+    pool = {"pool_size": concurrency, "max_overflow": 0}
+    if database.DATABASE_MODE == "async":
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        database.async_engine = create_async_engine(
+            database.async_url(url), connect_args={"factory": connection_class}, **pool
+        )
+        database.AsyncSessionLocal = async_sessionmaker(database.async_engine, autoflush=False, expire_on_commit=False)
+    else:
+        database.engine = create_engine(
+            url, connect_args={"factory": connection_class, "check_same_thread": False}, **pool
+        )
+        database.SessionLocal.configure(bind=database.engine)
+
+    import main
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            paths = [f"/predictions/{1 + i % n_users}" if i % 4 else "/admin/stats" for i in range(n_requests)]
+            queue = asyncio.Queue()
+            for path in paths:
+                queue.put_nowait(path)
+            latencies = []
+
+            async def worker():
+                while not queue.empty():
+                    path = queue.get_nowait()
+                    start = time.perf_counter()
+                    response = await client.get(path)
+                    response.raise_for_status()
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+            elapsed = time.perf_counter() - start
+        await database.dispose_engines()
+        return {
+            "mode": database.DATABASE_MODE,
+            "requests_per_second": round(n_requests / elapsed, 1),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 1),
+        }
+
+    print(json.dumps(asyncio.run(run())))
+
+
+def bench_db(n_requests=2000, concurrency=200, latency_ms=2.0, n_users=500):
+    import json
+    import subprocess
+    import sys
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        _seed_benchmark_db(url, n_users)
+
+        print(f"🗄️  {n_requests} DB requests (/predictions/{{id}} + /admin/stats), {concurrency} concurrent, "
+              f"{latency_ms} ms simulated round trip per statement")
+        results = {}
+        for mode in ("sync", "async"):
+            env = {**os.environ, "DATABASE_URL": url, "DATABASE_MODE": mode}
+            output = subprocess.run(
+                [sys.executable, __file__, "db", "--worker", "--requests", str(n_requests),
+                 "--concurrency", str(concurrency), "--latency-ms", str(latency_ms), "--users", str(n_users)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+            r = results[mode]
+            print(f"   {mode:<6} {r['requests_per_second']:10,.0f} req/s   p50 {r['p50_ms']} ms   p99 {r['p99_ms']} ms")
+        speedup = results["async"]["requests_per_second"] / results["sync"]["requests_per_second"]
+        print(f"   async/sync throughput: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")
+    parser = argparse.ArgumentParser(description="HICRA benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    tree_parser = subparsers.add_parser("tree", help="decision-tree scoring")
+    tree_parser.add_argument("--model-dir", default="models")
+    tree_parser.add_argument("--batch-size", type=int, default=100000)
+
+    nn_parser = subparsers.add_parser("nn", help="MLP throughput per precision")
+    nn_parser.add_argument("--model-dir", default="models")
+    nn_parser.add_argument("--batch-size", type=int, default=100000)
+
+    generator_parser = subparsers.add_parser("generator", help="synthetic data generation throughput")
+    generator_parser.add_argument("--chunk-size", type=int, default=100000)
+
+    batching_parser = subparsers.add_parser("batching", help="concurrent /predict micro-batching")
+    batching_parser.add_argument("--model-dir", default="models")
+    batching_parser.add_argument("--requests", type=int, default=5000)
+    batching_parser.add_argument("--concurrency", type=int, default=200)
+    batching_parser.add_argument("--window-ms", type=float, default=2.0)
+    batching_parser.add_argument("--max-batch-size", type=int, default=64)
+
+    db_parser = subparsers.add_parser("db", help="DB endpoint concurrency, sync vs async sessions")
+    db_parser.add_argument("--requests", type=int, default=2000)
+    db_parser.add_argument("--concurrency", type=int, default=200)
+    db_parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated DB round trip per statement")
+    db_parser.add_argument("--users", type=int, default=500)
+    db_parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    if args.command == "tree":
+        bench_tree(args.model_dir, n_batch=args.batch_size)
+    elif args.command == "nn":
+        bench_nn(args.model_dir, n_batch=args.batch_size)
+    elif args.command == "generator":
+        bench_generator(chunk_size=args.chunk_size)
+    elif args.command == "batching":
+        bench_batching(args.model_dir, args.requests, args.concurrency, args.window_ms, args.max_batch_size)
+    elif args.command == "db" and args.worker:
+        _db_worker(args.requests, args.concurrency, args.latency_ms, args.users)
+    elif args.command == "db":
+        bench_db(args.requests, args.concurrency, args.latency_ms, args.users)
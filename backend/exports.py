@@ -0,0 +1,56 @@
+"""
+Streaming Applicant Exports for HICRA
+Rows from a server-side cursor are serialized one partition at a time as
+NDJSON or CSV (optionally gzipped) for a StreamingResponse, so worker memory
+stays flat however many applicants are exported.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+from admin_queries import row_to_dict
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_FIELDS = [
+    "id", "user_id", "name", "email", "AnnualIncome", "LoanAmount", "LengthOfCreditHistory",
+    "DebtToIncomeRatio", "EmploymentStatus", "RiskScore", "Age", "NumberOfOpenCreditLines"
+]
+
+
+async def ndjson_chunks(partitions):
+    async for rows in partitions:
+        yield "".join(json.dumps(row_to_dict(row)) + "\n" for row in rows).encode()
+
+
+async def csv_chunks(partitions):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue().encode()
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(row_to_dict(row) for row in rows)
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks, level=6):
+    """Compress a byte stream incrementally into one gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(partitions, fmt="ndjson", gzip=False):
+    """Byte chunks for a StreamingResponse over `partitions` (async iterator of row lists)."""
+    chunks = ndjson_chunks(partitions) if fmt == "ndjson" else csv_chunks(partitions)
+    return gzip_chunks(chunks) if gzip else chunks
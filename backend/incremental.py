@@ -0,0 +1,227 @@
+"""
+Incremental Neural Network Updates for HICRA
+Streams labelled rows from the database in fixed-size chunks and updates the
+fitted MLP with MLPClassifier.partial_fit, instead of regenerating data and
+refitting everything. The scaler stays frozen: the NN weights were trained
+on its scaling, so shifting it would move scores for unchanged inputs.
+
+Updates start from a registry version (the active one by default) and run on
+a scratch copy of it, never on the serving files. Every `checkpoint_chunks`
+chunks, and at the end, the updated model is registered as a new version
+carrying incremental_state.json (the last profile id it includes). It is not
+activated unless asked, so each checkpoint can be reviewed, shadowed,
+activated and rolled back like any other version. A run started from a
+checkpoint resumes where that checkpoint stopped.
+
+Labels come from ground truth only: ApplicantProfile features labelled by
+the recorded risk_score band (< 40 Low, 40-70 Medium, >= 70 High, as in
+/admin/stats). The model's own stored predictions are not used; training on
+them would only reinforce its existing mistakes.
+
+Usage:
+    python incremental.py --chunk-size 5000
+    python incremental.py --version <base version> --max-rows 100000 --checkpoint-chunks 5
+    python incremental.py --activate
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select
+
+from inference import EMPLOYMENT_TYPE_MAP, FEATURE_ORDER
+from models_db import ApplicantProfile
+
+INCREMENTAL_STATE_FILE = "incremental_state.json"
+SOURCE = "profiles"
+
+# ApplicantProfile.to_prediction_input(): column, default for NULL/0
+PROFILE_FEATURES = [
+    (ApplicantProfile.age, 30),
+    (ApplicantProfile.annual_income, 50000),
+    (ApplicantProfile.length_of_credit_history, 5),
+    (ApplicantProfile.number_of_open_credit_lines, 0),
+    (ApplicantProfile.debt_to_income_ratio, 0.3),
+    (ApplicantProfile.loan_amount, 10000),
+    (ApplicantProfile.loan_duration, 24),
+]
+
+
+# ============ Checkpoint State ============
+
+def load_state(model_dir):
+    path = os.path.join(model_dir, INCREMENTAL_STATE_FILE)
+    if not os.path.exists(path):
+        return {"last_id": {SOURCE: 0}, "rows_seen": 0, "chunks": 0}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _atomic_write(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_checkpoint(hm, state, registry):
+    """
+    Write the updated NN and its state into the scratch dir, then register
+    it as a new version. Returns the version.
+    """
+    import joblib
+
+    _atomic_write(os.path.join(hm.model_dir, "nn_model.pkl"), lambda p: joblib.dump(hm.nn_model, p))
+
+    def write_state(path):
+        with open(path, "w") as f:
+            json.dump(state, f, indent=2)
+
+    _atomic_write(os.path.join(hm.model_dir, INCREMENTAL_STATE_FILE), write_state)
+
+    # New NN weights -> new fingerprint and artifact
+    hm._refresh_derived_state()
+    hm.save_artifact()
+    return registry.register(hm.model_dir)
+
+
+# ============ Chunk Readers ============
+
+def _profile_chunks(db, after_id, chunk_size):
+    """Keyset-paginated profile feature columns, labelled by risk_score band."""
+    columns = [column for column, _ in PROFILE_FEATURES]
+    while True:
+        rows = db.execute(
+            select(ApplicantProfile.id, *columns, ApplicantProfile.employment_status, ApplicantProfile.risk_score)
+            .where(ApplicantProfile.id > after_id, ApplicantProfile.risk_score.isnot(None))
+            .order_by(ApplicantProfile.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        after_id = rows[-1].id
+        yield after_id, _encode_profiles(rows)
+
+
+def _encode_profiles(rows):
+    """Vectorized ApplicantProfile.to_prediction_input() + risk_score banding."""
+    values = np.array([tuple(row[1:len(PROFILE_FEATURES) + 1]) for row in rows], dtype=np.float64)
+    X = np.empty((len(rows), len(FEATURE_ORDER)), dtype=np.float64)
+    for i, (_, default) in enumerate(PROFILE_FEATURES):
+        column = values[:, i]
+        # to_prediction_input() uses `value or default`, so 0 also falls back
+        X[:, i] = np.where(np.isnan(column) | (column == 0), default, column)
+
+    employment = [(row.employment_status or 'employed').lower() for row in rows]
+    X[:, -1] = [EMPLOYMENT_TYPE_MAP.get(status, EMPLOYMENT_TYPE_MAP['employed']) for status in employment]
+
+    risk_score = np.array([row.risk_score for row in rows], dtype=np.float64)
+    y = np.where(risk_score < 40, 0, np.where(risk_score < 70, 1, 2))
+    return X, y
+
+
+# ============ Update Loop ============
+
+def _copy_version(registry, version, work_dir):
+    source = registry.version_dir(version)
+    for name in os.listdir(source):
+        path = os.path.join(source, name)
+        if os.path.isfile(path) and not name.endswith(".tmp"):
+            shutil.copy2(path, os.path.join(work_dir, name))
+
+
+def update_from_database(db, registry, base_version=None, chunk_size=5000, max_rows=None, checkpoint_chunks=10):
+    """
+    Apply partial_fit to a copy of `base_version`'s NN for every profile not
+    yet included in it, registering a new version every `checkpoint_chunks`
+    chunks and at the end. Returns a summary dict.
+    """
+    import pandas as pd
+    from model import HybridModel
+    from model_registry import RegistryError
+
+    base_version = base_version or registry.active_version()
+    if base_version is None or base_version not in registry.read_manifest()["versions"]:
+        raise RegistryError(f"Unknown base model version '{base_version}'")
+
+    start = time.perf_counter()
+    rows_applied = 0
+    versions = []
+    with tempfile.TemporaryDirectory(prefix="hicra-incremental-") as work_dir:
+        _copy_version(registry, base_version, work_dir)
+        hm = HybridModel(model_dir=work_dir, engine="sklearn")
+        hm.load_estimators()
+
+        state = load_state(work_dir)
+        state["last_id"].setdefault(SOURCE, 0)
+        state["base_version"] = base_version
+        classes = hm.nn_model.classes_
+        pending = 0
+
+        for last_id, (X, y) in _profile_chunks(db, state["last_id"][SOURCE], chunk_size):
+            if len(X):
+                # Frozen scaler: transform only, never partial_fit
+                X = hm.scaler.transform(pd.DataFrame(X, columns=FEATURE_ORDER))
+                hm.nn_model.partial_fit(X, y, classes=classes)
+                rows_applied += len(X)
+                pending += 1
+
+            state["last_id"][SOURCE] = int(last_id)
+            state["rows_seen"] += len(X)
+            state["chunks"] += 1
+            state["updated_at"] = datetime.utcnow().isoformat()
+            print(f"   chunk {state['chunks']}: {len(X)} rows (last id {last_id})")
+
+            done = max_rows is not None and rows_applied >= max_rows
+            if pending and (pending >= checkpoint_chunks or done):
+                versions.append(save_checkpoint(hm, state, registry))
+                pending = 0
+            if done:
+                break
+
+        if pending:
+            versions.append(save_checkpoint(hm, state, registry))
+
+    elapsed = time.perf_counter() - start
+    return {
+        "source": SOURCE,
+        "base_version": base_version,
+        "rows_applied": rows_applied,
+        "last_id": state["last_id"][SOURCE],
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(rows_applied / elapsed, 1) if elapsed > 0 else 0.0,
+        "versions": versions,
+        "model_version": versions[-1] if versions else base_version,
+    }
+
+
+if __name__ == "__main__":
+    import warnings
+
+    from database import SessionLocal
+    from model_registry import ModelRegistry
+
+    warnings.filterwarnings("ignore")
+    parser = argparse.ArgumentParser(description="Incrementally update the HICRA neural network from the database")
+    parser.add_argument("--version", default=None, help="registry version to start from (default: the active one)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--max-rows", type=int, default=None, help="stop after this many rows")
+    parser.add_argument("--checkpoint-chunks", type=int, default=10, help="register a version every N chunks")
+    parser.add_argument("--activate", action="store_true", help="activate the final version")
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    db = SessionLocal()
+    try:
+        report = update_from_database(db, registry, args.version, args.chunk_size, args.max_rows,
+                                      args.checkpoint_chunks)
+    finally:
+        db.close()
+    if args.activate and report["versions"]:
+        registry.activate(report["model_version"])
+    print(f"✅ Incremental update complete: {report}")
@@ -0,0 +1,420 @@
+"""
+NumPy Inference Engine for HICRA
+Scores prediction inputs straight from the fitted model arrays
+(tree structure, scaler statistics and MLP weights) without going
+through pandas or scikit-learn on the request path.
+"""
+
+import hashlib
+import threading
+
+import numpy as np
+
+
+# Column order used when the models were trained
+FEATURE_ORDER = [
+    'age', 'income', 'credit_history_length', 'existing_loans',
+    'debt_to_income_ratio', 'loan_amount', 'repayment_duration', 'employment_type'
+]
+
+EMPLOYMENT_TYPE_MAP = {'employed': 0, 'self-employed': 1, 'unemployed': 2}
+
+RISK_MAP = {0: "Low", 1: "Medium", 2: "High"}
+
+# Marker used by sklearn's tree_ arrays for "no child"
+TREE_LEAF = -1
+
+# Precisions the MLP leg can run in; float64 is the reference sklearn model
+NN_PRECISIONS = ("float64", "float32", "int8")
+
+
+class NumpyInferenceEngine:
+    """
+    Re-implements DecisionTreeClassifier.predict_proba, StandardScaler.transform
+    and MLPClassifier.predict_proba with plain NumPy so that the outputs match
+    the sklearn estimators bit for bit.
+    """
+
+    def __init__(self, feature, threshold, children_left, children_right, value,
+                 classes, scaler_mean, scaler_scale, coefs, intercepts,
+                 feature_importances=None):
+        # Decision tree structure
+        self.feature = np.asarray(feature)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children_left = np.asarray(children_left)
+        self.children_right = np.asarray(children_right)
+        # Per-node class fractions, shape (n_nodes, n_classes)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.classes = np.asarray(classes)
+        if feature_importances is None:
+            feature_importances = np.zeros(len(FEATURE_ORDER))
+        self.feature_importances = np.asarray(feature_importances, dtype=np.float64)
+
+        # Scaler + MLP parameters
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+        self.coefs = [np.asarray(c, dtype=np.float64) for c in coefs]
+        self.intercepts = [np.asarray(b, dtype=np.float64) for b in intercepts]
+
+        # Python-level copies for the scalar tree walk (list indexing is much
+        # cheaper than indexing numpy arrays element by element)
+        self._feature_list = self.feature.tolist()
+        self._threshold_list = self.threshold.tolist()
+        self._left_list = self.children_left.tolist()
+        self._right_list = self.children_right.tolist()
+
+        # Rule paths depend only on the leaf, so they are built once here
+        self.explanations = ExplanationTable(
+            self.feature, self.threshold, self.children_left, self.children_right,
+            self.feature_importances
+        )
+
+        # Optional generated module from tree_compiler.py
+        self.compiled_tree = None
+
+        # Reduced-precision MLP layers, see use_nn_weights()
+        self.nn_precision = "float64"
+        self._nn_reduced = None
+        self._scaler_mean32 = self.scaler_mean.astype(np.float32)
+        self._scaler_scale32 = self.scaler_scale.astype(np.float32)
+
+        # Each worker thread gets its own preallocated input row
+        self._local = threading.local()
+
+    @classmethod
+    def from_sklearn(cls, dt_model, scaler, nn_model):
+        """Build the engine from fitted sklearn estimators."""
+        if nn_model.activation != 'relu' or nn_model.out_activation_ != 'softmax':
+            raise ValueError(
+                f"Unsupported MLP activations: {nn_model.activation}/{nn_model.out_activation_}"
+            )
+        tree = dt_model.tree_
+        return cls(
+            feature=tree.feature,
+            threshold=tree.threshold,
+            children_left=tree.children_left,
+            children_right=tree.children_right,
+            value=tree.value[:, 0, :],
+            classes=dt_model.classes_,
+            scaler_mean=scaler.mean_,
+            scaler_scale=scaler.scale_,
+            coefs=nn_model.coefs_,
+            intercepts=nn_model.intercepts_,
+            feature_importances=dt_model.feature_importances_,
+        )
+
+    def use_compiled_tree(self, module):
+        """Route apply/apply_batch through a module generated by tree_compiler.py."""
+        self.compiled_tree = module
+
+    def use_nn_weights(self, weights=None):
+        """
+        Switch the MLP leg to reduced-precision weights produced by
+        quantize_mlp(), or back to the float64 reference when weights is None.
+        """
+        if weights is None:
+            self.nn_precision, self._nn_reduced = "float64", None
+        else:
+            self.nn_precision, self._nn_reduced = str(weights["precision"]), reduced_layers(weights)
+
+    def fingerprint(self):
+        """Short content hash of every array the engine scores with."""
+        digest = hashlib.sha256()
+        arrays = [
+            self.feature, self.threshold, self.children_left, self.children_right,
+            self.value, self.classes, self.scaler_mean, self.scaler_scale,
+            *self.coefs, *self.intercepts
+        ]
+        for array in arrays:
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()[:12]
+
+    # ============ Encoding ============
+
+    def _row_buffer(self):
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = np.empty((1, len(FEATURE_ORDER)), dtype=np.float64)
+            self._local.row = row
+        return row
+
+    def encode(self, input_data):
+        """
+        Encode a prediction input dict into this thread's preallocated
+        (1, 8) float64 row, in training column order.
+        """
+        row = self._row_buffer()
+        values = row[0]
+        for i, name in enumerate(FEATURE_ORDER[:-1]):
+            values[i] = input_data[name]
+
+        employment_type = input_data['employment_type']
+        if employment_type not in EMPLOYMENT_TYPE_MAP:
+            raise ValueError(f"Unknown employment_type: {employment_type!r}")
+        values[-1] = EMPLOYMENT_TYPE_MAP[employment_type]
+        return row
+
+    def encode_batch(self, rows):
+        """Encode a list of prediction input dicts into one (n, 8) float64 matrix."""
+        n = len(rows)
+        X = np.empty((n, len(FEATURE_ORDER)), dtype=np.float64)
+        for i, name in enumerate(FEATURE_ORDER[:-1]):
+            X[:, i] = np.fromiter((row[name] for row in rows), dtype=np.float64, count=n)
+
+        try:
+            X[:, -1] = np.fromiter(
+                (EMPLOYMENT_TYPE_MAP[row['employment_type']] for row in rows),
+                dtype=np.float64, count=n
+            )
+        except KeyError as e:
+            raise ValueError(f"Unknown employment_type: {e.args[0]!r}")
+        return X
+
+    # ============ Model Legs ============
+
+    def apply(self, row):
+        """Return the leaf id reached by a single encoded row."""
+        # sklearn compares float32 features against float64 thresholds
+        x = row[0].astype(np.float32).tolist()
+        if self.compiled_tree is not None:
+            return self.compiled_tree.predict_leaf(x)
+
+        feature = self._feature_list
+        threshold = self._threshold_list
+        left = self._left_list
+        right = self._right_list
+
+        node = 0
+        while left[node] != TREE_LEAF:
+            if x[feature[node]] <= threshold[node]:
+                node = left[node]
+            else:
+                node = right[node]
+        return node
+
+    def apply_batch(self, X):
+        """Return the leaf id reached by every row of an encoded (n, 8) matrix."""
+        X32 = X.astype(np.float32)
+        if self.compiled_tree is not None:
+            return self.compiled_tree.predict_leaf_batch(X32)
+
+        node = np.zeros(len(X), dtype=np.intp)
+
+        # Walk all rows down the tree one level at a time
+        active = np.flatnonzero(self.children_left[node] != TREE_LEAF)
+        while active.size:
+            current = node[active]
+            go_left = X32[active, self.feature[current]] <= self.threshold[current]
+            node[active] = np.where(go_left, self.children_left[current], self.children_right[current])
+            active = active[self.children_left[node[active]] != TREE_LEAF]
+        return node
+
+    def nn_predict_proba(self, X):
+        """Forward pass of the MLP on an encoded (n, 8) matrix, in the active precision."""
+        if self._nn_reduced is not None:
+            return self.nn_predict_proba_reduced(X, self._nn_reduced)
+        return self.nn_predict_proba_float64(X)
+
+    def nn_predict_proba_float64(self, X):
+        """Reference float64 forward pass, identical to MLPClassifier.predict_proba."""
+        activation = (X - self.scaler_mean) / self.scaler_scale
+        last = len(self.coefs) - 1
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            activation = activation @ coef
+            activation += intercept
+            if i != last:
+                np.maximum(activation, 0, out=activation)
+
+        # Softmax, same operation order as sklearn's inplace_softmax
+        tmp = activation - activation.max(axis=1)[:, np.newaxis]
+        np.exp(tmp, out=activation)
+        activation /= activation.sum(axis=1)[:, np.newaxis]
+        return activation
+
+    def nn_predict_proba_reduced(self, X, layers):
+        """Forward pass in float32 using layers from reduced_layers()."""
+        activation = X.astype(np.float32)
+        activation -= self._scaler_mean32
+        activation /= self._scaler_scale32
+        last = len(layers) - 1
+        for i, (coef, intercept) in enumerate(layers):
+            activation = activation @ coef
+            activation += intercept
+            if i != last:
+                np.maximum(activation, 0, out=activation)
+
+        tmp = activation - activation.max(axis=1)[:, np.newaxis]
+        np.exp(tmp, out=activation)
+        activation /= activation.sum(axis=1)[:, np.newaxis]
+        return activation
+
+    # ============ Prediction ============
+
+    def _predict_row(self, row, leaf_id):
+        # DT Prediction
+        dt_proba = self.value[leaf_id]
+        dt_pred_class = self.classes[int(np.argmax(dt_proba))]
+        dt_conf = float(np.max(dt_proba))
+
+        # NN Prediction
+        nn_pred_proba = self.nn_predict_proba(row)[0]
+        nn_pred_class = int(np.argmax(nn_pred_proba))
+        nn_conf = float(np.max(nn_pred_proba))
+
+        return build_prediction(dt_pred_class, dt_conf, nn_pred_class, nn_conf)
+
+    def predict(self, input_data):
+        """
+        Predicts risk using both DT and NN.
+        Returns the same dict as HybridModel.predict.
+        """
+        row = self.encode(input_data)
+        return self._predict_row(row, self.apply(row))
+
+    def explain(self, input_data):
+        """Returns feature importance and decision path, like HybridModel.explain."""
+        return self.explanations.lookup(self.apply(self.encode(input_data)))
+
+    def predict_and_explain(self, input_data):
+        """
+        Encode once, walk the tree once and reuse the leaf for both the
+        prediction and the precomputed rule explanation.
+        """
+        row = self.encode(input_data)
+        leaf_id = self.apply(row)
+        return {
+            **self._predict_row(row, leaf_id),
+            "explanation": self.explanations.lookup(leaf_id)
+        }
+
+    def predict_batch(self, rows):
+        """
+        Vectorized predict over many inputs: one tree walk and one NN
+        forward pass for the whole matrix. Results keep the input order.
+        """
+        if not rows:
+            return []
+        predictions, _ = self._predict_matrix(self.encode_batch(rows))
+        return predictions
+
+    def predict_and_explain_batch(self, rows):
+        """Vectorized predict_and_explain: the batch tree walk also yields each row's leaf."""
+        if not rows:
+            return []
+        predictions, leaves = self._predict_matrix(self.encode_batch(rows))
+        return [
+            {**prediction, "explanation": self.explanations.lookup(leaf)}
+            for prediction, leaf in zip(predictions, leaves.tolist())
+        ]
+
+    def _predict_matrix(self, X):
+        """Prediction dicts and leaf ids for an encoded (n, 8) matrix."""
+        leaves = self.apply_batch(X)
+
+        # DT Prediction
+        dt_proba = self.value[leaves]
+        dt_pred_class = self.classes[np.argmax(dt_proba, axis=1)]
+        dt_conf = dt_proba.max(axis=1)
+
+        # NN Prediction
+        nn_pred_proba = self.nn_predict_proba(X)
+        nn_pred_class = np.argmax(nn_pred_proba, axis=1)
+        nn_conf = nn_pred_proba.max(axis=1)
+
+        predictions = [
+            build_prediction(*values)
+            for values in zip(dt_pred_class.tolist(), dt_conf.tolist(),
+                              nn_pred_class.tolist(), nn_conf.tolist())
+        ]
+        return predictions, leaves
+
+
+def quantize_mlp(coefs, intercepts, precision):
+    """
+    Reduced-precision copy of MLP weights as a flat dict of arrays (npz-ready).
+    float32: plain cast. int8: symmetric per-output-column quantization with
+    float32 scales. Intercepts stay float32 in both modes.
+    """
+    if precision not in ("float32", "int8"):
+        raise ValueError(f"Unsupported NN precision: {precision}")
+
+    weights = {"precision": np.array(precision)}
+    for i, (coef, intercept) in enumerate(zip(coefs, intercepts)):
+        if precision == "int8":
+            coef_scale = np.abs(coef).max(axis=0) / 127.0
+            coef_scale[coef_scale == 0] = 1.0
+            weights[f"coef_{i}"] = np.round(coef / coef_scale).astype(np.int8)
+            weights[f"coef_scale_{i}"] = coef_scale.astype(np.float32)
+        else:
+            weights[f"coef_{i}"] = np.asarray(coef, dtype=np.float32)
+        weights[f"intercept_{i}"] = np.asarray(intercept, dtype=np.float32)
+    return weights
+
+
+def reduced_layers(weights):
+    """
+    Turn a quantize_mlp() dict into float32 [(coef, intercept), ...] layers.
+    int8 weights are dequantized once here: NumPy has no int8 matmul, so both
+    reduced modes run float32 arithmetic and int8 only shrinks the stored weights.
+    """
+    layers = []
+    i = 0
+    while f"coef_{i}" in weights:
+        coef = np.asarray(weights[f"coef_{i}"]).astype(np.float32)
+        if f"coef_scale_{i}" in weights:
+            coef *= np.asarray(weights[f"coef_scale_{i}"], dtype=np.float32)
+        layers.append((coef, np.asarray(weights[f"intercept_{i}"], dtype=np.float32)))
+        i += 1
+    return layers
+
+
+class ExplanationTable:
+    """
+    Precomputed explanations keyed by leaf id.
+    For a fitted tree the rule path is fully determined by the leaf a sample
+    lands in, and feature importance is constant per model.
+    """
+
+    def __init__(self, feature, threshold, children_left, children_right, feature_importances):
+        self.feature_importance = dict(zip(
+            FEATURE_ORDER, [round(float(x), 4) for x in feature_importances]
+        ))
+        # leaf_id -> [(feature_name, "<=" | ">", threshold), ...] from root to leaf
+        self.conditions = {}
+        # leaf_id -> ["income <= 30000.50", ...]
+        self.rules = {}
+
+        stack = [(0, [])]
+        while stack:
+            node, conditions = stack.pop()
+            if children_left[node] == TREE_LEAF:
+                self.conditions[node] = conditions
+                self.rules[node] = [f"{name} {sign} {t:.2f}" for name, sign, t in conditions]
+                continue
+
+            name = FEATURE_ORDER[feature[node]]
+            t = float(threshold[node])
+            stack.append((int(children_right[node]), conditions + [(name, ">", t)]))
+            stack.append((int(children_left[node]), conditions + [(name, "<=", t)]))
+
+    def lookup(self, leaf_id):
+        """Return the explanation dict for a leaf (fresh containers, safe to mutate)."""
+        return {
+            "rules": list(self.rules[leaf_id]),
+            "feature_importance": dict(self.feature_importance)
+        }
+
+
+def build_prediction(dt_pred_class, dt_conf, nn_pred_class, nn_conf):
+    """Assemble the prediction response (DT drives the final risk level)."""
+    final_risk = dt_pred_class  # Interpretability first
+
+    return {
+        "risk_level": RISK_MAP[final_risk],
+        "dt_prediction": RISK_MAP[dt_pred_class],
+        "nn_prediction": RISK_MAP[nn_pred_class],
+        "dt_confidence": round(dt_conf, 2),
+        "nn_confidence": round(nn_conf, 2),
+        "agreement": bool(dt_pred_class == nn_pred_class),
+        "final_confidence": round((dt_conf + nn_conf) / 2, 2)  # Weighted average
+    }
@@ -3,65 +3,297 @@ HICRA - Hybrid Interpretable Credit Risk Assessment
 FastAPI Backend with MySQL Database Integration
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from passlib.hash import bcrypt
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import insert, select, delete, func, or_
+from sqlalchemy.exc import IntegrityError
+from contextlib import asynccontextmanager
 import os
+import threading
+import time
+from datetime import datetime
 from typing import List, Optional
 
 # Local imports
-from database import get_db, engine, Base
-from models_db import User, ApplicantProfile, Prediction
+from database import (
+    get_db, get_session, stream_rows, dispose_engines, engine, Base
+)
+from models_db import User, ApplicantProfile, Prediction, RevokedToken, ProfileScore
 from schemas import (
     LoginRequest, LoginResponse, 
     PredictionInput, PredictionResult,
     NewApplicant, AdminUserData, UserDashboardData
 )
 from model import HybridModel
+from artifacts import ARTIFACT_FILE
+from model_registry import ModelRegistry, RegistryError
+from shadow import ShadowEvaluator
+from batching import MicroBatcher
+from password_hashing import PasswordHasher, HasherBusy
+from prediction_writer import PredictionWriter
+from auth_tokens import TokenSigner, TokenError, parse_keys
+import admin_queries
+import admin_stats
+import profile_scores
+import exports
+import migrate
 
-# ============ Initialize FastAPI ============
+# ============ Startup State ============
+# Model loading and DB bootstrap run in a background thread after the server
+# starts, so workers come up immediately. /health is liveness only; /ready
+# reports whether this worker is warmed up and should receive traffic.
 
-app = FastAPI(
-    title="HICRA - Hybrid Interpretable Credit Risk Assessment",
-    description="API for predicting credit risk using hybrid Decision Tree + Neural Network approach with explainable AI.",
-    version="2.0.0"
+startup_state = {
+    "started_at": time.monotonic(),
+    "ready_at": None,
+    "model": "pending",
+    "model_error": None,
+    "database": "pending",
+    "database_error": None,
+}
+
+# Background model (re)loads triggered by activation, rollback or the manifest poller
+registry_state = {
+    "loading": None,
+    "last_error": None,
+    "last_swap_at": None,
+}
+
+WARMUP_INPUT = {
+    "age": 35, "income": 50000, "credit_history_length": 5, "existing_loans": 1,
+    "debt_to_income_ratio": 0.3, "loan_amount": 10000, "repayment_duration": 24,
+    "employment_type": "employed"
+}
+
+registry = ModelRegistry()
+
+# The serving model. It is never mutated once published: activating a version
+# loads a new HybridModel off the request path and swaps this reference, so
+# requests that already hold the old model finish on it.
+model = None
+model_swap_lock = threading.Lock()
+
+# Micro-batching for concurrent single-row /predict calls (PREDICT_BATCHING=0 disables)
+batcher = MicroBatcher(
+    window_ms=float(os.getenv("PREDICT_BATCH_WINDOW_MS", "2")),
+    max_batch_size=int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+) if os.getenv("PREDICT_BATCHING", "1") == "1" else None
+
+# Write-behind Prediction inserts (PREDICTION_WRITE_BEHIND=1): /predict answers
+# before the commit and a background task writes rows in multi-row batches
+prediction_writer = PredictionWriter(
+    flush_rows=int(os.getenv("PREDICTION_FLUSH_ROWS", "200")),
+    flush_ms=float(os.getenv("PREDICTION_FLUSH_MS", "50")),
+    max_queue=int(os.getenv("PREDICTION_QUEUE_SIZE", "10000"))
+) if os.getenv("PREDICTION_WRITE_BEHIND", "0") == "1" else None
+
+# bcrypt runs in its own bounded process pool, off the request threadpool
+hasher = PasswordHasher(
+    workers=int(os.getenv("BCRYPT_WORKERS", "2")),
+    max_queue=int(os.getenv("BCRYPT_MAX_QUEUE", "16")),
+    rounds=int(os.getenv("BCRYPT_ROUNDS", "12"))
 )
 
-# ============ CORS Configuration ============
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # For development; restrict in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+async def hash_password(password):
+    try:
+        return await hasher.hash(password)
+    except HasherBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+
+
+async def verify_password(password, password_hash):
+    try:
+        return await hasher.verify(password, password_hash)
+    except HasherBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+
+
+# Signed session tokens, verified in process (no users-table lookup per request)
+signer = TokenSigner(
+    keys=parse_keys(os.getenv("AUTH_SIGNING_KEYS")),
+    ttl_seconds=int(os.getenv("AUTH_TOKEN_TTL_SECONDS", str(8 * 3600)))
 )
+bearer = HTTPBearer(auto_error=False)
+
+
+# Optional candidate model scoring a sample of live traffic off the request path
+shadow = ShadowEvaluator(
+    sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", "0.1")),
+    max_queue=int(os.getenv("SHADOW_QUEUE_SIZE", "1000"))
+)
+
+
+def warm(hm):
+    """Exercise the single-row and batch paths once (bypasses the prediction cache)."""
+    hm.predict(WARMUP_INPUT)
+    hm.explain(WARMUP_INPUT)
+    hm.predict_batch([WARMUP_INPUT] * 8)
+
+
+def publish_model(hm, replaces=None):
+    """
+    Swap in `hm` as the serving model. With `replaces`, only if that model
+    is still the one being served; returns False otherwise.
+    """
+    global model
+    with model_swap_lock:
+        if replaces is not None and model is not replaces:
+            return False
+        model = hm
+    registry_state["last_swap_at"] = time.time()
+    print(f"🔁 Serving model version {hm.version} ({hm.nn_precision} NN)")
+    return True
+
+
+def warm_up_model():
+    """Load the active registry version (adopting or training models/ on first run) and warm it."""
+    startup_state["model"] = "loading"
+    try:
+        version = registry.active_version()
+        if version is None:
+            legacy = HybridModel()
+            saved = [os.path.join(legacy.model_dir, name) for name in ("dt_model.pkl", ARTIFACT_FILE)]
+            if not any(os.path.exists(path) for path in saved):
+                print("📦 Models not found. Training new models...")
+                legacy.train()
+            print("📦 Registering existing ML models as the first version...")
+            version = registry.register(legacy.model_dir, activate=True)
+
+        print(f"📦 Loading model version {version}...")
+        hm = registry.load(version)
+        warm(hm)
+        publish_model(hm)
+
+        startup_state["model"] = "ready"
+        print("✅ ML Models ready!")
+    except Exception as e:
+        startup_state["model"] = "failed"
+        startup_state["model_error"] = str(e)
+        print(f"❌ Model warm-up failed: {e}")
+
+
+def load_version_in_background(version, rollback=False):
+    """
+    Load + warm `version` in a worker thread, then swap it in and record the
+    activation in the manifest. Returns False if another load is in progress.
+    """
+    with model_swap_lock:
+        if registry_state["loading"] is not None:
+            return False
+        registry_state["loading"] = version
+
+    def run():
+        try:
+            hm = registry.load(version)
+            warm(hm)
+            if rollback:
+                registry.rollback()
+            else:
+                registry.activate(version)
+            publish_model(hm)
+            registry_state["last_error"] = None
+        except Exception as e:
+            registry_state["last_error"] = f"{version}: {e}"
+            print(f"❌ Could not activate model version {version}: {e}")
+        finally:
+            registry_state["loading"] = None
+
+    threading.Thread(target=run, name=f"model-load-{version}", daemon=True).start()
+    return True
+
+
+def load_shadow_in_background(version):
+    """Load a registry version as the shadow candidate without touching the serving model."""
+    def run():
+        try:
+            hm = registry.load(version)
+            warm(hm)
+            shadow.set_candidate(hm)
+            print(f"👥 Shadowing model version {version} at {shadow.sample_rate:.0%} of traffic")
+        except Exception as e:
+            registry_state["last_error"] = f"shadow {version}: {e}"
+            print(f"❌ Could not load shadow model version {version}: {e}")
+
+    threading.Thread(target=run, name=f"shadow-load-{version}", daemon=True).start()
+
+
+def watch_registry():
+    """Follow manifest changes made by the CLI or other workers."""
+    poll_seconds = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "10"))
+    while True:
+        time.sleep(poll_seconds)
+        try:
+            active = registry.active_version()
+            # Claim the loading slot like activation does, so the two never interleave
+            with model_swap_lock:
+                current = model
+                if current is None or not active or active == current.version or registry_state["loading"] is not None:
+                    continue
+                registry_state["loading"] = active
+            try:
+                print(f"ℹ️  Manifest points at {active}, reloading")
+                hm = registry.load(active)
+                warm(hm)
+                # The manifest may have moved on (activate/rollback) while this loaded
+                if registry.active_version() == active:
+                    publish_model(hm, replaces=current)
+            finally:
+                registry_state["loading"] = None
+        except Exception as e:
+            registry_state["last_error"] = str(e)
+            print(f"⚠️  Model registry poll failed: {e}")
+
+
+def watch_revocations():
+    """Periodically reload the revoked-token set so logouts in other workers apply here too."""
+    refresh_seconds = float(os.getenv("AUTH_REVOCATION_REFRESH_SECONDS", "30"))
+    while True:
+        db = next(get_db())
+        try:
+            signer.refresh_revocations(db)
+        except Exception as e:
+            print(f"⚠️  Token revocation refresh failed: {e}")
+        finally:
+            db.close()
+        time.sleep(refresh_seconds)
+
 
-# ============ Initialize ML Model ============
+def watch_admin_stats():
+    """Rebuild the /admin/stats summary from a full count now and then, correcting drift."""
+    reconcile_seconds = float(os.getenv("STATS_RECONCILE_SECONDS", "300"))
+    while True:
+        db = next(get_db())
+        try:
+            drift = admin_stats.reconcile(db)
+            if drift:
+                print(f"ℹ️  Admin stats summary corrected: {drift}")
+        except Exception as e:
+            print(f"⚠️  Admin stats reconciliation failed: {e}")
+        finally:
+            db.close()
+        time.sleep(reconcile_seconds)
 
-model = HybridModel()
-if not os.path.exists(model.model_dir) or not os.path.exists(os.path.join(model.model_dir, "dt_model.pkl")):
-    print("📦 Models not found. Training new models...")
-    model.train()
-else:
-    print("📦 Loading existing ML models...")
-    model.load()
-print("✅ ML Models ready!")
 
 # ============ Database Initialization ============
 
 def init_database():
-    """Initialize database tables on startup"""
+    """Initialize database tables and the admin user"""
+    Base.metadata.create_all(bind=engine)
+    print("✅ Database tables initialized!")
+    changes, manual = migrate.pending_changes(engine)
+    if changes or manual:
+        print(f"⚠️  {len(changes) + len(manual)} pending schema change(s); run 'python migrate.py'")
+    
+    # Create admin user if not exists
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    db = next(get_db())
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Database tables initialized!")
-        
-        # Create admin user if not exists
-        from dotenv import load_dotenv
-        load_dotenv()
-        
-        db = next(get_db())
         admin_email = os.getenv("ADMIN_EMAIL", "demo1@admin.com")
         admin_password = os.getenv("ADMIN_PASSWORD", "12345")
         
@@ -70,7 +302,7 @@ def init_database():
             admin = User(
                 email=admin_email,
                 name="Admin User",
-                password_hash=bcrypt.hash(admin_password),
+                password_hash=hasher.hash_sync(admin_password),
                 role="admin",
                 is_active=True
             )
@@ -79,14 +311,118 @@ def init_database():
             print(f"✅ Admin user created: {admin_email}")
         else:
             print(f"ℹ️  Admin user already exists: {admin_email}")
-        
+    finally:
         db.close()
-    except Exception as e:
-        print(f"⚠️  Database initialization warning: {e}")
-        print("   Run 'python seed_database.py' to set up the database.")
 
-# Initialize on startup
-init_database()
+
+def bootstrap_database():
+    """Run init_database, retrying until the database is reachable."""
+    retry_seconds = float(os.getenv("DB_BOOTSTRAP_RETRY_SECONDS", "5"))
+    while True:
+        try:
+            init_database()
+            startup_state["database"] = "ready"
+            startup_state["database_error"] = None
+            return
+        except Exception as e:
+            startup_state["database"] = "unavailable"
+            startup_state["database_error"] = str(e)
+            print(f"⚠️  Database initialization warning: {e}")
+            print("   Run 'python seed_database.py' to set up the database.")
+            time.sleep(retry_seconds)
+
+
+def run_startup_tasks():
+    """Background startup: warm the model and bootstrap the DB concurrently."""
+    db_thread = threading.Thread(target=bootstrap_database, name="db-bootstrap", daemon=True)
+    db_thread.start()
+    threading.Thread(target=hasher.warm_up, name="hasher-warm-up", daemon=True).start()
+    warm_up_model()
+    db_thread.join()
+    threading.Thread(target=watch_revocations, name="revocation-watch", daemon=True).start()
+    threading.Thread(target=watch_admin_stats, name="admin-stats-reconcile", daemon=True).start()
+    if startup_state["model"] == "ready":
+        startup_state["ready_at"] = time.monotonic()
+        print(f"🚀 Worker ready in {startup_state['ready_at'] - startup_state['started_at']:.2f}s")
+        threading.Thread(target=watch_registry, name="registry-watch", daemon=True).start()
+        if os.getenv("SHADOW_MODEL_VERSION"):
+            load_shadow_in_background(os.getenv("SHADOW_MODEL_VERSION"))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    threading.Thread(target=run_startup_tasks, name="startup", daemon=True).start()
+    yield
+    if batcher is not None:
+        await batcher.close()
+    if prediction_writer is not None:
+        await prediction_writer.close()
+    await dispose_engines()
+    hasher.shutdown()
+
+
+def require_model():
+    """
+    Return the serving model, or reject with 503 until it is warmed up.
+    Handlers keep the returned reference for the whole request.
+    """
+    hm = model
+    if startup_state["model"] != "ready" or hm is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Model is not ready ({startup_state['model']})"
+        )
+    return hm
+
+
+def authenticate(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)):
+    """Claims of the request's bearer token (401 if missing, forged, expired or revoked)."""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        return signer.verify(credentials.credentials)
+    except TokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+def require_admin(claims=Depends(authenticate)):
+    if claims["role"] != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return claims
+
+
+def require_self_or_admin(claims, user_id):
+    if claims["role"] != "admin" and claims["sub"] != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to access this user")
+
+
+# ============ Initialize FastAPI ============
+
+app = FastAPI(
+    title="HICRA - Hybrid Interpretable Credit Risk Assessment",
+    description="API for predicting credit risk using hybrid Decision Tree + Neural Network approach with explainable AI.",
+    version="2.0.0",
+    lifespan=lifespan
+)
+
+# ============ CORS Configuration ============
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # For development; restrict in production
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # /predictions/{user_id} paging
+)
 
 
 # ============ Health Check ============
@@ -96,16 +432,39 @@ def health_check():
     return {"status": "healthy", "service": "hicra-api", "version": "2.0.0"}
 
 
+@app.get("/ready")
+def readiness_check():
+    """
+    Readiness probe for the load balancer.
+    200 once the model is warmed up and the database is bootstrapped, 503 before.
+    """
+    ready = startup_state["model"] == "ready" and startup_state["database"] == "ready"
+    ready_at = startup_state["ready_at"]
+    body = {
+        "ready": ready,
+        "model": startup_state["model"],
+        "database": startup_state["database"],
+        "model_version": model.version if model is not None else None,
+        "uptime_seconds": round(time.monotonic() - startup_state["started_at"], 3),
+        "time_to_ready_seconds": round(ready_at - startup_state["started_at"], 3) if ready_at else None,
+    }
+    if startup_state["model_error"]:
+        body["model_error"] = startup_state["model_error"]
+    if startup_state["database_error"]:
+        body["database_error"] = startup_state["database_error"]
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+
 # ============ Authentication Endpoints ============
 
 @app.post("/login", response_model=LoginResponse)
-def login(creds: LoginRequest, db: Session = Depends(get_db)):
+async def login(creds: LoginRequest, db=Depends(get_session)):
     """
     Authenticate user and return token with role.
     Supports both admin and regular user login.
     """
     # Find user by email
-    user = db.query(User).filter(User.email == creds.email).first()
+    user = (await db.execute(select(User).where(User.email == creds.email))).scalars().first()
     
     if not user:
         return LoginResponse(
@@ -116,8 +475,8 @@ def login(creds: LoginRequest, db: Session = Depends(get_db)):
             error="Invalid credentials"
         )
     
-    # Verify password
-    if not bcrypt.verify(creds.password, user.password_hash):
+    # Verify password (CPU-bound, keep it off the event loop)
+    if not await verify_password(creds.password, user.password_hash):
         return LoginResponse(
             token="",
             role="guest", 
@@ -136,28 +495,37 @@ def login(creds: LoginRequest, db: Session = Depends(get_db)):
             error="Account is disabled"
         )
     
-    # Generate token (simplified - in production use JWT)
-    token = f"{user.role}-token-{user.id}"
+    # Signed, expiring token; later requests are verified without a DB lookup
+    token, claims = signer.issue(user.id, user.role)
     
     return LoginResponse(
         token=token,
         role=user.role,
         name=user.name,
         email=user.email,
-        user_id=user.id
+        user_id=user.id,
+        expires_at=claims["exp"]
     )
 
 
+@app.post("/logout")
+async def logout(claims=Depends(authenticate), db=Depends(get_session)):
+    """Revoke the caller's token"""
+    db.add(signer.revoke(claims))
+    await db.commit()
+    return {"success": True}
+
+
 @app.post("/register")
-def register(
+async def register(
     name: str,
     email: str,
     password: str,
-    db: Session = Depends(get_db)
+    db=Depends(get_session)
 ):
     """Register a new user"""
     # Check if email already exists
-    existing = db.query(User).filter(User.email == email).first()
+    existing = (await db.execute(select(User.id).where(User.email == email))).first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -168,85 +536,297 @@ def register(
     user = User(
         email=email,
         name=name,
-        password_hash=bcrypt.hash(password),
+        password_hash=await hash_password(password),
         role="user",
         is_active=True
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.execute(admin_stats.increment(total_users=1))
+    await db.commit()
+    await db.refresh(user)
     
     return {"success": True, "user_id": user.id, "message": "User registered successfully"}
 
 
 # ============ Prediction Endpoints ============
 
+def prediction_row(user_id, input_dict, result, model_version):
+    """Column values of the predictions row for one scored input."""
+    explanation = result.get("explanation") or {}
+    return {
+        "user_id": user_id,
+        "risk_level": result["risk_level"],
+        "dt_prediction": result["dt_prediction"],
+        "nn_prediction": result["nn_prediction"],
+        "dt_confidence": result["dt_confidence"],
+        "nn_confidence": result["nn_confidence"],
+        "final_confidence": result["final_confidence"],
+        "agreement": result["agreement"],
+        "input_data": input_dict,
+        "feature_importance": explanation.get("feature_importance"),
+        "decision_rules": explanation.get("rules"),
+        "model_version": model_version,
+        "created_at": datetime.utcnow()  # scoring time, even when written later
+    }
+
+
+async def save_predictions(db, rows):
+    """Persist scored requests: queued for the write-behind task, or inserted now."""
+    if prediction_writer is not None:
+        await prediction_writer.submit(rows)
+        return
+    await db.execute(insert(Prediction), rows)
+    await db.execute(admin_stats.increment(total_predictions=len(rows)))
+    await db.commit()
+
+
 @app.post("/predict")
-def predict_risk(data: PredictionInput, user_id: Optional[int] = None, db: Session = Depends(get_db)):
+async def predict_risk(data: PredictionInput, user_id: Optional[int] = None, db=Depends(get_session)):
     """
     Make a credit risk prediction using the hybrid model.
     Optionally saves the prediction to database if user_id is provided.
+    Concurrent calls are micro-batched into one vectorized model call.
     """
+    hm = require_model()
     input_dict = data.dict()
     
-    # Run prediction
-    pred_result = model.predict(input_dict)
-    
-    # Get explanation
-    explanation = model.explain(input_dict)
+    # Run prediction + explanation in a single pass
+    start = time.perf_counter()
+    try:
+        if batcher is not None:
+            result = await batcher.submit(hm, input_dict)
+        else:
+            result = await run_in_threadpool(hm.predict_and_explain, input_dict)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    shadow.submit(input_dict, result, (time.perf_counter() - start) * 1000)
+    # New dict: the shadow thread may still be reading `result`
+    result = {**result, "model_version": hm.version}
     
     # Save to database if user_id provided
     if user_id:
-        prediction = Prediction(
-            user_id=user_id,
-            risk_level=pred_result["risk_level"],
-            dt_prediction=pred_result["dt_prediction"],
-            nn_prediction=pred_result["nn_prediction"],
-            dt_confidence=pred_result["dt_confidence"],
-            nn_confidence=pred_result["nn_confidence"],
-            final_confidence=pred_result["final_confidence"],
-            agreement=pred_result["agreement"],
-            input_data=input_dict,
-            feature_importance=explanation.get("feature_importance"),
-            decision_rules=explanation.get("rules")
-        )
-        db.add(prediction)
-        db.commit()
+        await save_predictions(db, [prediction_row(user_id, input_dict, result, hm.version)])
     
-    return {
-        **pred_result,
-        "explanation": explanation
-    }
+    return result
+
+
+@app.post("/predict/batch")
+async def predict_risk_batch(data: List[PredictionInput], user_id: Optional[int] = None, db=Depends(get_session)):
+    """
+    Score many applicants in one vectorized model call.
+    Results are returned in the same order as the inputs.
+    Optionally bulk-saves the predictions if user_id is provided.
+    """
+    hm = require_model()
+    input_dicts = [item.dict() for item in data]
+    
+    try:
+        results = await run_in_threadpool(hm.predict_batch, input_dicts)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    for pred in results:
+        pred["model_version"] = hm.version
+    
+    # Save to database as one multi-row insert
+    if user_id and results:
+        await save_predictions(db, [
+            prediction_row(user_id, input_dict, pred, hm.version)
+            for pred, input_dict in zip(results, input_dicts)
+        ])
+    
+    return results
 
 
 @app.get("/model-info")
 def get_model_info():
     """Get information about the ML models"""
+    hm = require_model()
+    info = hm.model_info()
     return {
         "model_type": "Hybrid Decision Tree + Neural Network",
-        "dt_max_depth": model.dt_model.get_params().get('max_depth') if model.dt_model else "N/A",
-        "nn_layers": model.nn_model.hidden_layer_sizes if model.nn_model else "N/A",
+        "dt_max_depth": info["dt_max_depth"],
+        "nn_layers": info["nn_layers"],
+        "inference_engine": hm.engine,
+        "model_version": hm.version,
+        "nn_precision": hm.nn_precision,
         "version": "2.0.0"
     }
 
 
+@app.post("/admin/model/precision", dependencies=[Depends(require_admin)])
+def set_model_precision(precision: str, export: bool = False):
+    """
+    Switch the NN precision used for scoring (float64, float32 or int8).
+    With export=true the reduced weights are (re)exported and agreement-checked first.
+    The serving model is not modified: a copy of its version is loaded at the
+    new precision, warmed, then published in its place.
+    """
+    hm = require_model()
+    if registry_state["loading"] is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A model version is being loaded")
+    try:
+        candidate = registry.load(hm.version, engine=hm.engine)
+        report = None
+        if export and precision != "float64":
+            report = candidate.export_quantized_nn(precision)
+            if not report["activated"]:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=report)
+        else:
+            candidate.set_nn_precision(precision)
+    except (ValueError, RegistryError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    warm(candidate)
+    if not publish_model(candidate, replaces=hm):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The serving model changed, retry")
+    return report or {"precision": candidate.nn_precision, "activated": True}
+
+
+@app.get("/admin/cache-stats", dependencies=[Depends(require_admin)])
+def get_cache_stats():
+    """Hit/miss/eviction counters for the prediction cache"""
+    hm = require_model()
+    if hm.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "model_version": hm.version, **hm.cache.stats()}
+
+
+@app.get("/admin/hasher-stats", dependencies=[Depends(require_admin)])
+def get_hasher_stats():
+    """Queue depth, rejections and latency of the bcrypt process pool"""
+    return hasher.stats()
+
+
+@app.get("/admin/auth-stats", dependencies=[Depends(require_admin)])
+def get_auth_stats():
+    """Signing keys in use and the size of the revocation set"""
+    return signer.stats()
+
+
+@app.get("/admin/batching-stats", dependencies=[Depends(require_admin)])
+def get_batching_stats():
+    """Batch-size and queue-wait histograms of the /predict micro-batcher"""
+    if batcher is None:
+        return {"enabled": False}
+    return batcher.stats()
+
+
+@app.get("/admin/write-behind-stats", dependencies=[Depends(require_admin)])
+def get_write_behind_stats():
+    """Queue depth and flush size/latency of write-behind prediction inserts"""
+    if prediction_writer is None:
+        return {"enabled": False}
+    return prediction_writer.stats()
+
+
+@app.post("/admin/batching", dependencies=[Depends(require_admin)])
+def tune_batching(window_ms: Optional[float] = None, max_batch_size: Optional[int] = None, reset: bool = False):
+    """Tune the batching window / batch size at runtime (and optionally reset the histograms)."""
+    if batcher is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Micro-batching is disabled (PREDICT_BATCHING=0)")
+    if window_ms is not None:
+        if window_ms < 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="window_ms must be >= 0")
+        batcher.window_ms = window_ms
+    if max_batch_size is not None:
+        if max_batch_size < 1:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="max_batch_size must be >= 1")
+        batcher.max_batch_size = max_batch_size
+    if reset:
+        batcher.reset_stats()
+    return batcher.stats()
+
+
+# ============ Model Registry ============
+
+@app.get("/admin/models", dependencies=[Depends(require_admin)])
+def list_model_versions():
+    """Registered model versions, the active one and any load in progress"""
+    return {
+        "active": registry.active_version(),
+        "serving": model.version if model is not None else None,
+        "previous": registry.previous_version(),
+        "loading": registry_state["loading"],
+        "last_error": registry_state["last_error"],
+        "versions": registry.list_versions()
+    }
+
+
+@app.post("/admin/models/{version}/activate", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(require_admin)])
+def activate_model_version(version: str):
+    """
+    Load a registered version in the background and swap it in once warmed up.
+    Poll GET /admin/models to see when it is serving.
+    """
+    if version not in {entry["version"] for entry in registry.list_versions()}:
+        raise HTTPException(status_code=404, detail=f"Unknown model version '{version}'")
+    if not load_version_in_background(version):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Already loading {registry_state['loading']}")
+    return {"status": "loading", "version": version}
+
+
+@app.post("/admin/models/rollback", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(require_admin)])
+def rollback_model_version():
+    """Re-activate the previously active version (loaded in the background)."""
+    previous = registry.previous_version()
+    if previous is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="No previous model version to roll back to")
+    if not load_version_in_background(previous, rollback=True):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Already loading {registry_state['loading']}")
+    return {"status": "loading", "version": previous}
+
+
+# ============ Shadow Evaluation ============
+
+@app.get("/admin/shadow", dependencies=[Depends(require_admin)])
+def get_shadow_summary():
+    """Agreement, confusion (primary rows x shadow columns) and latency of the shadow model"""
+    return {"primary_version": model.version if model is not None else None, **shadow.summary()}
+
+
+@app.post("/admin/shadow/{version}", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(require_admin)])
+def start_shadow(version: str, sample_rate: Optional[float] = None):
+    """Load a registered version in the background and shadow a sample of /predict and /user-data."""
+    if version not in {entry["version"] for entry in registry.list_versions()}:
+        raise HTTPException(status_code=404, detail=f"Unknown model version '{version}'")
+    if sample_rate is not None:
+        if not 0.0 <= sample_rate <= 1.0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="sample_rate must be between 0 and 1")
+        shadow.sample_rate = sample_rate
+    load_shadow_in_background(version)
+    return {"status": "loading", "version": version, "sample_rate": shadow.sample_rate}
+
+
+@app.delete("/admin/shadow", dependencies=[Depends(require_admin)])
+def stop_shadow():
+    """Stop shadow evaluation and discard its queue"""
+    shadow.set_candidate(None)
+    return {"enabled": False}
+
+
 # ============ User Data Endpoints ============
 
 @app.get("/user-data/{email}")
-def get_user_data(email: str, db: Session = Depends(get_db)):
+async def get_user_data(email: str, claims=Depends(authenticate), db=Depends(get_session)):
     """
     Get user profile and prediction data for the dashboard.
     Used by regular users to view their own data.
     """
     # Find user
-    user = db.query(User).filter(User.email == email).first()
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     if not user:
         return {"error": "User not found"}
+    require_self_or_admin(claims, user.id)
     
-    # Get profile
-    profile = db.query(ApplicantProfile).filter(ApplicantProfile.user_id == user.id).first()
-    if not profile:
+    # Get profile together with its stored score (if any)
+    row = (await db.execute(
+        select(ApplicantProfile, ProfileScore)
+        .outerjoin(ProfileScore, ProfileScore.profile_id == ApplicantProfile.id)
+        .where(ApplicantProfile.user_id == user.id)
+    )).first()
+    if not row:
         return {"error": "Profile not found. Please complete your profile."}
+    profile, score = row
     
     # Build profile data for frontend
     profile_data = {
@@ -262,23 +842,44 @@ def get_user_data(email: str, db: Session = Depends(get_db)):
         "employment_type": (profile.employment_status or "employed").lower()
     }
     
-    # Run live prediction
+    # Serve the stored score while the profile and the model are unchanged
+    hm = require_model()
+    if profile_scores.is_current(score, profile, hm.scoring_version):
+        return {
+            "user_profile": profile_data,
+            "prediction_result": score.result
+        }
+
+    # Otherwise run a live prediction and store it for next time
     try:
         pred_input = profile.to_prediction_input()
-        prediction = model.predict(pred_input)
-        explanation = model.explain(pred_input)
-        result = {**prediction, "explanation": explanation}
+        start = time.perf_counter()
+        prediction = hm.predict_and_explain(pred_input)
+        shadow.submit(pred_input, prediction, (time.perf_counter() - start) * 1000)
     except Exception as e:
         print(f"Prediction error: {e}")
-        result = {
-            "risk_level": "Medium",
-            "dt_prediction": "Medium",
-            "nn_prediction": "Medium",
-            "final_confidence": 0.5,
-            "agreement": True,
-            "explanation": {"rules": [], "feature_importance": {}}
+        return {
+            "user_profile": profile_data,
+            "prediction_result": {
+                "risk_level": "Medium",
+                "dt_prediction": "Medium",
+                "nn_prediction": "Medium",
+                "final_confidence": 0.5,
+                "agreement": True,
+                "explanation": {"rules": [], "feature_importance": {}},
+                "model_version": hm.version
+            }
         }
     
+    # Same shape as the rows profile_scores.warm_up stores
+    result = {**prediction, "model_version": hm.version}
+    
+    profile_scores.store(db, profile, score, result, hm.scoring_version)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()  # a concurrent request stored it first
+    
     return {
         "user_profile": profile_data,
         "prediction_result": result
@@ -287,98 +888,104 @@ def get_user_data(email: str, db: Session = Depends(get_db)):
 
 # ============ Admin Endpoints ============
 
-@app.get("/admin/all-data")
-def get_all_data(db: Session = Depends(get_db)):
+@app.get("/admin/all-data", dependencies=[Depends(require_admin)])
+async def get_all_data(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    sort: str = "name",
+    order: Optional[str] = None,
+    risk: Optional[str] = None,
+    employment: Optional[str] = None,
+    min_income: Optional[float] = None,
+    max_income: Optional[float] = None,
+    search: Optional[str] = None,
+    db=Depends(get_session)
+):
     """
-    Get all user data for admin dashboard.
-    Returns users with their profiles in a format compatible with the frontend.
+    One page of users with their profiles for the admin dashboard.
+    Filtering, sorting and keyset pagination happen in a single joined query;
+    pass next_cursor back as `cursor` for the following page.
     """
-    # Query all users with profiles using a join
-    users = db.query(User).filter(User.role == "user").all()
-    
-    result = []
-    for user in users:
-        # Get profile
-        profile = db.query(ApplicantProfile).filter(ApplicantProfile.user_id == user.id).first()
-        
-        if profile:
-            result.append({
-                "id": user.id,
-                "user_id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "AnnualIncome": profile.annual_income,
-                "LoanAmount": profile.loan_amount,
-                "LengthOfCreditHistory": profile.length_of_credit_history,
-                "DebtToIncomeRatio": profile.debt_to_income_ratio,
-                "EmploymentStatus": profile.employment_status,
-                "RiskScore": profile.risk_score,
-                "Age": profile.age,
-                "NumberOfOpenCreditLines": profile.number_of_open_credit_lines
-            })
-        else:
-            # User without profile
-            result.append({
-                "id": user.id,
-                "user_id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "AnnualIncome": 0,
-                "LoanAmount": 0,
-                "LengthOfCreditHistory": 0,
-                "DebtToIncomeRatio": 0,
-                "EmploymentStatus": "Unknown",
-                "RiskScore": 50,
-                "Age": 0
-            })
-    
-    return result
+    try:
+        filters = admin_queries.filter_conditions(risk, employment, min_income, max_income, search)
+        statement, sort = admin_queries.applicants_query(filters, sort, order, cursor, limit + 1)
+    except admin_queries.InvalidQuery as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+    rows = (await db.execute(statement)).all()
+    total = await db.scalar(admin_queries.count_query(filters))
+
+    # One extra row tells us whether there is a next page
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = admin_queries.encode_cursor(admin_queries.sort_value(rows[-1], sort), rows[-1].id)
 
-@app.get("/admin/stats")
-def get_admin_stats(db: Session = Depends(get_db)):
-    """Get summary statistics for admin dashboard"""
-    from sqlalchemy import func
-    
-    total_users = db.query(User).filter(User.role == "user").count()
-    total_profiles = db.query(ApplicantProfile).count()
-    total_predictions = db.query(Prediction).count()
-    
-    # Average income
-    avg_income = db.query(func.avg(ApplicantProfile.annual_income)).scalar() or 0
-    
-    # Average loan amount
-    avg_loan = db.query(func.avg(ApplicantProfile.loan_amount)).scalar() or 0
-    
-    # Risk distribution
-    low_risk = db.query(ApplicantProfile).filter(ApplicantProfile.risk_score < 40).count()
-    medium_risk = db.query(ApplicantProfile).filter(
-        ApplicantProfile.risk_score >= 40,
-        ApplicantProfile.risk_score < 70
-    ).count()
-    high_risk = db.query(ApplicantProfile).filter(ApplicantProfile.risk_score >= 70).count()
-    
     return {
-        "total_users": total_users,
-        "total_profiles": total_profiles,
-        "total_predictions": total_predictions,
-        "avg_income": round(avg_income, 2),
-        "avg_loan": round(avg_loan, 2),
-        "risk_distribution": {
-            "low": low_risk,
-            "medium": medium_risk,
-            "high": high_risk
-        }
+        "items": [admin_queries.row_to_dict(row) for row in rows],
+        "total": total,
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 
-@app.post("/add-applicant")
-def add_applicant(applicant: NewApplicant, db: Session = Depends(get_db)):
+@app.get("/admin/export", dependencies=[Depends(require_admin)])
+async def export_all_data(
+    format: str = "ndjson",
+    gzip: bool = False,
+    chunk_size: int = Query(1000, ge=100, le=10000),
+    sort: str = "id",
+    order: Optional[str] = None,
+    risk: Optional[str] = None,
+    employment: Optional[str] = None,
+    min_income: Optional[float] = None,
+    max_income: Optional[float] = None,
+    search: Optional[str] = None
+):
+    """
+    Stream every matching applicant as NDJSON or CSV (optionally gzipped).
+    Rows come off a server-side cursor chunk by chunk, so memory stays flat
+    and the download starts before the query has finished.
+    """
+    if format not in exports.FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown format '{format}' (expected one of {', '.join(exports.FORMATS)})"
+        )
+    try:
+        filters = admin_queries.filter_conditions(risk, employment, min_income, max_income, search)
+        statement, _ = admin_queries.applicants_query(filters, sort, order)
+    except admin_queries.InvalidQuery as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    filename = f"applicants.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        exports.export_chunks(stream_rows(statement, chunk_size), format, gzip),
+        media_type="application/gzip" if gzip else exports.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.get("/admin/stats", dependencies=[Depends(require_admin)])
+async def get_admin_stats(db=Depends(get_session)):
+    """
+    Get summary statistics for admin dashboard.
+    Reads the incrementally maintained summary row; before the first
+    reconciliation has written it, falls back to one full single-pass count.
     """
-    Add a new applicant with user account and profile.
+    counters = await admin_stats.read_summary(db)
+    if counters is None:
+        counters = await admin_stats.count_now(db)
+    return admin_stats.to_response(counters)
+
+
+@app.post("/add-applicant", dependencies=[Depends(require_admin)])
+async def add_applicant(applicant: NewApplicant, db=Depends(get_session)):
+    """
+    Add a new applicant with user account and profile (admin only).
     """
     # Check if email already exists
-    existing = db.query(User).filter(User.email == applicant.email).first()
+    existing = (await db.execute(select(User.id).where(User.email == applicant.email))).first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -389,12 +996,13 @@ def add_applicant(applicant: NewApplicant, db: Session = Depends(get_db)):
     user = User(
         email=applicant.email,
         name=applicant.name,
-        password_hash=bcrypt.hash(applicant.password),
+        password_hash=await hash_password(applicant.password),
         role="user",
         is_active=True
     )
     db.add(user)
-    db.flush()  # Get user.id
+    await db.flush()  # Get user.id
+    user_id = user.id
     
     # Map employment type
     emp_status = applicant.employment_type.title()
@@ -403,7 +1011,7 @@ def add_applicant(applicant: NewApplicant, db: Session = Depends(get_db)):
     
     # Create profile
     profile = ApplicantProfile(
-        user_id=user.id,
+        user_id=user_id,
         age=applicant.age,
         annual_income=applicant.income,
         employment_status=emp_status,
@@ -415,33 +1023,52 @@ def add_applicant(applicant: NewApplicant, db: Session = Depends(get_db)):
         risk_score=applicant.risk_score
     )
     db.add(profile)
-    db.commit()
+    await db.execute(admin_stats.increment(
+        total_users=1,
+        **admin_stats.profile_delta(applicant.income, applicant.loan_amount, applicant.risk_score)
+    ))
+    await db.commit()
     
     print(f"✅ Added new applicant: {applicant.name} ({applicant.email})")
     
     return {
         "success": True,
-        "user_id": user.id,
+        "user_id": user_id,
         "message": f"Applicant {applicant.name} added successfully"
     }
 
 
-@app.delete("/admin/user/{user_id}")
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+@app.delete("/admin/user/{user_id}", dependencies=[Depends(require_admin)])
+async def delete_user(user_id: int, db=Depends(get_session)):
     """Delete a user and their associated data"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Delete profile
-    db.query(ApplicantProfile).filter(ApplicantProfile.user_id == user_id).delete()
+    profiles = (await db.execute(
+        select(ApplicantProfile.annual_income, ApplicantProfile.loan_amount, ApplicantProfile.risk_score)
+        .where(ApplicantProfile.user_id == user_id)
+    )).all()
+    await db.execute(delete(ProfileScore).where(
+        ProfileScore.profile_id.in_(select(ApplicantProfile.id).where(ApplicantProfile.user_id == user_id))
+    ))
+    await db.execute(delete(ApplicantProfile).where(ApplicantProfile.user_id == user_id))
     
     # Delete predictions
-    db.query(Prediction).filter(Prediction.user_id == user_id).delete()
+    deleted_predictions = (await db.execute(delete(Prediction).where(Prediction.user_id == user_id))).rowcount
+    
+    # Take the removed rows out of the /admin/stats summary
+    deltas = {"total_users": -1 if user.role == "user" else 0, "total_predictions": -deleted_predictions}
+    for income, loan, risk in profiles:
+        for name, value in admin_stats.profile_delta(income, loan, risk, sign=-1).items():
+            deltas[name] = deltas.get(name, 0) + value
+    await db.execute(admin_stats.increment(**deltas))
     
-    # Delete user
-    db.delete(user)
-    db.commit()
+    # Delete user and invalidate any tokens it still holds
+    await db.delete(user)
+    db.add(signer.revoke_user(user_id))
+    await db.commit()
     
     return {"success": True, "message": f"User {user_id} deleted"}
 
@@ -449,11 +1076,51 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
 # ============ Prediction History ============
 
 @app.get("/predictions/{user_id}")
-def get_user_predictions(user_id: int, db: Session = Depends(get_db)):
-    """Get prediction history for a user"""
-    predictions = db.query(Prediction).filter(
-        Prediction.user_id == user_id
-    ).order_by(Prediction.created_at.desc()).limit(10).all()
+async def get_user_predictions(
+    user_id: int,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    before: Optional[str] = None,
+    claims=Depends(authenticate),
+    db=Depends(get_session)
+):
+    """
+    Get prediction history for a user, newest first, as a list (the default
+    page is the 10 most recent, as before paging existed). When older
+    predictions exist, the X-Next-Cursor response header holds a cursor to
+    pass back as `before`; each page is an index range scan on
+    (user_id, created_at, id) and never loads the JSON columns.
+    """
+    require_self_or_admin(claims, user_id)
+    statement = select(
+        Prediction.id,
+        Prediction.risk_level,
+        Prediction.final_confidence,
+        Prediction.agreement,
+        Prediction.model_version,
+        Prediction.created_at
+    ).where(Prediction.user_id == user_id)
+
+    if before:
+        try:
+            created_at, prediction_id = admin_queries.decode_cursor(before, (str,))
+            created_at = datetime.fromisoformat(created_at)
+        except (admin_queries.InvalidQuery, TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed cursor")
+        # The plain <= bound lets the planner range-scan the index from the cursor
+        statement = statement.where(
+            Prediction.created_at <= created_at,
+            or_(Prediction.created_at < created_at, Prediction.id < prediction_id)
+        )
+
+    # One extra row tells us whether there is an older page
+    predictions = (await db.execute(
+        statement.order_by(Prediction.created_at.desc(), Prediction.id.desc()).limit(limit + 1)
+    )).all()
+    if len(predictions) > limit:
+        predictions = predictions[:limit]
+        last = predictions[-1]
+        response.headers["X-Next-Cursor"] = admin_queries.encode_cursor(last.created_at.isoformat(), last.id)
     
     return [
         {
@@ -461,6 +1128,7 @@ def get_user_predictions(user_id: int, db: Session = Depends(get_db)):
             "risk_level": p.risk_level,
             "confidence": p.final_confidence,
             "agreement": p.agreement,
+            "model_version": p.model_version,
             "created_at": p.created_at.isoformat()
         }
         for p in predictions
@@ -0,0 +1,107 @@
+"""
+Schema Migrations for HICRA
+create_all() only creates missing tables, so nullable columns and indexes
+added to the models later never reach an existing database by themselves.
+This is the explicit upgrade step for that: it creates missing tables, then
+adds the missing nullable columns and indexes with SQLAlchemy DDL constructs
+(identifiers quoted and types compiled for the target dialect). No data is
+touched and re-running it is a no-op.
+
+The API does not migrate on startup; it only warns when changes are pending.
+
+Usage:
+    python migrate.py            # apply pending changes
+    python migrate.py --check    # list pending changes, exit 1 if there are any
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateIndex, ExecutableDDLElement
+
+
+class AddColumn(ExecutableDDLElement):
+    """ALTER TABLE ... ADD COLUMN for a Column declared on a model Table."""
+
+    def __init__(self, column):
+        self.column = column
+
+
+@compiles(AddColumn)
+def _compile_add_column(element, compiler, **kw):
+    table = compiler.preparer.format_table(element.column.table)
+    return f"ALTER TABLE {table} ADD COLUMN {compiler.get_column_specification(element.column)}"
+
+
+def _describe(change):
+    if isinstance(change, AddColumn):
+        return f"column {change.column.table.name}.{change.column.name}"
+    return f"index {change.element.name}"
+
+
+def pending_changes(bind, metadata=None):
+    """
+    DDL elements that bring existing tables in line with the models:
+    AddColumn for each missing nullable column, then CreateIndex for each
+    missing index. Missing NOT NULL columns need a hand-written migration and
+    are reported as a second list of "table.column" names.
+    """
+    if metadata is None:
+        from models_db import Base  # Import here to avoid circular imports
+        metadata = Base.metadata
+
+    inspector = inspect(bind)
+    changes, manual = [], []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue  # create_all() creates it complete
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for column in table.columns:
+            if column.name in columns:
+                continue
+            if column.nullable:
+                changes.append(AddColumn(column))
+            else:
+                manual.append(f"{table.name}.{column.name}")
+        changes.extend(CreateIndex(index) for index in table.indexes if index.name not in indexes)
+    return changes, manual
+
+
+def upgrade(bind, metadata=None):
+    """Create missing tables and apply pending_changes() in one transaction. Returns the changes."""
+    if metadata is None:
+        from models_db import Base  # Import here to avoid circular imports
+        metadata = Base.metadata
+
+    with bind.begin() as connection:
+        metadata.create_all(bind=connection)
+        changes, manual = pending_changes(connection, metadata)
+        for change in changes:
+            connection.execute(change)
+            print(f"✅ Added {_describe(change)}")
+    for name in manual:
+        print(f"⚠️  {name} is NOT NULL and missing; it needs a manual migration")
+    return changes
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="Bring an existing HICRA database up to the current schema")
+    parser.add_argument("--check", action="store_true", help="only list pending changes")
+    args = parser.parse_args()
+
+    if args.check:
+        changes, manual = pending_changes(engine)
+        for change in changes:
+            print(f"   pending: {_describe(change)}")
+        for name in manual:
+            print(f"   manual:  {name} (NOT NULL)")
+        print(f"{len(changes) + len(manual)} pending schema change(s)")
+        sys.exit(1 if changes or manual else 0)
+
+    changes = upgrade(engine)
+    print(f"✅ Schema up to date ({len(changes)} change(s) applied)")
@@ -1,74 +1,138 @@
-import pandas as pd
 import numpy as np
-from sklearn.tree import DecisionTreeClassifier, export_text
-from sklearn.neural_network import MLPClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import accuracy_score
-import joblib
 import os
 
+# pandas, sklearn and joblib are imported inside the methods that need them
+# (training, pickle loading, the sklearn engine) so that serving from the
+# model artifact never pays their import time.
+
+from inference import (
+    NumpyInferenceEngine, FEATURE_ORDER, EMPLOYMENT_TYPE_MAP, NN_PRECISIONS,
+    build_prediction, quantize_mlp, reduced_layers
+)
+from prediction_cache import PredictionCache, make_cache_key
+from tree_compiler import compile_tree, COMPILED_TREE_FILE
+from artifacts import (
+    ARTIFACT_FILE, ArtifactError, read_artifact, write_artifact, engine_arrays, engine_kwargs
+)
+
+# "numpy" (default) scores with the NumPy engine, "sklearn" with the estimators directly
+INFERENCE_ENGINES = ("numpy", "sklearn")
+
+
 class HybridModel:
-    def __init__(self, model_dir="models"):
+    def __init__(self, model_dir="models", engine=None):
         self.dt_model = None
         self.nn_model = None
         self.scaler = None
+        self.explanation_table = None
         # self.label_encoders = {} 
         self.model_dir = model_dir
+        self.engine = engine or os.getenv("INFERENCE_ENGINE", "numpy")
+        if self.engine not in INFERENCE_ENGINES:
+            raise ValueError(f"Unknown inference engine: {self.engine}")
+        self._numpy_engine = None
+        self.version = None
+        # Header of the memory-mapped artifact when loaded from one
+        self.artifact_header = None
+        # Score the DT leg with the generated module from tree_compiler.py
+        self.use_compiled_tree = os.getenv("COMPILED_TREE", "1") == "1"
+        # MLP precision for the NumPy engine; reduced modes need export_quantized_nn() first
+        self.nn_precision = os.getenv("NN_PRECISION", "float64")
+        if self.nn_precision not in NN_PRECISIONS:
+            raise ValueError(f"Unknown NN precision: {self.nn_precision}")
+
+        # Prediction cache in front of predict_and_explain (size 0 disables it)
+        cache_size = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+        cache_ttl = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+        self.cache = PredictionCache(max_size=cache_size, ttl=cache_ttl) if cache_size > 0 else None
         if not os.path.exists(self.model_dir):
             os.makedirs(self.model_dir)
 
-    def generate_synthetic_data(self, n_samples=1000):
+    def generate_synthetic_data(self, n_samples=1000, seed=42):
         """
         Generates a synthetic dataset mimicking credit risk factors.
         """
-        np.random.seed(42)
-        data = pd.DataFrame({
-            'age': np.random.randint(18, 70, n_samples),
-            'income': np.random.normal(50000, 15000, n_samples).astype(int),
-            'credit_history_length': np.random.randint(0, 20, n_samples),
-            'existing_loans': np.random.randint(0, 5, n_samples),
-            'debt_to_income_ratio': np.random.uniform(0.1, 0.9, n_samples),
-            'loan_amount': np.random.randint(1000, 50000, n_samples),
-            'repayment_duration': np.random.randint(6, 60, n_samples),
-            'employment_type': np.random.choice(['employed', 'self-employed', 'unemployed'], n_samples)
-        })
-        
-        # Simple logical rules for target generation to ensure interpretability
-        # Risk: 0 (Low), 1 (Medium), 2 (High)
-        def assign_risk(row):
-            risk_score = 0
-            if row['income'] < 30000: risk_score += 2
-            if row['debt_to_income_ratio'] > 0.5: risk_score += 2
-            if row['employment_type'] == 'unemployed': risk_score += 3
-            if row['credit_history_length'] < 2: risk_score += 1
-            if row['age'] < 22: risk_score += 1
-            
-            if risk_score <= 1: return 0 # Low
-            elif risk_score <= 3: return 1 # Medium
-            else: return 2 # High
+        import pandas as pd
 
-        data['risk_classification'] = data.apply(assign_risk, axis=1)
+        rng = np.random.RandomState(seed)
+        columns = _synthetic_columns(rng, n_samples)
+        risk = assign_risk(columns)
+
+        data = pd.DataFrame(columns)
+        data['employment_type'] = EMPLOYMENT_TYPES[columns['employment_type']]
+        data['risk_classification'] = risk
         return data
 
-    def train(self):
+    def iter_synthetic_chunks(self, n_samples, chunk_size=100000, seed=42, as_frame=True):
+        """
+        Yields the synthetic dataset in fixed-size blocks so arbitrarily large
+        datasets can be produced in bounded memory. Chunk i is drawn from its
+        own seed derived from (seed, i), so every block is reproducible on its own.
+        as_frame=True yields DataFrames like generate_synthetic_data();
+        as_frame=False yields (X float32 in FEATURE_ORDER, y) arrays ready for training.
+        """
+        for index, start in enumerate(range(0, n_samples, chunk_size)):
+            size = min(chunk_size, n_samples - start)
+            rng = np.random.RandomState(_chunk_seed(seed, index))
+            columns = _synthetic_columns(rng, size)
+            risk = assign_risk(columns)
+
+            if as_frame:
+                import pandas as pd
+
+                data = pd.DataFrame(columns)
+                data['employment_type'] = EMPLOYMENT_TYPES[columns['employment_type']]
+                data['risk_classification'] = risk
+                yield data
+            else:
+                X = np.empty((size, len(FEATURE_ORDER)), dtype=np.float32)
+                for i, name in enumerate(FEATURE_ORDER):
+                    X[:, i] = columns[name]
+                yield X, risk
+
+    def _synthetic_training_arrays(self, n_samples, chunk_size, seed=42):
+        """Fill one preallocated float32 matrix chunk by chunk (no per-chunk DataFrames)."""
+        X = np.empty((n_samples, len(FEATURE_ORDER)), dtype=np.float32)
+        y = np.empty(n_samples, dtype=np.int64)
+        start = 0
+        for X_chunk, y_chunk in self.iter_synthetic_chunks(n_samples, chunk_size, seed, as_frame=False):
+            X[start:start + len(X_chunk)] = X_chunk
+            y[start:start + len(y_chunk)] = y_chunk
+            start += len(X_chunk)
+        return X, y
+
+    def train(self, n_samples=1000, chunk_size=100000):
+        import pandas as pd
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.neural_network import MLPClassifier
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+
         print("Generating synthetic data...")
-        df = self.generate_synthetic_data()
-        
-        # Preprocessing
-        # For simplicity in this skeleton, we handle categorical encoding manually or via LabelEncoder later
-        # Sticking to numericals for the prototype for now or simple mapping
-        df['employment_type'] = df['employment_type'].map({'employed': 0, 'self-employed': 1, 'unemployed': 2})
-        
-        X = df.drop('risk_classification', axis=1)
-        y = df['risk_classification']
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        if n_samples <= chunk_size:
+            df = self.generate_synthetic_data(n_samples)
+            
+            # Preprocessing
+            # For simplicity in this skeleton, we handle categorical encoding manually or via LabelEncoder later
+            # Sticking to numericals for the prototype for now or simple mapping
+            df['employment_type'] = df['employment_type'].map(EMPLOYMENT_TYPE_MAP)
+            
+            X = df.drop('risk_classification', axis=1)
+            y = df['risk_classification']
+            
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        else:
+            # Large datasets: chunked generation into one float32 matrix.
+            # Rows are i.i.d., so a contiguous 80/20 split avoids copying.
+            X, y = self._synthetic_training_arrays(n_samples, chunk_size)
+            n_train = int(n_samples * 0.8)
+            X_train = pd.DataFrame(X[:n_train], columns=FEATURE_ORDER, copy=False)
+            y_train = y[:n_train]
+            print(f"   {n_samples:,} rows generated in {chunk_size:,}-row chunks")
         
         # Scale data
         self.scaler = StandardScaler()
         X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
         
         # 1. Train Decision Tree
         print("Training Decision Tree...")
@@ -81,36 +145,231 @@ class HybridModel:
         self.nn_model = MLPClassifier(hidden_layer_sizes=(16, 8), activation='relu', solver='adam', max_iter=500, random_state=42)
         self.nn_model.fit(X_train_scaled, y_train)
         
-        # Save models
+        self.save_models()
+
+    def save_models(self):
+        """Persist the fitted estimators and rebuild the derived inference state."""
+        import joblib
+
         joblib.dump(self.dt_model, os.path.join(self.model_dir, "dt_model.pkl"))
         joblib.dump(self.scaler, os.path.join(self.model_dir, "scaler.pkl"))
         joblib.dump(self.nn_model, os.path.join(self.model_dir, "nn_model.pkl"))
         print("Models saved.")
+        self._refresh_derived_state()
+        self.save_artifact()
 
     def load(self):
+        """
+        Load the models. The NumPy engine prefers the memory-mapped artifact
+        (no sklearn import or unpickling); the pickles are used for the sklearn
+        engine, or when the artifact is missing, stale or corrupt.
+        """
+        if self.engine == "numpy" and self._load_artifact():
+            return
+
+        self.load_estimators()
+        self._refresh_derived_state()
+        if self.engine == "numpy":
+            # Next worker/restart can mmap instead of unpickling
+            self.save_artifact()
+
+    def load_estimators(self):
+        """Unpickle the fitted sklearn estimators."""
+        import joblib
+
         self.dt_model = joblib.load(os.path.join(self.model_dir, "dt_model.pkl"))
         self.scaler = joblib.load(os.path.join(self.model_dir, "scaler.pkl"))
         self.nn_model = joblib.load(os.path.join(self.model_dir, "nn_model.pkl"))
 
-    def predict(self, input_data):
+    # ============ Flat Artifact ============
+
+    def _artifact_path(self):
+        return os.path.join(self.model_dir, ARTIFACT_FILE)
+
+    def save_artifact(self):
+        """Write the mmap-able artifact next to the pickles."""
+        metadata = {**self.model_info(), "model_version": self.version}
+        write_artifact(self._artifact_path(), engine_arrays(self._numpy_engine), metadata)
+
+    def _load_artifact(self):
+        """Build the engine from the artifact; returns False if it cannot be used."""
+        path = self._artifact_path()
+        if not os.path.exists(path):
+            return False
+
+        # Pickles overwritten after the artifact was written take precedence
+        artifact_mtime = os.path.getmtime(path)
+        for name in ("dt_model.pkl", "scaler.pkl", "nn_model.pkl"):
+            pkl_path = os.path.join(self.model_dir, name)
+            if os.path.exists(pkl_path) and os.path.getmtime(pkl_path) > artifact_mtime:
+                print(f"ℹ️  {name} is newer than {ARTIFACT_FILE}, loading pickles instead")
+                return False
+
+        try:
+            arrays, header = read_artifact(path)
+            engine = NumpyInferenceEngine(**engine_kwargs(arrays))
+        except (ArtifactError, KeyError, ValueError) as e:
+            # KeyError/ValueError: sections missing or of the wrong shape
+            print(f"⚠️  Could not use model artifact: {e!r}")
+            return False
+
+        self.artifact_header = header
+        self._refresh_derived_state(engine)
+        return True
+
+    def model_info(self):
+        """Model hyperparameters, from the estimators or the artifact header."""
+        if self.dt_model is not None and self.nn_model is not None:
+            return {
+                "dt_max_depth": self.dt_model.get_params().get('max_depth'),
+                "nn_layers": list(self.nn_model.hidden_layer_sizes)
+            }
+        metadata = self.artifact_header["metadata"] if self.artifact_header else {}
+        return {
+            "dt_max_depth": metadata.get("dt_max_depth", "N/A"),
+            "nn_layers": metadata.get("nn_layers", "N/A")
+        }
+
+    def _refresh_derived_state(self, engine=None):
+        """Rebuild everything derived from the fitted models (called after train/load)."""
+        if engine is None:
+            engine = NumpyInferenceEngine.from_sklearn(self.dt_model, self.scaler, self.nn_model)
+        self._numpy_engine = engine
+        if self.use_compiled_tree:
+            engine = self._numpy_engine
+            self._numpy_engine.use_compiled_tree(compile_tree(
+                engine.feature, engine.threshold, engine.children_left, engine.children_right,
+                os.path.join(self.model_dir, COMPILED_TREE_FILE)
+            ))
+        self.explanation_table = self._numpy_engine.explanations
+        self.version = self._numpy_engine.fingerprint()
+        if self.nn_precision != "float64":
+            try:
+                self.set_nn_precision(self.nn_precision)
+            except ValueError as e:
+                print(f"⚠️  {e}. Falling back to float64 NN inference.")
+                self.nn_precision = "float64"
+        if self.cache is not None:
+            self.cache.clear()
+
+    # ============ Reduced-Precision NN ============
+
+    @property
+    def scoring_version(self):
         """
-        Predicts risk using both DT and NN.
-        input_data: dict of values
+        Model version plus the NN precision when it is reduced: the key for
+        anything derived from this model's outputs (prediction cache, stored
+        profile scores), since float32/int8 can score differently.
+        """
+        if self.nn_precision == "float64":
+            return self.version
+        return f"{self.version}/{self.nn_precision}"
+
+    def _quantized_nn_path(self, precision):
+        return os.path.join(self.model_dir, f"nn_{precision}.npz")
+
+    def export_quantized_nn(self, precision="float32", min_agreement=None, n_samples=5000, seed=2024):
+        """
+        Export float32 or int8 NN weights and check class agreement with the
+        float64 model on a held-out synthetic set (different seed from training).
+        The weights are activated only if agreement >= min_agreement.
+        """
+        if self._numpy_engine is None:
+            self.load()
+        if min_agreement is None:
+            min_agreement = float(os.getenv("NN_MIN_AGREEMENT", "0.99"))
+
+        weights = quantize_mlp(self._numpy_engine.coefs, self._numpy_engine.intercepts, precision)
+
+        df = self.generate_synthetic_data(n_samples, seed=seed)
+        df['employment_type'] = df['employment_type'].map(EMPLOYMENT_TYPE_MAP)
+        X = df[FEATURE_ORDER].to_numpy(dtype=np.float64)
+
+        engine = self._numpy_engine
+        reference = np.argmax(engine.nn_predict_proba_float64(X), axis=1)
+        candidate = np.argmax(engine.nn_predict_proba_reduced(X, reduced_layers(weights)), axis=1)
+        agreement = float(np.mean(candidate == reference))
+
+        np.savez(
+            self._quantized_nn_path(precision),
+            **weights,
+            agreement=np.array(agreement),
+            source_version=np.array(self.version)
+        )
+        report = {
+            "precision": precision,
+            "agreement": round(agreement, 4),
+            "min_agreement": min_agreement,
+            "samples": n_samples,
+            "activated": agreement >= min_agreement
+        }
+        if report["activated"]:
+            self.set_nn_precision(precision, min_agreement)
+            print(f"✅ {precision} NN weights activated (agreement {agreement:.4f})")
+        else:
+            print(f"❌ {precision} NN weights rejected: agreement {agreement:.4f} < {min_agreement}")
+        return report
+
+    def set_nn_precision(self, precision, min_agreement=None):
+        """
+        Runtime switch for the precision used by predict/predict_batch.
+        Reduced precisions load the weights written by export_quantized_nn()
+        and are refused if they were exported from another model or failed
+        the agreement check.
         """
-        if self.dt_model is None or self.nn_model is None:
+        if precision not in NN_PRECISIONS:
+            raise ValueError(f"Unknown NN precision: {precision}")
+        if self._numpy_engine is None:
             self.load()
 
+        if precision == "float64":
+            self._numpy_engine.use_nn_weights(None)
+        else:
+            if min_agreement is None:
+                min_agreement = float(os.getenv("NN_MIN_AGREEMENT", "0.99"))
+            path = self._quantized_nn_path(precision)
+            if not os.path.exists(path):
+                raise ValueError(f"No exported {precision} NN weights at {path}")
+            with np.load(path) as data:
+                weights = {key: data[key] for key in data.files}
+            if str(weights["source_version"]) != self.version:
+                raise ValueError(f"{path} was exported from a different model version")
+            if float(weights["agreement"]) < min_agreement:
+                raise ValueError(
+                    f"{precision} NN agreement {float(weights['agreement']):.4f} is below {min_agreement}"
+                )
+            self._numpy_engine.use_nn_weights(weights)
+
+        self.nn_precision = precision
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _encode_frame(self, input_data):
+        """Build the one-row feature frame used by the sklearn engine."""
+        import pandas as pd
+
         # Convert input dict to DataFrame
         df = pd.DataFrame([input_data])
         # Map categorical
-        df['employment_type'] = df['employment_type'].map({'employed': 0, 'self-employed': 1, 'unemployed': 2})
+        df['employment_type'] = df['employment_type'].map(EMPLOYMENT_TYPE_MAP)
         
         # Ensure column order matches training
-        # For prototype, we assume input keys match training columns. 
-        # In production, enforce column order explicitly.
-        feature_order = ['age', 'income', 'credit_history_length', 'existing_loans', 'debt_to_income_ratio', 'loan_amount', 'repayment_duration', 'employment_type']
-        X = df[feature_order]
-        
+        return df[FEATURE_ORDER]
+
+    def predict(self, input_data):
+        """
+        Predicts risk using both DT and NN.
+        input_data: dict of values
+        """
+        if self._numpy_engine is None:
+            self.load()
+
+        if self.engine == "numpy":
+            return self._numpy_engine.predict(input_data)
+
+        return self._predict_frame(self._encode_frame(input_data))
+
+    def _predict_frame(self, X):
         # DT Prediction
         dt_pred_class = self.dt_model.predict(X)[0]
         dt_conf = float(np.max(self.dt_model.predict_proba(X))) # DT confidence is usually 1.0 (pure leaf) or fraction
@@ -136,63 +395,187 @@ class HybridModel:
         # For this "Interpretability First" requirement, I will make DT the primary driver for the 'Risk Level' 
         # but show NN as a second opinion.
         
-        final_risk = dt_pred_class # 0, 1, 2
-        
-        risk_map = {0: "Low", 1: "Medium", 2: "High"}
-        
-        return {
-            "risk_level": risk_map[final_risk],
-            "dt_prediction": risk_map[dt_pred_class],
-            "nn_prediction": risk_map[nn_pred_class],
-            "dt_confidence": round(dt_conf, 2),
-            "nn_confidence": round(nn_conf, 2),
-            "agreement": bool(dt_pred_class == nn_pred_class),
-            "final_confidence": round((dt_conf + nn_conf) / 2, 2) # Weighted average
-        }
+        return build_prediction(dt_pred_class, dt_conf, nn_pred_class, nn_conf)
+
+    def predict_batch(self, rows):
+        """
+        Predicts risk for a list of input dicts in one vectorized pass.
+        Returns one prediction dict per row, in input order.
+        """
+        if self._numpy_engine is None:
+            self.load()
+
+        if self.engine == "numpy":
+            return self._numpy_engine.predict_batch(rows)
+
+        if not rows:
+            return []
+        import pandas as pd
+
+        df = pd.DataFrame(rows)
+        df['employment_type'] = df['employment_type'].map(EMPLOYMENT_TYPE_MAP)
+        X = df[FEATURE_ORDER]
+
+        dt_proba = self.dt_model.predict_proba(X)
+        dt_pred_class = self.dt_model.classes_[np.argmax(dt_proba, axis=1)]
+        dt_conf = dt_proba.max(axis=1)
+
+        nn_pred_proba = self.nn_model.predict_proba(self.scaler.transform(X))
+        nn_pred_class = np.argmax(nn_pred_proba, axis=1)
+        nn_conf = nn_pred_proba.max(axis=1)
+
+        return [
+            build_prediction(*values)
+            for values in zip(dt_pred_class.tolist(), dt_conf.tolist(),
+                              nn_pred_class.tolist(), nn_conf.tolist())
+        ]
+
+    def predict_and_explain_batch(self, rows):
+        """
+        predict_and_explain for many inputs. Cache hits are served directly and
+        all misses are scored in one vectorized call. Results keep the input order.
+        """
+        if self._numpy_engine is None:
+            self.load()
+        if self.cache is None:
+            return self._predict_and_explain_batch(rows)
+
+        keys = [make_cache_key(row, self.scoring_version) for row in rows]
+        results = [self.cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            scored = self._predict_and_explain_batch([rows[i] for i in misses])
+            for i, result in zip(misses, scored):
+                self.cache.put(keys[i], result)
+                results[i] = result
+        return [_copy_result(result) for result in results]
+
+    def _predict_and_explain_batch(self, rows):
+        if self.engine == "numpy":
+            return self._numpy_engine.predict_and_explain_batch(rows)
+        if not rows:
+            return []
+
+        import pandas as pd
+
+        df = pd.DataFrame(rows)
+        df['employment_type'] = df['employment_type'].map(EMPLOYMENT_TYPE_MAP)
+        leaves = self.dt_model.apply(df[FEATURE_ORDER])
+        return [
+            {**prediction, "explanation": self.explanation_table.lookup(int(leaf))}
+            for prediction, leaf in zip(self.predict_batch(rows), leaves)
+        ]
 
     def explain(self, input_data):
         """
         Returns feature importance and decision path.
         """
-        if self.dt_model is None:
+        if self._numpy_engine is None:
             self.load()
-            
-        df = pd.DataFrame([input_data])
-        df['employment_type'] = df['employment_type'].map({'employed': 0, 'self-employed': 1, 'unemployed': 2})
-        feature_order = ['age', 'income', 'credit_history_length', 'existing_loans', 'debt_to_income_ratio', 'loan_amount', 'repayment_duration', 'employment_type']
-        X = df[feature_order]
-        
-        # Feature Importance
-        importances = self.dt_model.feature_importances_
-        feature_imp = dict(zip(feature_order, [round(float(x), 4) for x in importances]))
-        
-        # Rule Path
-        # We can use export_text to get a text representation, but for specific instance path:
-        node_indicator = self.dt_model.decision_path(X)
-        leaf_id = self.dt_model.apply(X)[0]
-        feature = self.dt_model.tree_.feature
-        threshold = self.dt_model.tree_.threshold
-        
-        sample_id = 0
-        node_index = node_indicator.indices[node_indicator.indptr[sample_id]:node_indicator.indptr[sample_id + 1]]
-        
-        rules = []
-        for node_id in node_index:
-            if leaf_id == node_id:
-                continue
-            
-            if (X.iloc[0, feature[node_id]] <= threshold[node_id]):
-                threshold_sign = "<="
-            else:
-                threshold_sign = ">"
-            
-            rules.append(f"{feature_order[feature[node_id]]} {threshold_sign} {threshold[node_id]:.2f}")
-            
+
+        if self.engine == "numpy":
+            return self._numpy_engine.explain(input_data)
+
+        return self._explain_frame(self._encode_frame(input_data))
+
+    def _explain_frame(self, X):
+        # Rule paths are precomputed per leaf, so explaining is apply + lookup
+        leaf_id = int(self.dt_model.apply(X)[0])
+        return self.explanation_table.lookup(leaf_id)
+
+    def predict_and_explain(self, input_data):
+        """
+        Fused predict + explain: encodes the input once and walks the tree once.
+        Returns the prediction dict with an "explanation" entry.
+        Repeated inputs are served from the prediction cache when it is enabled.
+        """
+        if self._numpy_engine is None:
+            self.load()
+
+        if self.cache is None:
+            return self._predict_and_explain(input_data)
+
+        key = make_cache_key(input_data, self.scoring_version)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._predict_and_explain(input_data)
+            self.cache.put(key, result)
+        return _copy_result(result)
+
+    def _predict_and_explain(self, input_data):
+        if self.engine == "numpy":
+            return self._numpy_engine.predict_and_explain(input_data)
+
+        X = self._encode_frame(input_data)
         return {
-            "rules": rules,
-            "feature_importance": feature_imp
+            **self._predict_frame(X),
+            "explanation": self._explain_frame(X)
+        }
+
+
+# ============ Synthetic Data Helpers ============
+
+EMPLOYMENT_TYPES = np.array(['employed', 'self-employed', 'unemployed'])
+
+
+def _chunk_seed(seed, index):
+    """Deterministic, independent seed for chunk `index` of a chunked dataset."""
+    return int(np.random.SeedSequence([seed, index]).generate_state(1)[0])
+
+
+def _synthetic_columns(rng, n_samples):
+    """
+    Draw the raw feature columns. The draw order matches the original
+    generator; employment_type is returned as codes (RandomState.choice over
+    three labels draws the same randint(0, 3) indices).
+    """
+    return {
+        'age': rng.randint(18, 70, n_samples),
+        'income': rng.normal(50000, 15000, n_samples).astype(int),
+        'credit_history_length': rng.randint(0, 20, n_samples),
+        'existing_loans': rng.randint(0, 5, n_samples),
+        'debt_to_income_ratio': rng.uniform(0.1, 0.9, n_samples),
+        'loan_amount': rng.randint(1000, 50000, n_samples),
+        'repayment_duration': rng.randint(6, 60, n_samples),
+        'employment_type': rng.randint(0, len(EMPLOYMENT_TYPES), n_samples)
+    }
+
+
+def assign_risk(columns):
+    """
+    Simple logical rules for target generation to ensure interpretability,
+    applied to whole columns at once.
+    Risk: 0 (Low), 1 (Medium), 2 (High)
+    """
+    risk_score = (
+        2 * (columns['income'] < 30000)
+        + 2 * (columns['debt_to_income_ratio'] > 0.5)
+        + 3 * (columns['employment_type'] == EMPLOYMENT_TYPE_MAP['unemployed'])
+        + (columns['credit_history_length'] < 2)
+        + (columns['age'] < 22)
+    )
+    return np.where(risk_score <= 1, 0, np.where(risk_score <= 3, 1, 2))
+
+
+def _copy_result(result):
+    """Copy a cached result so callers can never mutate the cache entry."""
+    explanation = result["explanation"]
+    return {
+        **result,
+        "explanation": {
+            "rules": list(explanation["rules"]),
+            "feature_importance": dict(explanation["feature_importance"])
         }
+    }
+
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the HICRA hybrid model")
+    parser.add_argument("--samples", type=int, default=1000, help="synthetic training rows")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="rows generated per chunk")
+    args = parser.parse_args()
+
     hm = HybridModel()
-    hm.train()
+    hm.train(n_samples=args.samples, chunk_size=args.chunk_size)
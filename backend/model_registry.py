@@ -0,0 +1,187 @@
+"""
+Versioned Model Registry for HICRA
+Every registered model lives in its own directory under the registry root,
+named by the model version (the content fingerprint of its arrays), and a
+manifest records which version is active plus the activation history used
+for rollback.
+
+Layout:
+    models/registry/manifest.json
+    models/registry/<version>/dt_model.pkl, scaler.pkl, nn_model.pkl, hicra_model.bin, ...
+
+Usage:
+    python model_registry.py list
+    python model_registry.py register models [--activate]
+    python model_registry.py activate <version>
+    python model_registry.py rollback
+
+Serving workers poll the manifest, so activating from the CLI is picked up
+without a restart.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+
+from model import HybridModel
+
+MANIFEST_FILE = "manifest.json"
+DEFAULT_REGISTRY_DIR = os.path.join("models", "registry")
+
+
+class RegistryError(Exception):
+    """Raised for unknown versions or impossible activations/rollbacks."""
+
+
+class ModelRegistry:
+    """Version directories plus a manifest pointing at the active version."""
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv("MODEL_REGISTRY_DIR", DEFAULT_REGISTRY_DIR)
+        self._lock = threading.Lock()
+
+    # ============ Manifest ============
+
+    def _manifest_path(self):
+        return os.path.join(self.root, MANIFEST_FILE)
+
+    def read_manifest(self):
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return {"active": None, "history": [], "versions": {}}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._manifest_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def active_version(self):
+        return self.read_manifest()["active"]
+
+    def previous_version(self):
+        history = self.read_manifest()["history"]
+        return history[-1] if history else None
+
+    def list_versions(self):
+        manifest = self.read_manifest()
+        return [
+            {**entry, "version": version, "active": version == manifest["active"]}
+            for version, entry in sorted(manifest["versions"].items(), key=lambda item: item[1]["created_at"])
+        ]
+
+    # ============ Versions ============
+
+    def register(self, source_dir, activate=False):
+        """
+        Copy a trained model directory into the registry. Returns the version,
+        which is the model fingerprint, so registering the same models twice
+        is a no-op.
+        """
+        source = HybridModel(model_dir=source_dir, engine="numpy")
+        source.load()
+        version = source.version
+
+        with self._lock:
+            manifest = self.read_manifest()
+            if version not in manifest["versions"]:
+                target = self.version_dir(version)
+                staging = f"{target}.{os.getpid()}.tmp"
+                shutil.rmtree(staging, ignore_errors=True)
+                os.makedirs(staging)
+                for name in os.listdir(source_dir):
+                    path = os.path.join(source_dir, name)
+                    if os.path.isfile(path) and not name.endswith(".tmp"):
+                        # copy2 keeps mtimes, so the artifact staleness check still holds
+                        shutil.copy2(path, os.path.join(staging, name))
+                shutil.rmtree(target, ignore_errors=True)
+                os.replace(staging, target)
+
+                manifest["versions"][version] = {
+                    "created_at": datetime.utcnow().isoformat(),
+                    "source": os.path.abspath(source_dir),
+                    **source.model_info()
+                }
+                self._write_manifest(manifest)
+                print(f"✅ Registered model version {version}")
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def load(self, version, engine=None):
+        """Fully load a version into a new HybridModel (never touches the serving one)."""
+        if version not in self.read_manifest()["versions"]:
+            raise RegistryError(f"Unknown model version '{version}'")
+        hm = HybridModel(model_dir=self.version_dir(version), engine=engine)
+        hm.load()
+        return hm
+
+    def activate(self, version):
+        """Point the manifest at `version`, remembering the previous one for rollback."""
+        with self._lock:
+            manifest = self.read_manifest()
+            if version not in manifest["versions"]:
+                raise RegistryError(f"Unknown model version '{version}'")
+            if manifest["active"] == version:
+                return
+            if manifest["active"] is not None:
+                manifest["history"].append(manifest["active"])
+            manifest["active"] = version
+            self._write_manifest(manifest)
+        print(f"✅ Active model version: {version}")
+
+    def rollback(self):
+        """Re-activate the previously active version. Returns it."""
+        with self._lock:
+            manifest = self.read_manifest()
+            if not manifest["history"]:
+                raise RegistryError("No previous model version to roll back to")
+            manifest["active"] = manifest["history"].pop()
+            self._write_manifest(manifest)
+        print(f"↩️  Rolled back to model version {manifest['active']}")
+        return manifest["active"]
+
+
+if __name__ == "__main__":
+    import warnings
+
+    warnings.filterwarnings("ignore")
+    parser = argparse.ArgumentParser(description="Manage HICRA model versions")
+    parser.add_argument("--root", default=None, help=f"registry directory (default {DEFAULT_REGISTRY_DIR})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="list registered versions")
+    register_parser = subparsers.add_parser("register", help="copy a trained model directory into the registry")
+    register_parser.add_argument("source_dir", nargs="?", default="models")
+    register_parser.add_argument("--activate", action="store_true")
+    activate_parser = subparsers.add_parser("activate", help="make a version active")
+    activate_parser.add_argument("version")
+    subparsers.add_parser("rollback", help="re-activate the previous version")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    try:
+        if args.command == "list":
+            for entry in registry.list_versions():
+                marker = "*" if entry["active"] else " "
+                print(f"{marker} {entry['version']}  {entry['created_at']}  "
+                      f"dt_max_depth={entry.get('dt_max_depth')} nn_layers={entry.get('nn_layers')}")
+        elif args.command == "register":
+            registry.register(args.source_dir, activate=args.activate)
+        elif args.command == "activate":
+            registry.activate(args.version)
+        elif args.command == "rollback":
+            registry.rollback()
+    except RegistryError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
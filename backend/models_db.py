@@ -6,7 +6,7 @@ Defines the database schema for users, applicant profiles, and predictions
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Float, Boolean, DateTime, 
-    Text, ForeignKey, Enum, JSON
+    Text, ForeignKey, Enum, JSON, Index
 )
 from sqlalchemy.orm import relationship
 from database import Base
@@ -25,6 +25,11 @@ class User(Base):
     Stores login credentials and role information.
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin table: role filter + keyset order by name or id
+        Index("ix_users_role_name_id", "role", "name", "id"),
+        Index("ix_users_role_id", "role", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
@@ -50,6 +55,13 @@ class ApplicantProfile(Base):
     Mirrors the CSV data structure.
     """
     __tablename__ = "applicant_profiles"
+    __table_args__ = (
+        # Admin table sort keys: (sort column, user_id) keyset order
+        Index("ix_applicant_profiles_income_user", "annual_income", "user_id"),
+        Index("ix_applicant_profiles_loan_user", "loan_amount", "user_id"),
+        Index("ix_applicant_profiles_risk_user", "risk_score", "user_id"),
+        Index("ix_applicant_profiles_employment", "employment_status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
@@ -148,6 +160,10 @@ class Prediction(Base):
     Stores all risk predictions made by the system for audit and history tracking.
     """
     __tablename__ = "predictions"
+    __table_args__ = (
+        # Per-user history, newest first, paged by (created_at, id) keyset
+        Index("ix_predictions_user_created_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
@@ -169,6 +185,7 @@ class Prediction(Base):
     decision_rules = Column(JSON, nullable=True)
     
     # Metadata
+    model_version = Column(String(64), nullable=True, index=True)  # Registry version that produced it
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -176,3 +193,70 @@ class Prediction(Base):
 
     def __repr__(self):
         return f"<Prediction(id={self.id}, risk_level='{self.risk_level}', confidence={self.final_confidence})>"
+
+
+class RevokedToken(Base):
+    """
+    Revoked session tokens.
+    A row with a jti revokes that one token; a row without one revokes every
+    token issued to user_id before revoked_at. Rows are only needed until
+    expires_at, after which the tokens they cover have expired anyway.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    jti = Column(String(32), nullable=True, index=True)
+    user_id = Column(Integer, nullable=True, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken(id={self.id}, jti='{self.jti}', user_id={self.user_id})>"
+
+
+class AdminStatsSummary(Base):
+    """
+    Running totals behind /admin/stats (a single row, id=1).
+    Writers adjust it in the same transaction as their change; a periodic
+    full recount overwrites it to correct any drift.
+    """
+    __tablename__ = "admin_stats_summary"
+
+    id = Column(Integer, primary_key=True)
+    total_users = Column(Integer, default=0)
+    total_profiles = Column(Integer, default=0)
+    total_predictions = Column(Integer, default=0)
+
+    # AVG() ignores NULLs, so keep the non-null count next to each sum
+    income_sum = Column(Float, default=0)
+    income_count = Column(Integer, default=0)
+    loan_sum = Column(Float, default=0)
+    loan_count = Column(Integer, default=0)
+
+    low_risk = Column(Integer, default=0)  # risk_score < 40
+    medium_risk = Column(Integer, default=0)  # 40 <= risk_score < 70
+    high_risk = Column(Integer, default=0)  # risk_score >= 70
+
+    reconciled_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AdminStatsSummary(users={self.total_users}, profiles={self.total_profiles}, predictions={self.total_predictions})>"
+
+
+class ProfileScore(Base):
+    """
+    Latest prediction + explanation for each applicant profile.
+    Valid while the profile's updated_at and the serving model version both
+    still match what it was computed from; otherwise it is recomputed.
+    """
+    __tablename__ = "profile_scores"
+
+    profile_id = Column(Integer, ForeignKey("applicant_profiles.id"), primary_key=True)
+    model_version = Column(String(64), nullable=False, index=True)
+    profile_updated_at = Column(DateTime, nullable=True)
+    result = Column(JSON, nullable=False)  # predict_and_explain output
+    scored_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ProfileScore(profile_id={self.profile_id}, model_version='{self.model_version}')>"
@@ -0,0 +1,127 @@
+"""
+Password Hashing Pool for HICRA
+bcrypt hashing and verification run in a dedicated, separately sized
+process pool, so a login burst burns those cores instead of the request
+threadpool that /predict also depends on. Work beyond the queue-depth limit
+is rejected immediately (HasherBusy) instead of queueing behind seconds of
+bcrypt.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batching import Histogram
+
+LATENCY_MS_BUCKETS = (25, 50, 100, 200, 300, 500, 1000, 2000, 5000)
+
+
+def _hash(password, rounds):
+    from passlib.hash import bcrypt
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify(password, password_hash):
+    from passlib.hash import bcrypt
+    return bcrypt.verify(password, password_hash)
+
+
+def _warm():
+    from passlib.hash import bcrypt  # noqa: F401  (import once per worker)
+    return True
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+class PasswordHasher:
+    """
+    workers: processes in the pool (bcrypt is CPU-bound, one core each).
+    max_queue: calls allowed to wait for a worker before new ones are rejected.
+    rounds: bcrypt cost for new hashes (verification uses the cost stored in the hash).
+    """
+
+    def __init__(self, workers=2, max_queue=16, rounds=12):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self._pool = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rejected = 0
+        self.latency_ms = {"hash": Histogram(LATENCY_MS_BUCKETS), "verify": Histogram(LATENCY_MS_BUCKETS)}
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: never fork a process that already runs server threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _acquire(self):
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherBusy(f"Password hashing queue is full ({self.max_queue} waiting)")
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _release(self, kind, start):
+        with self._lock:
+            self.in_flight -= 1
+            self.latency_ms[kind].observe((time.perf_counter() - start) * 1000)
+
+    async def _run(self, kind, fn, *args):
+        self._acquire()
+        start = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self._executor().submit(fn, *args))
+        finally:
+            self._release(kind, start)
+
+    async def hash(self, password):
+        return await self._run("hash", _hash, password, self.rounds)
+
+    async def verify(self, password, password_hash):
+        return await self._run("verify", _verify, password, password_hash)
+
+    def hash_sync(self, password):
+        """Blocking variant for startup tasks and scripts (same pool and limits)."""
+        self._acquire()
+        start = time.perf_counter()
+        try:
+            return self._executor().submit(_hash, password, self.rounds).result()
+        finally:
+            self._release("hash", start)
+
+    def warm_up(self):
+        """Start every worker process now rather than on the first login."""
+        pool = self._executor()
+        for future in [pool.submit(_warm) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.workers),
+                "max_queue": self.max_queue,
+                "max_in_flight": self.max_in_flight,
+                "rejected": self.rejected,
+                "hash_latency_ms": self.latency_ms["hash"].snapshot(),
+                "verify_latency_ms": self.latency_ms["verify"].snapshot(),
+            }
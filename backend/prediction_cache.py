@@ -0,0 +1,85 @@
+"""
+In-process LRU cache for HICRA predictions
+Keys are a canonical encoding of the 8 model features plus the model
+version, so identical inputs (e.g. re-posted What-If forms or unchanged
+dashboard profiles) skip the model entirely.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from inference import FEATURE_ORDER
+
+
+def make_cache_key(input_data, model_version):
+    """
+    Canonical cache key for a prediction input.
+    Numeric features are normalised to float so 30 and 30.0 share an entry.
+    """
+    return (model_version,) + tuple(
+        float(input_data[name]) for name in FEATURE_ORDER[:-1]
+    ) + (input_data['employment_type'],)
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache with a per-entry TTL and hit/miss/eviction counters.
+    Safe to share between FastAPI worker threads.
+    """
+
+    def __init__(self, max_size=10000, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (used when the model is reloaded or retrained)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,167 @@
+"""
+Write-Behind Prediction Persistence for HICRA
+With PREDICTION_WRITE_BEHIND=1, /predict hands its Prediction row to a
+bounded in-memory queue and answers without waiting for a commit. A
+background task on the event loop flushes the queue as one multi-row INSERT
+every flush_rows rows or flush_ms milliseconds, whichever comes first.
+
+A full queue applies backpressure: submit() waits for room instead of
+dropping rows. Connection errors are retried; a batch rejected by a
+constraint is bisected so only the offending rows are dropped. Shutdown
+drains the queue. Rows still queued when the process is killed outright are
+lost, and a new prediction reaches /predictions/{user_id} up to flush_ms
+later.
+"""
+
+import asyncio
+import time
+
+from sqlalchemy import insert, exc
+
+import admin_stats
+from batching import Histogram
+from database import session_scope
+from models_db import Prediction
+
+FLUSH_SIZE_BUCKETS = (1, 10, 50, 100, 200, 500, 1000, 2000, 5000)
+FLUSH_MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+MAX_ATTEMPTS = 3
+
+_CLOSE = object()  # queue sentinel: flush what is left and stop
+
+
+class PredictionWriter:
+    """
+    flush_rows: write as soon as this many rows are waiting.
+    flush_ms: longest a queued row waits before its batch is written.
+    max_queue: rows buffered before submit() starts to wait.
+    """
+
+    def __init__(self, flush_rows=200, flush_ms=50.0, max_queue=10000):
+        self.flush_rows = flush_rows
+        self.flush_ms = flush_ms
+        self.max_queue = max_queue
+        self.flush_sizes = Histogram(FLUSH_SIZE_BUCKETS)
+        self.flush_latency_ms = Histogram(FLUSH_MS_BUCKETS)
+        self.enqueued = 0
+        self.written = 0
+        self.blocked = 0
+        self.retries = 0
+        self.splits = 0
+        self.failed = 0
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    def _start(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = loop.create_task(self._run())
+
+    async def submit(self, rows):
+        """Queue Prediction row dicts for insertion; waits while the queue is full."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._start(loop)
+        for row in rows:
+            if self._queue.full():
+                self.blocked += 1
+            await self._queue.put(row)
+            self.enqueued += 1
+
+    async def _run(self):
+        closing = False
+        while not closing:
+            item = await self._queue.get()
+            if item is _CLOSE:
+                break
+            batch = [item]
+
+            # Collect until the batch is full or the first row has waited flush_ms
+            deadline = time.perf_counter() + self.flush_ms / 1000
+            while len(batch) < self.flush_rows:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _CLOSE:
+                    closing = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        start = time.perf_counter()
+        written = await self._write(batch)
+        self.written += written
+        self.flush_sizes.observe(len(batch))
+        self.flush_latency_ms.observe((time.perf_counter() - start) * 1000)
+
+    async def _insert(self, rows):
+        async with session_scope() as db:
+            await db.execute(insert(Prediction), rows)
+            await db.execute(admin_stats.increment(total_predictions=len(rows)))
+            await db.commit()
+
+    async def _write(self, rows):
+        """
+        Insert `rows`, returning how many were stored. Transient errors are
+        retried; a constraint/data error splits the batch in halves until the
+        offending rows are isolated, so valid neighbours are still written.
+        """
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                await self._insert(rows)
+                return len(rows)
+            except (exc.IntegrityError, exc.DataError) as e:
+                if len(rows) == 1:
+                    self.failed += 1
+                    print(f"❌ Dropped prediction for user {rows[0].get('user_id')}: {e.orig}")
+                    return 0
+                self.splits += 1
+                middle = len(rows) // 2
+                return await self._write(rows[:middle]) + await self._write(rows[middle:])
+            except (exc.OperationalError, exc.InterfaceError, exc.TimeoutError) as e:
+                if attempt == MAX_ATTEMPTS:
+                    break
+                self.retries += 1
+                print(f"⚠️  Prediction write failed (attempt {attempt}), retrying: {e}")
+                await asyncio.sleep(0.5 * attempt)
+            except Exception as e:
+                print(f"❌ Prediction write failed: {e}")
+                break
+        self.failed += len(rows)
+        print(f"❌ Dropped {len(rows)} predictions after failed writes")
+        return 0
+
+    async def close(self):
+        """Flush everything still queued and stop (on application shutdown)."""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(_CLOSE)
+        await self._task
+        self._task = None
+
+    def stats(self):
+        return {
+            "enabled": True,
+            "flush_rows": self.flush_rows,
+            "flush_ms": self.flush_ms,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "blocked": self.blocked,
+            "retries": self.retries,
+            "splits": self.splits,
+            "failed": self.failed,
+            "flush_size": self.flush_sizes.snapshot(),
+            "flush_latency_ms": self.flush_latency_ms.snapshot(),
+        }
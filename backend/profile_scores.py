@@ -0,0 +1,133 @@
+"""
+Persisted Profile Scores for HICRA
+/user-data serves each profile's stored prediction + explanation (the
+profile_scores table) while it is still current, i.e. the profile's
+updated_at and the serving model's scoring_version (model version plus NN
+precision) both match what it was computed from. Anything else is rescored
+and stored again, so the model only runs when the profile, the active model
+or its precision actually changed.
+
+After a model rollout every stored score is stale; the warm-up command
+rescores the whole table in vectorized batches so dashboards do not pay for
+it on first load:
+
+Usage:
+    python profile_scores.py warm
+    python profile_scores.py warm --version <model version> --chunk-size 2000
+"""
+
+import argparse
+import time
+
+from sqlalchemy import select, delete, insert
+
+from models_db import ApplicantProfile, ProfileScore
+
+
+def is_current(score, profile, model_version):
+    return (
+        score is not None
+        and score.model_version == model_version
+        and score.profile_updated_at == profile.updated_at
+    )
+
+
+def store(db, profile, score, result, model_version):
+    """Record `result` as the profile's current score (the caller commits)."""
+    if score is None:
+        db.add(ProfileScore(
+            profile_id=profile.id,
+            model_version=model_version,
+            profile_updated_at=profile.updated_at,
+            result=result
+        ))
+    else:
+        score.model_version = model_version
+        score.profile_updated_at = profile.updated_at
+        score.result = result
+
+
+def warm_up(db, hm, chunk_size=1000, limit=None):
+    """
+    Rescore every profile whose stored score is missing or stale for `hm`
+    (sync Session). Walks the table by id in chunks and scores each chunk
+    with one predict_and_explain_batch call. Returns a small report.
+    """
+    started = time.perf_counter()
+    last_id = 0
+    scanned = rescored = 0
+    while limit is None or scanned < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - scanned)
+        rows = db.execute(
+            select(ApplicantProfile, ProfileScore.model_version, ProfileScore.profile_updated_at)
+            .outerjoin(ProfileScore, ProfileScore.profile_id == ApplicantProfile.id)
+            .where(ApplicantProfile.id > last_id)
+            .order_by(ApplicantProfile.id)
+            .limit(size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0].id
+        scanned += len(rows)
+
+        stale = [
+            profile for profile, version, updated_at in rows
+            if version != hm.scoring_version or updated_at != profile.updated_at
+        ]
+        if stale:
+            results = hm.predict_and_explain_batch([profile.to_prediction_input() for profile in stale])
+            ids = [profile.id for profile in stale]
+            db.execute(delete(ProfileScore).where(ProfileScore.profile_id.in_(ids)))
+            db.execute(insert(ProfileScore), [
+                {
+                    "profile_id": profile.id,
+                    "model_version": hm.scoring_version,
+                    "profile_updated_at": profile.updated_at,
+                    "result": {**result, "model_version": hm.version}
+                }
+                for profile, result in zip(stale, results)
+            ])
+            db.commit()
+            rescored += len(stale)
+        db.expunge_all()  # keep memory bounded by the chunk size
+
+        elapsed = time.perf_counter() - started
+        print(f"   {scanned} profiles scanned, {rescored} rescored ({scanned / elapsed:.0f} rows/s)")
+
+    elapsed = time.perf_counter() - started
+    return {
+        "model_version": hm.scoring_version,
+        "scanned": scanned,
+        "rescored": rescored,
+        "seconds": round(elapsed, 2),
+    }
+
+
+if __name__ == "__main__":
+    import warnings
+
+    from database import SessionLocal
+    from model_registry import ModelRegistry
+
+    warnings.filterwarnings("ignore")
+    parser = argparse.ArgumentParser(description="Precompute stored /user-data scores for every profile")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    warm_parser = subparsers.add_parser("warm", help="rescore profiles whose stored score is missing or stale")
+    warm_parser.add_argument("--version", default=None, help="model version (default: the active one)")
+    warm_parser.add_argument("--chunk-size", type=int, default=1000)
+    warm_parser.add_argument("--limit", type=int, default=None, help="stop after scanning this many profiles")
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    version = args.version or registry.active_version()
+    if version is None:
+        print("❌ No active model version; register or activate one first")
+        raise SystemExit(1)
+
+    hm = registry.load(version)
+    db = SessionLocal()
+    try:
+        report = warm_up(db, hm, args.chunk_size, args.limit)
+    finally:
+        db.close()
+    print(f"✅ Profile scores warmed: {report}")
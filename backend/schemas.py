@@ -20,6 +20,7 @@ class LoginResponse(BaseModel):
     name: str
     email: str
     user_id: Optional[int] = None
+    expires_at: Optional[int] = None  # Unix time the token stops being accepted
     error: Optional[str] = None
 
 
@@ -130,6 +131,7 @@ class PredictionResult(BaseModel):
     final_confidence: float
     agreement: bool
     explanation: Optional[ExplanationData] = None
+    model_version: Optional[str] = None
 
 
 class PredictionResponse(BaseModel):
@@ -140,6 +142,7 @@ class PredictionResponse(BaseModel):
     nn_prediction: Optional[str]
     final_confidence: Optional[float]
     agreement: Optional[bool]
+    model_version: Optional[str] = None
     created_at: datetime
 
     class Config:
@@ -4,15 +4,28 @@ Loads data from Loan.csv into MySQL database
 
 Run this script after setting up MySQL:
     python seed_database.py
+    python seed_database.py --limit 1000
+    python seed_database.py --csv path/to/Loan.csv --chunk-size 5000 --workers 4
+    python seed_database.py --skip-csv
+
+The CSV is converted column by column and inserted with multi-row INSERTs.
+User ids are pre-allocated per chunk, so no per-row flush is needed, and
+chunks are written by parallel workers each in its own transaction. Do not
+create users through the API while a seed is running.
 """
 
+import argparse
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
 
+import numpy as np
 import pandas as pd
 from passlib.hash import bcrypt
+from sqlalchemy import select, insert, func
 from sqlalchemy.orm import Session
 
 # Add parent directory to path for imports
@@ -21,6 +34,53 @@ sys.path.insert(0, str(Path(__file__).parent))
 from database import engine, SessionLocal, Base
 from models_db import User, ApplicantProfile, Prediction
 
+# CSV column -> ApplicantProfile column, type, value used when missing/NaN
+PROFILE_COLUMNS = [
+    # Personal
+    ("Age", "age", "int", None),
+    ("MaritalStatus", "marital_status", "str", None),
+    ("NumberOfDependents", "number_of_dependents", "int", 0),
+    ("EducationLevel", "education_level", "str", None),
+    # Employment & Income
+    ("EmploymentStatus", "employment_status", "str", "Employed"),
+    ("Experience", "experience", "int", None),
+    ("JobTenure", "job_tenure", "int", None),
+    ("AnnualIncome", "annual_income", "float", None),
+    ("MonthlyIncome", "monthly_income", "float", None),
+    # Credit
+    ("CreditScore", "credit_score", "int", None),
+    ("LengthOfCreditHistory", "length_of_credit_history", "int", None),
+    ("NumberOfOpenCreditLines", "number_of_open_credit_lines", "int", 0),
+    ("NumberOfCreditInquiries", "number_of_credit_inquiries", "int", 0),
+    ("CreditCardUtilizationRate", "credit_card_utilization_rate", "float", None),
+    # Debt
+    ("MonthlyDebtPayments", "monthly_debt_payments", "float", None),
+    ("DebtToIncomeRatio", "debt_to_income_ratio", "float", None),
+    ("TotalDebtToIncomeRatio", "total_debt_to_income_ratio", "float", None),
+    ("BankruptcyHistory", "bankruptcy_history", "bool", False),
+    ("PreviousLoanDefaults", "previous_loan_defaults", "bool", False),
+    # Loan
+    ("LoanAmount", "loan_amount", "float", None),
+    ("LoanDuration", "loan_duration", "int", None),
+    ("LoanPurpose", "loan_purpose", "str", None),
+    ("BaseInterestRate", "base_interest_rate", "float", None),
+    ("InterestRate", "interest_rate", "float", None),
+    ("MonthlyLoanPayment", "monthly_loan_payment", "float", None),
+    # Assets
+    ("HomeOwnershipStatus", "home_ownership_status", "str", None),
+    ("SavingsAccountBalance", "savings_account_balance", "float", None),
+    ("CheckingAccountBalance", "checking_account_balance", "float", None),
+    ("TotalAssets", "total_assets", "float", None),
+    ("TotalLiabilities", "total_liabilities", "float", None),
+    ("NetWorth", "net_worth", "float", None),
+    # Payment History
+    ("PaymentHistory", "payment_history", "int", None),
+    ("UtilityBillsPaymentHistory", "utility_bills_payment_history", "float", None),
+    # Risk
+    ("RiskScore", "risk_score", "float", 50.0),
+    ("LoanApproved", "loan_approved", "bool", None),
+]
+
 
 def create_tables():
     """Create all database tables"""
@@ -79,14 +139,76 @@ def load_csv_data(csv_path: str = None) -> pd.DataFrame:
     return df
 
 
-def seed_users_and_profiles(db: Session, df: pd.DataFrame, limit: int = None):
+def convert_column(df, csv_column, kind, default):
+    """One CSV column as a Python list, NaN/unparseable values replaced by `default`."""
+    if csv_column not in df.columns:
+        return [default] * len(df)
+    column = df[csv_column]
+    if kind == "str":
+        missing = column.isna().to_numpy()
+        values = column.astype(str).tolist()
+    else:
+        numeric = pd.to_numeric(column, errors="coerce")
+        missing = numeric.isna().to_numpy()
+        filled = numeric.fillna(0).to_numpy(dtype=np.float64)
+        if kind == "int":
+            values = np.trunc(filled).astype(np.int64).tolist()
+        elif kind == "bool":
+            values = (np.trunc(filled) != 0).tolist()
+        else:
+            values = filled.tolist()
+    if missing.any():
+        values = [default if is_missing else value for value, is_missing in zip(values, missing.tolist())]
+    return values
+
+
+def convert_profiles(df, user_ids):
+    """ApplicantProfile insert rows for a DataFrame chunk, converted column by column."""
+    columns = {"user_id": user_ids}
+    for csv_column, attribute, kind, default in PROFILE_COLUMNS:
+        columns[attribute] = convert_column(df, csv_column, kind, default)
+
+    if "ApplicationDate" in df.columns:
+        dates = pd.to_datetime(df["ApplicationDate"].astype(str), format="%Y-%m-%d", errors="coerce")
+        columns["application_date"] = [None if pd.isna(d) else d.to_pydatetime() for d in dates]
+    else:
+        columns["application_date"] = [None] * len(df)
+
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def _insert_chunk(chunk, first_id, password_hash):
+    """Insert one chunk's users (ids first_id...) and profiles in a single transaction."""
+    user_ids = list(range(first_id, first_id + len(chunk)))
+    users = [
+        {
+            "id": user_id,
+            "email": email,
+            "name": name,
+            "password_hash": password_hash,
+            "role": "user",
+            "is_active": True
+        }
+        for user_id, email, name in zip(user_ids, chunk["_email"].tolist(), chunk["_name"].tolist())
+    ]
+    profiles = convert_profiles(chunk, user_ids)
+    with engine.begin() as connection:
+        connection.execute(insert(User), users)
+        connection.execute(insert(ApplicantProfile), profiles)
+    return len(users)
+
+
+def seed_users_and_profiles(db: Session, df: pd.DataFrame, limit: int = None, chunk_size: int = 5000, workers: int = 4):
     """
-    Seed users and applicant profiles from CSV data.
+    Bulk-load users and applicant profiles from CSV data.
     
     Args:
         db: Database session
         df: DataFrame with loan data
         limit: Optional limit on number of records to import (for testing)
+        chunk_size: Rows per multi-row INSERT / transaction
+        workers: Chunks written in parallel
     """
     if df is None or df.empty:
         print("❌ No data to seed!")
@@ -96,133 +218,71 @@ def seed_users_and_profiles(db: Session, df: pd.DataFrame, limit: int = None):
         df = df.head(limit)
         print(f"⚠️  Limited to {limit} records for seeding")
     
-    # Default password for all users
+    # Default password for all users (hashed once)
     default_password_hash = bcrypt.hash("password123")
     
-    # Track progress
-    total = len(df)
-    created_users = 0
-    created_profiles = 0
-    skipped = 0
+    # Emails are derived from the row index; skip the ones already present
+    df = df.copy()
+    numbers = (df.index + 1).astype(str)
+    df["_email"] = "user" + numbers + "@gmail.com"
+    df["_name"] = "User " + numbers
+    existing = set(db.scalars(select(User.email)))
+    new_rows = df[~df["_email"].isin(existing)]
+    skipped = len(df) - len(new_rows)
     
-    print(f"\n🔄 Seeding {total} users and profiles...")
+    total = len(new_rows)
+    print(f"\n🔄 Seeding {total} users and profiles ({skipped} already exist, "
+          f"chunks of {chunk_size}, {workers} workers)...")
+    if total == 0:
+        return
     
-    for idx, row in df.iterrows():
-        try:
-            # Generate email based on index
-            email = f"user{idx + 1}@gmail.com"
-            name = f"User {idx + 1}"
-            
-            # Check if user already exists
-            existing_user = db.query(User).filter(User.email == email).first()
-            if existing_user:
-                skipped += 1
-                if skipped <= 5:
-                    print(f"   ⏭️  Skipping existing user: {email}")
-                continue
-            
-            # Create User
-            user = User(
-                email=email,
-                name=name,
-                password_hash=default_password_hash,
-                role="user",
-                is_active=True
-            )
-            db.add(user)
-            db.flush()  # Get user.id without committing
-            created_users += 1
-            
-            # Parse application date
-            app_date = None
-            if 'ApplicationDate' in row and pd.notna(row['ApplicationDate']):
-                try:
-                    app_date = datetime.strptime(str(row['ApplicationDate']), '%Y-%m-%d')
-                except:
-                    pass
-            
-            # Create Applicant Profile
-            profile = ApplicantProfile(
-                user_id=user.id,
-                
-                # Personal
-                age=int(row.get('Age', 0)) if pd.notna(row.get('Age')) else None,
-                marital_status=str(row.get('MaritalStatus', '')) if pd.notna(row.get('MaritalStatus')) else None,
-                number_of_dependents=int(row.get('NumberOfDependents', 0)) if pd.notna(row.get('NumberOfDependents')) else 0,
-                education_level=str(row.get('EducationLevel', '')) if pd.notna(row.get('EducationLevel')) else None,
-                
-                # Employment & Income
-                employment_status=str(row.get('EmploymentStatus', 'Employed')) if pd.notna(row.get('EmploymentStatus')) else 'Employed',
-                experience=int(row.get('Experience', 0)) if pd.notna(row.get('Experience')) else None,
-                job_tenure=int(row.get('JobTenure', 0)) if pd.notna(row.get('JobTenure')) else None,
-                annual_income=float(row.get('AnnualIncome', 0)) if pd.notna(row.get('AnnualIncome')) else None,
-                monthly_income=float(row.get('MonthlyIncome', 0)) if pd.notna(row.get('MonthlyIncome')) else None,
-                
-                # Credit
-                credit_score=int(row.get('CreditScore', 0)) if pd.notna(row.get('CreditScore')) else None,
-                length_of_credit_history=int(row.get('LengthOfCreditHistory', 0)) if pd.notna(row.get('LengthOfCreditHistory')) else None,
-                number_of_open_credit_lines=int(row.get('NumberOfOpenCreditLines', 0)) if pd.notna(row.get('NumberOfOpenCreditLines')) else 0,
-                number_of_credit_inquiries=int(row.get('NumberOfCreditInquiries', 0)) if pd.notna(row.get('NumberOfCreditInquiries')) else 0,
-                credit_card_utilization_rate=float(row.get('CreditCardUtilizationRate', 0)) if pd.notna(row.get('CreditCardUtilizationRate')) else None,
-                
-                # Debt
-                monthly_debt_payments=float(row.get('MonthlyDebtPayments', 0)) if pd.notna(row.get('MonthlyDebtPayments')) else None,
-                debt_to_income_ratio=float(row.get('DebtToIncomeRatio', 0)) if pd.notna(row.get('DebtToIncomeRatio')) else None,
-                total_debt_to_income_ratio=float(row.get('TotalDebtToIncomeRatio', 0)) if pd.notna(row.get('TotalDebtToIncomeRatio')) else None,
-                bankruptcy_history=bool(int(row.get('BankruptcyHistory', 0))) if pd.notna(row.get('BankruptcyHistory')) else False,
-                previous_loan_defaults=bool(int(row.get('PreviousLoanDefaults', 0))) if pd.notna(row.get('PreviousLoanDefaults')) else False,
-                
-                # Loan
-                loan_amount=float(row.get('LoanAmount', 0)) if pd.notna(row.get('LoanAmount')) else None,
-                loan_duration=int(row.get('LoanDuration', 0)) if pd.notna(row.get('LoanDuration')) else None,
-                loan_purpose=str(row.get('LoanPurpose', '')) if pd.notna(row.get('LoanPurpose')) else None,
-                base_interest_rate=float(row.get('BaseInterestRate', 0)) if pd.notna(row.get('BaseInterestRate')) else None,
-                interest_rate=float(row.get('InterestRate', 0)) if pd.notna(row.get('InterestRate')) else None,
-                monthly_loan_payment=float(row.get('MonthlyLoanPayment', 0)) if pd.notna(row.get('MonthlyLoanPayment')) else None,
-                
-                # Assets
-                home_ownership_status=str(row.get('HomeOwnershipStatus', '')) if pd.notna(row.get('HomeOwnershipStatus')) else None,
-                savings_account_balance=float(row.get('SavingsAccountBalance', 0)) if pd.notna(row.get('SavingsAccountBalance')) else None,
-                checking_account_balance=float(row.get('CheckingAccountBalance', 0)) if pd.notna(row.get('CheckingAccountBalance')) else None,
-                total_assets=float(row.get('TotalAssets', 0)) if pd.notna(row.get('TotalAssets')) else None,
-                total_liabilities=float(row.get('TotalLiabilities', 0)) if pd.notna(row.get('TotalLiabilities')) else None,
-                net_worth=float(row.get('NetWorth', 0)) if pd.notna(row.get('NetWorth')) else None,
-                
-                # Payment History
-                payment_history=int(row.get('PaymentHistory', 0)) if pd.notna(row.get('PaymentHistory')) else None,
-                utility_bills_payment_history=float(row.get('UtilityBillsPaymentHistory', 0)) if pd.notna(row.get('UtilityBillsPaymentHistory')) else None,
-                
-                # Risk
-                risk_score=float(row.get('RiskScore', 50)) if pd.notna(row.get('RiskScore')) else 50.0,
-                loan_approved=bool(int(row.get('LoanApproved', 0))) if pd.notna(row.get('LoanApproved')) else None,
-                
-                # Metadata
-                application_date=app_date
-            )
-            db.add(profile)
-            created_profiles += 1
-            
-            # Commit in batches of 100 for performance
-            if (idx + 1) % 100 == 0:
-                db.commit()
-                print(f"   📊 Progress: {idx + 1}/{total} records processed...")
-                
-        except Exception as e:
-            print(f"   ❌ Error on row {idx}: {e}")
-            db.rollback()
-            continue
+    # Pre-allocate a contiguous id range, split across the chunks
+    first_id = (db.scalar(select(func.max(User.id))) or 0) + 1
+    chunks = [
+        (new_rows.iloc[start:start + chunk_size], first_id + start)
+        for start in range(0, total, chunk_size)
+    ]
     
-    # Final commit
-    db.commit()
+    created = 0
+    failed = 0
+    progress_lock = threading.Lock()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_insert_chunk, chunk, chunk_first_id, default_password_hash): len(chunk)
+            for chunk, chunk_first_id in chunks
+        }
+        for future in as_completed(futures):
+            try:
+                inserted = future.result()
+            except Exception as e:
+                failed += futures[future]
+                print(f"   ❌ Chunk of {futures[future]} rows failed: {e}")
+                continue
+            with progress_lock:
+                created += inserted
+                elapsed = time.perf_counter() - started
+                print(f"   📊 Progress: {created}/{total} records ({created / elapsed:.0f} rows/s)")
     
-    print(f"\n✅ Seeding complete!")
-    print(f"   Users created: {created_users}")
-    print(f"   Profiles created: {created_profiles}")
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Seeding complete in {elapsed:.1f}s ({created / elapsed:.0f} rows/s)")
+    print(f"   Users created: {created}")
+    print(f"   Profiles created: {created}")
     print(f"   Skipped (existing): {skipped}")
+    if failed:
+        print(f"   Failed: {failed}")
 
 
 def main():
     """Main seeding function"""
+    parser = argparse.ArgumentParser(description="Seed the HICRA database from Loan.csv")
+    parser.add_argument("--csv", default=None, help="path to Loan.csv (default: archive/Loan.csv)")
+    parser.add_argument("--limit", type=int, default=None, help="import only the first N records")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per bulk insert")
+    parser.add_argument("--workers", type=int, default=4, help="chunks inserted in parallel")
+    parser.add_argument("--skip-csv", action="store_true", help="only create tables and the admin user")
+    args = parser.parse_args()
+
     print("=" * 50)
     print("🌱 HICRA Database Seeder")
     print("=" * 50)
@@ -241,24 +301,15 @@ def main():
         # Seed admin user
         seed_admin_user(db)
         
-        # Load CSV data
-        df = load_csv_data()
-        
-        # Ask user for limit (optional, for testing)
-        print("\n⚠️  The CSV contains many records. How many would you like to import?")
-        print("   - Enter a number (e.g., 100, 500, 1000)")
-        print("   - Press Enter for ALL records")
-        print("   - Type 'skip' to skip CSV import")
-        
-        user_input = input("\n👉 Your choice: ").strip()
-        
-        if user_input.lower() == 'skip':
+        if args.skip_csv:
             print("⏭️  Skipping CSV import")
-        elif user_input.isdigit():
-            limit = int(user_input)
-            seed_users_and_profiles(db, df, limit=limit)
         else:
-            seed_users_and_profiles(db, df)
+            df = load_csv_data(args.csv)
+            seed_users_and_profiles(db, df, limit=args.limit, chunk_size=args.chunk_size, workers=args.workers)
+        
+        # Bring the /admin/stats summary in line with the new rows
+        import admin_stats
+        admin_stats.reconcile(db)
         
         print("\n" + "=" * 50)
         print("🎉 Database seeding completed!")
@@ -0,0 +1,138 @@
+"""
+Shadow Model Evaluation for HICRA
+A candidate HybridModel scores a sampled fraction of live inputs on a
+background worker so it can be compared with the primary model before it is
+promoted. Submitting never blocks: when the bounded queue is full the
+sample is dropped and counted instead.
+"""
+
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from inference import RISK_MAP
+
+RISK_LEVELS = list(RISK_MAP.values())
+
+
+def _latency_summary(samples):
+    if not samples:
+        return None
+    values = np.fromiter(samples, dtype=np.float64)
+    return {
+        "count": len(values),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+    }
+
+
+class ShadowEvaluator:
+    """
+    Bounded queue + one daemon worker scoring inputs with a candidate model.
+    Safe to call submit() from any request thread.
+    """
+
+    def __init__(self, sample_rate=0.1, max_queue=1000, latency_window=10000):
+        self.sample_rate = sample_rate
+        self.max_queue = max_queue
+        self.latency_window = latency_window
+        self.candidate = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+        self.reset()
+
+    def reset(self):
+        """Clear the counters (done whenever the candidate changes)."""
+        with self._lock:
+            self.submitted = 0
+            self.dropped = 0
+            self.scored = 0
+            self.errors = 0
+            self.agreements = 0
+            self.confusion = {primary: {shadow: 0 for shadow in RISK_LEVELS} for primary in RISK_LEVELS}
+            self.primary_latency_ms = deque(maxlen=self.latency_window)
+            self.shadow_latency_ms = deque(maxlen=self.latency_window)
+            self.started_at = time.time()
+
+    def set_candidate(self, hm):
+        """Start shadowing with `hm` (None stops). Queued work for the old candidate is discarded."""
+        self.candidate = hm
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self.reset()
+        if hm is not None and (self._worker is None or not self._worker.is_alive()):
+            self._worker = threading.Thread(target=self._run, name="shadow-eval", daemon=True)
+            self._worker.start()
+
+    def submit(self, input_data, primary_result, primary_latency_ms=None):
+        """
+        Maybe enqueue one scored input for shadow evaluation.
+        Returns immediately; never raises and never waits on the queue.
+        """
+        candidate = self.candidate
+        if candidate is None or random.random() >= self.sample_rate:
+            return False
+        try:
+            self._queue.put_nowait((candidate, dict(input_data), primary_result["risk_level"], primary_latency_ms))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def _run(self):
+        while True:
+            candidate, input_data, primary_risk, primary_latency_ms = self._queue.get()
+            if candidate is not self.candidate:
+                continue  # candidate was replaced while this was queued
+            try:
+                start = time.perf_counter()
+                shadow_risk = candidate.predict(input_data)["risk_level"]
+                shadow_latency_ms = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"⚠️  Shadow scoring failed: {e}")
+                continue
+
+            with self._lock:
+                self.scored += 1
+                self.agreements += shadow_risk == primary_risk
+                self.confusion[primary_risk][shadow_risk] += 1
+                self.shadow_latency_ms.append(shadow_latency_ms)
+                if primary_latency_ms is not None:
+                    self.primary_latency_ms.append(primary_latency_ms)
+
+    def summary(self):
+        candidate = self.candidate
+        with self._lock:
+            return {
+                "enabled": candidate is not None,
+                "candidate_version": candidate.version if candidate is not None else None,
+                "sample_rate": self.sample_rate,
+                "queue": {"size": self._queue.qsize(), "max_size": self.max_queue},
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "scored": self.scored,
+                "errors": self.errors,
+                "agreement_rate": round(self.agreements / self.scored, 4) if self.scored else None,
+                # rows: primary risk level, columns: shadow risk level
+                "confusion": {primary: dict(row) for primary, row in self.confusion.items()},
+                "latency_ms": {
+                    "primary": _latency_summary(self.primary_latency_ms),
+                    "shadow": _latency_summary(self.shadow_latency_ms),
+                },
+                "since": self.started_at,
+            }
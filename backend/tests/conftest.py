@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+import joblib
+import pytest
+
+# backend modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MODEL_DIR = Path(__file__).resolve().parent.parent / "models"
+
+
+@pytest.fixture(scope="session")
+def sklearn_models():
+    """The shipped (dt_model, scaler, nn_model) estimators."""
+    return tuple(joblib.load(MODEL_DIR / name) for name in ("dt_model.pkl", "scaler.pkl", "nn_model.pkl"))
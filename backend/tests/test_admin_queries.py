@@ -0,0 +1,56 @@
+"""Keyset cursors round-trip, and anything else is rejected as InvalidQuery."""
+
+import base64
+
+import pytest
+
+import admin_queries
+from admin_queries import InvalidQuery, decode_cursor, encode_cursor
+
+
+def _raw(payload):
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("value", ["Ada", 52000.5, 70, None])
+def test_round_trip(value):
+    assert decode_cursor(encode_cursor(value, 42)) == (value, 42)
+
+
+@pytest.mark.parametrize("payload", [
+    "not json",
+    '"ab"',
+    '"12"',
+    '{"a": 1, "b": 2}',
+    "[1]",
+    "[1, 2, 3]",
+    '[[1, 2], 3]',
+    '[{"a": 1}, 3]',
+    "[true, 3]",
+    "[NaN, 3]",
+    "[1e999, 3]",
+    '["x", "3"]',
+    '["x", 3.5]',
+    '["x", true]',
+    '["x", -1]',
+    '["x", 9223372036854775808]',
+])
+def test_malformed_payloads_are_rejected(payload):
+    with pytest.raises(InvalidQuery):
+        decode_cursor(_raw(payload))
+
+
+def test_non_base64_is_rejected():
+    with pytest.raises(InvalidQuery):
+        decode_cursor("é!")
+
+
+@pytest.mark.parametrize("sort, value", [("name", 3), ("income", "x"), ("risk", "x"), ("id", "x")])
+def test_value_type_must_match_sort_key(sort, value):
+    with pytest.raises(InvalidQuery):
+        admin_queries.applicants_query([], sort=sort, cursor=encode_cursor(value, 1))
+
+
+def test_matching_value_type_builds_a_query():
+    statement, sort = admin_queries.applicants_query([], sort="income", cursor=encode_cursor(52000, 1), limit=10)
+    assert sort == "income" and statement is not None
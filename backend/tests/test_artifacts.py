@@ -0,0 +1,69 @@
+import os
+import shutil
+import struct
+
+import pytest
+
+from artifacts import ARTIFACT_FILE, ARTIFACT_MAGIC, ArtifactError, read_artifact
+from model import HybridModel
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """A copy of the shipped pickles plus a freshly written artifact."""
+    for name in ("dt_model.pkl", "scaler.pkl", "nn_model.pkl"):
+        shutil.copy(os.path.join(MODEL_DIR, name), tmp_path / name)
+    hm = HybridModel(model_dir=str(tmp_path), engine="numpy")
+    hm.load()
+    assert (tmp_path / ARTIFACT_FILE).exists()
+    return tmp_path
+
+
+def _rewrite(path, transform):
+    data = path.read_bytes()
+    path.write_bytes(transform(data))
+    # keep the artifact newer than the pickles so it is not skipped as stale
+    os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+
+
+def _corrupt_header_length(data):
+    return data[:len(ARTIFACT_MAGIC)] + struct.pack("<Q", 7) + data[len(ARTIFACT_MAGIC) + 8:]
+
+
+CORRUPTIONS = {
+    "empty": lambda data: b"",
+    "magic only": lambda data: data[:len(ARTIFACT_MAGIC)],
+    "truncated length": lambda data: data[:len(ARTIFACT_MAGIC) + 3],
+    "truncated header": lambda data: data[:len(ARTIFACT_MAGIC) + 20],
+    "bad header length": _corrupt_header_length,
+    "truncated sections": lambda data: data[:len(data) // 2],
+}
+
+
+def test_read_artifact_round_trip(model_dir):
+    arrays, header = read_artifact(str(model_dir / ARTIFACT_FILE))
+    assert "tree_feature" in arrays
+    assert header["arrays"]
+
+
+@pytest.mark.parametrize("corruption", CORRUPTIONS)
+def test_corrupt_artifact_raises_artifact_error(model_dir, corruption):
+    path = model_dir / ARTIFACT_FILE
+    _rewrite(path, CORRUPTIONS[corruption])
+    with pytest.raises(ArtifactError):
+        read_artifact(str(path))
+
+
+@pytest.mark.parametrize("corruption", CORRUPTIONS)
+def test_load_falls_back_to_pickles_on_corrupt_artifact(model_dir, corruption):
+    _rewrite(model_dir / ARTIFACT_FILE, CORRUPTIONS[corruption])
+    hm = HybridModel(model_dir=str(model_dir), engine="numpy")
+    hm.load()
+    assert hm.dt_model is not None  # scored from the pickles
+    assert hm.predict({
+        "age": 35, "income": 50000, "credit_history_length": 5, "existing_loans": 1,
+        "debt_to_income_ratio": 0.3, "loan_amount": 10000, "repayment_duration": 24,
+        "employment_type": "employed"
+    })["risk_level"] in ("Low", "Medium", "High")
@@ -0,0 +1,59 @@
+import pytest
+
+from auth_tokens import TokenSigner, TokenError, parse_keys
+
+
+@pytest.fixture
+def signer():
+    return TokenSigner(parse_keys("k1:first-secret,k0:old-secret"), ttl_seconds=60)
+
+
+def test_issue_and_verify_round_trip(signer):
+    token, claims = signer.issue(7, "user")
+    verified = signer.verify(token)
+    assert verified["sub"] == 7
+    assert verified["role"] == "user"
+    assert verified["jti"] == claims["jti"]
+
+
+def test_tampered_signature_is_rejected(signer):
+    token, _ = signer.issue(7, "user")
+    payload, _, signature = token.partition(".")
+    flipped = ("A" if signature[0] != "A" else "B") + signature[1:]
+    with pytest.raises(TokenError):
+        signer.verify(f"{payload}.{flipped}")
+
+
+@pytest.mark.parametrize("signature", ["sïgnature", "ñ" * 43, "\ud800", ""])
+def test_malformed_signature_raises_token_error(signer, signature):
+    token, _ = signer.issue(7, "user")
+    payload = token.partition(".")[0]
+    with pytest.raises(TokenError):
+        signer.verify(f"{payload}.{signature}")
+
+
+@pytest.mark.parametrize("token", [None, "", "no-dot", "ïnvalid.payload", "!!!.sig"])
+def test_malformed_token_raises_token_error(signer, token):
+    with pytest.raises(TokenError):
+        signer.verify(token)
+
+
+def test_token_signed_with_unknown_key_is_rejected(signer):
+    other = TokenSigner(parse_keys("k9:another-secret"), ttl_seconds=60)
+    token, _ = other.issue(7, "user")
+    with pytest.raises(TokenError):
+        signer.verify(token)
+
+
+def test_expired_token_is_rejected(signer):
+    signer.ttl_seconds = -1
+    token, _ = signer.issue(7, "user")
+    with pytest.raises(TokenError):
+        signer.verify(token)
+
+
+def test_revoked_user_tokens_are_rejected(signer):
+    token, _ = signer.issue(7, "user")
+    signer.revoke_user(7)
+    with pytest.raises(TokenError):
+        signer.verify(token)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from inference import NumpyInferenceEngine, FEATURE_ORDER, EMPLOYMENT_TYPE_MAP, build_prediction
+from tree_compiler import random_inputs
+
+# The estimators were fitted on DataFrames; the engine works on plain arrays
+pytestmark = pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+
+
+@pytest.fixture(scope="module")
+def engine(sklearn_models):
+    return NumpyInferenceEngine.from_sklearn(*sklearn_models)
+
+
+@pytest.fixture(scope="module")
+def X(sklearn_models):
+    return random_inputs(sklearn_models[0].tree_, 20000, seed=11)
+
+
+def test_batch_tree_walk_matches_sklearn_apply(sklearn_models, engine, X):
+    np.testing.assert_array_equal(engine.apply_batch(X), sklearn_models[0].apply(X))
+
+
+def test_single_row_tree_walk_matches_sklearn_apply(sklearn_models, engine, X):
+    rows = X[:2000]
+    leaves = [engine.apply(rows[i:i + 1]) for i in range(len(rows))]
+    np.testing.assert_array_equal(leaves, sklearn_models[0].apply(rows))
+
+
+def test_tree_probabilities_match_sklearn(sklearn_models, engine, X):
+    dt_model = sklearn_models[0]
+    np.testing.assert_array_equal(engine.value[engine.apply_batch(X)], dt_model.predict_proba(X))
+
+
+def test_mlp_forward_pass_matches_sklearn_bit_for_bit(sklearn_models, engine, X):
+    _, scaler, nn_model = sklearn_models
+    expected = nn_model.predict_proba(scaler.transform(X))
+    np.testing.assert_array_equal(engine.nn_predict_proba(X), expected)
+
+
+def test_predict_batch_matches_sklearn_predictions(sklearn_models, engine, X):
+    dt_model, scaler, nn_model = sklearn_models
+    rows = X[:500].copy()
+    rows[:, -1] = np.trunc(rows[:, -1])  # dict inputs carry employment as a category
+    employment = {code: name for name, code in EMPLOYMENT_TYPE_MAP.items()}
+    inputs = [
+        {**dict(zip(FEATURE_ORDER[:-1], map(float, row[:-1]))), "employment_type": employment[int(row[-1])]}
+        for row in rows
+    ]
+    dt_proba = dt_model.predict_proba(rows)
+    nn_proba = nn_model.predict_proba(scaler.transform(rows))
+    expected = [
+        build_prediction(dt_class, dt_conf, nn_class, nn_conf)
+        for dt_class, dt_conf, nn_class, nn_conf in zip(
+            dt_model.classes_[dt_proba.argmax(axis=1)].tolist(), dt_proba.max(axis=1).tolist(),
+            nn_proba.argmax(axis=1).tolist(), nn_proba.max(axis=1).tolist()
+        )
+    ]
+    assert engine.predict_batch(inputs) == expected
+    assert [engine.predict(row) for row in inputs[:100]] == expected[:100]
@@ -0,0 +1,54 @@
+"""migrate.py adds missing nullable columns and indexes to existing tables."""
+
+import pytest
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, create_engine, inspect
+
+import migrate
+
+
+def _tables(with_new_columns):
+    metadata = MetaData()
+    columns = [Column("id", Integer, primary_key=True), Column("email", String(100), nullable=False)]
+    if with_new_columns:
+        columns += [Column("model version", String(64), nullable=True, index=True),
+                    Column("score", Integer, nullable=True)]
+    Table("order", metadata, *columns, Index("ix_order_email", "email"))
+    return metadata
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    _tables(with_new_columns=False).create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('INSERT INTO "order" (id, email) VALUES (1, \'a@b.c\')')
+    yield engine
+    engine.dispose()
+
+
+def test_pending_changes_lists_columns_before_indexes(engine):
+    changes, manual = migrate.pending_changes(engine, _tables(with_new_columns=True))
+    assert [migrate._describe(c) for c in changes] == [
+        "column order.model version", "column order.score", "index ix_order_model version"
+    ]
+    assert manual == []
+
+
+def test_upgrade_applies_changes_and_keeps_data(engine):
+    metadata = _tables(with_new_columns=True)
+    assert len(migrate.upgrade(engine, metadata)) == 3
+
+    inspector = inspect(engine)
+    assert {c["name"] for c in inspector.get_columns("order")} == {"id", "email", "model version", "score"}
+    assert {i["name"] for i in inspector.get_indexes("order")} == {"ix_order_email", "ix_order_model version"}
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql('SELECT id, email, score FROM "order"').all() == [(1, "a@b.c", None)]
+
+    assert migrate.upgrade(engine, metadata) == []
+
+
+def test_not_null_columns_are_reported_not_added(engine):
+    metadata = _tables(with_new_columns=False)
+    metadata.tables["order"].append_column(Column("tenant", Integer, nullable=False))
+    changes, manual = migrate.pending_changes(engine, metadata)
+    assert changes == [] and manual == ["order.tenant"]
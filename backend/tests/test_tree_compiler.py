@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from tree_compiler import compile_tree, verify_parity, random_inputs, COMPILED_TREE_FILE
+
+pytestmark = pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+
+
+def _mismatches(report):
+    return {key: value for key, value in report.items() if key.endswith("mismatches") and value}
+
+
+@pytest.fixture(scope="module")
+def compiled(sklearn_models, tmp_path_factory):
+    tree = sklearn_models[0].tree_
+    path = tmp_path_factory.mktemp("compiled") / COMPILED_TREE_FILE
+    return compile_tree(tree.feature, tree.threshold, tree.children_left, tree.children_right, str(path))
+
+
+def test_compiled_tree_matches_sklearn_bit_for_bit(sklearn_models, compiled):
+    report = verify_parity(sklearn_models[0], compiled, n_samples=20000, seed=0)
+    assert report["samples"] == 20000
+    assert _mismatches(report) == {}
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_compiled_tree_parity_across_seeds(sklearn_models, compiled, seed):
+    assert _mismatches(verify_parity(sklearn_models[0], compiled, n_samples=5000, seed=seed)) == {}
+
+
+def test_random_inputs_hit_split_thresholds(sklearn_models):
+    tree = sklearn_models[0].tree_
+    X = random_inputs(tree, 4000, seed=0)
+    split = tree.children_left != -1
+    on_threshold = np.isin(X[np.arange(len(X))[:, None], tree.feature[split]], tree.threshold[split])
+    assert on_threshold.any()
+
+
+def test_verify_parity_detects_a_drifted_tree(sklearn_models, tmp_path):
+    tree = sklearn_models[0].tree_
+    threshold = tree.threshold.copy()
+    threshold[0] += abs(threshold[0]) * 0.05 + 1.0  # move the root split
+    drifted = compile_tree(tree.feature, threshold, tree.children_left, tree.children_right,
+                           str(tmp_path / COMPILED_TREE_FILE))
+    report = verify_parity(sklearn_models[0], drifted, n_samples=5000, seed=0)
+    assert report["batch_leaf_mismatches"] > 0
@@ -0,0 +1,319 @@
+"""
+Parallel Training Pipeline for HICRA
+Cross-validated grid search over the decision tree (max_depth) and the
+neural network (hidden_layer_sizes). Every (leg, candidate, fold) fit is
+its own task in a process pool, and the winning DT and NN are refitted
+concurrently. The dataset lives in one shared-memory block that workers
+attach to, so it is never pickled or copied per task.
+
+Usage:
+    python training.py --samples 200000 --folds 5 --max-depth 3 5 8 \\
+        --hidden-layers 16,8 32,16 --workers 4 --compare-serial
+    python training.py --data applicants.csv     # CSV with FEATURE_ORDER + risk_classification
+    python training.py --activate                # also make the result the active version
+
+The winning models are registered as a new model registry version (with
+cv_results.json alongside), not written into the serving models/ dir; it
+is only served once activated.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from inference import EMPLOYMENT_TYPE_MAP, FEATURE_ORDER
+
+HOLDOUT_FOLD = -1
+CV_RESULTS_FILE = "cv_results.json"
+
+
+# ============ Shared Dataset ============
+
+class SharedDataset:
+    """
+    Features (float32), labels and fold assignments packed into one
+    SharedMemory block. The parent owns the block; workers attach by name.
+    """
+
+    def __init__(self, n_rows, n_features=len(FEATURE_ORDER)):
+        self.spec = {
+            "n_rows": n_rows,
+            "n_features": n_features,
+            "y_offset": n_rows * n_features * 4,
+            "fold_offset": n_rows * n_features * 4 + n_rows * 8,
+        }
+        self._shm = shared_memory.SharedMemory(create=True, size=self.spec["fold_offset"] + n_rows)
+        self.spec["name"] = self._shm.name
+        self.X, self.y, self.folds = _views(self._shm.buf, self.spec)
+
+    def assign_folds(self, n_folds, holdout=0.2, seed=42):
+        """Shuffle rows into a holdout set (HOLDOUT_FOLD) and n_folds CV folds."""
+        rng = np.random.RandomState(seed)
+        order = rng.permutation(self.spec["n_rows"])
+        n_holdout = int(len(order) * holdout)
+        self.folds[order[:n_holdout]] = HOLDOUT_FOLD
+        self.folds[order[n_holdout:]] = np.arange(len(order) - n_holdout) % n_folds
+
+    def close(self):
+        self.X = self.y = self.folds = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _views(buffer, spec):
+    n_rows, n_features = spec["n_rows"], spec["n_features"]
+    X = np.ndarray((n_rows, n_features), dtype=np.float32, buffer=buffer)
+    y = np.ndarray((n_rows,), dtype=np.int64, buffer=buffer, offset=spec["y_offset"])
+    folds = np.ndarray((n_rows,), dtype=np.int8, buffer=buffer, offset=spec["fold_offset"])
+    return X, y, folds
+
+
+def generate_dataset(n_samples, chunk_size=100000, seed=42):
+    """Fill a SharedDataset straight from the chunked synthetic generator."""
+    from model import HybridModel
+
+    dataset = SharedDataset(n_samples)
+    start = 0
+    for X_chunk, y_chunk in HybridModel().iter_synthetic_chunks(n_samples, chunk_size, seed, as_frame=False):
+        dataset.X[start:start + len(X_chunk)] = X_chunk
+        dataset.y[start:start + len(y_chunk)] = y_chunk
+        start += len(X_chunk)
+    return dataset
+
+
+def load_dataset(path):
+    """Load a CSV with the model features and risk_classification into a SharedDataset."""
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    if df['employment_type'].dtype == object:
+        df['employment_type'] = df['employment_type'].map(EMPLOYMENT_TYPE_MAP)
+    dataset = SharedDataset(len(df))
+    dataset.X[:] = df[FEATURE_ORDER].to_numpy(dtype=np.float32)
+    dataset.y[:] = df['risk_classification'].to_numpy(dtype=np.int64)
+    return dataset
+
+
+# ============ Worker Side ============
+
+_worker_data = {}
+
+
+def _attach_dataset(spec):
+    """Pool initializer: map the parent's shared block instead of copying it."""
+    from threadpoolctl import threadpool_limits
+
+    warnings.filterwarnings("ignore")
+    shm = shared_memory.SharedMemory(name=spec["name"])
+    X, y, folds = _views(shm.buf, spec)
+    _worker_data.update(shm=shm, X=X, y=y, folds=folds)
+    # One BLAS thread per worker; the pool provides the parallelism
+    _worker_data["limits"] = threadpool_limits(1)
+
+
+def _fit_leg(leg, param, X, y):
+    """Fit one leg. Returns (estimator, scaler); the scaler is None for the DT."""
+    import pandas as pd
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    X = pd.DataFrame(X, columns=FEATURE_ORDER, copy=False)
+    if leg == "dt":
+        return DecisionTreeClassifier(max_depth=param, random_state=42).fit(X, y), None
+
+    scaler = StandardScaler().fit(X)
+    nn_model = MLPClassifier(hidden_layer_sizes=param, activation='relu', solver='adam', max_iter=500, random_state=42)
+    nn_model.fit(scaler.transform(X), y)
+    return nn_model, scaler
+
+
+def _score(estimator, scaler, X, y):
+    import pandas as pd
+
+    X = pd.DataFrame(X, columns=FEATURE_ORDER, copy=False)
+    if scaler is not None:
+        X = scaler.transform(X)
+    return float(estimator.score(X, y))
+
+
+def _cv_task(leg, param, fold):
+    """Fit on every CV fold but `fold` and score on `fold`."""
+    X, y, folds = _worker_data["X"], _worker_data["y"], _worker_data["folds"]
+    train = (folds != fold) & (folds != HOLDOUT_FOLD)
+    valid = folds == fold
+
+    start = time.perf_counter()
+    estimator, scaler = _fit_leg(leg, param, X[train], y[train])
+    score = _score(estimator, scaler, X[valid], y[valid])
+    return leg, param, fold, score, time.perf_counter() - start
+
+
+def _final_task(leg, param):
+    """Refit a winning candidate on all CV rows and score it on the holdout."""
+    X, y, folds = _worker_data["X"], _worker_data["y"], _worker_data["folds"]
+    train = folds != HOLDOUT_FOLD
+
+    estimator, scaler = _fit_leg(leg, param, X[train], y[train])
+    holdout = ~train
+    score = _score(estimator, scaler, X[holdout], y[holdout]) if holdout.any() else None
+    return leg, estimator, scaler, score
+
+
+# ============ Pipeline ============
+
+def _tasks(grid, n_folds):
+    return [(leg, param, fold) for leg, params in grid.items() for param in params for fold in range(n_folds)]
+
+
+def _summarize(results, grid):
+    """Mean/std CV accuracy per candidate and the best candidate per leg."""
+    summary = {}
+    for leg, params in grid.items():
+        rows = []
+        for param in params:
+            scores = [r[3] for r in results if r[0] == leg and r[1] == param]
+            rows.append({
+                "param": list(param) if isinstance(param, tuple) else param,
+                "fold_scores": [round(s, 4) for s in scores],
+                "mean": round(float(np.mean(scores)), 4),
+                "std": round(float(np.std(scores)), 4),
+                "fit_seconds": round(sum(r[4] for r in results if r[0] == leg and r[1] == param), 2)
+            })
+        best = max(range(len(params)), key=lambda i: rows[i]["mean"])
+        summary[leg] = {"candidates": rows, "best": params[best]}
+    return summary
+
+
+def run_serial(dataset, grid, n_folds):
+    """Reference path: every fit in this process, one after another."""
+    _worker_data.update(X=dataset.X, y=dataset.y, folds=dataset.folds)
+    try:
+        results = [_cv_task(*task) for task in _tasks(grid, n_folds)]
+        summary = _summarize(results, grid)
+        finals = [_final_task(leg, summary[leg]["best"]) for leg in grid]
+    finally:
+        # Drop the views so the shared block can be closed
+        _worker_data.clear()
+    return summary, finals
+
+
+def run_parallel(dataset, grid, n_folds, workers=None):
+    """Fan CV folds out over a process pool, then refit both winners concurrently."""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach_dataset, initargs=(dataset.spec,)) as pool:
+        futures = [pool.submit(_cv_task, *task) for task in _tasks(grid, n_folds)]
+        results = [f.result() for f in futures]
+        summary = _summarize(results, grid)
+        finals = [f.result() for f in [pool.submit(_final_task, leg, summary[leg]["best"]) for leg in grid]]
+    return summary, finals
+
+
+def train_with_search(registry=None, dataset=None, n_samples=100000, n_folds=5,
+                      max_depths=(3, 5, 8), hidden_layers=((16, 8), (32, 16)),
+                      workers=None, compare_serial=False, activate=False):
+    """
+    Run the cross-validated search and register the winning models (pickles,
+    artifact and cv_results.json) as a new version in the model registry,
+    activating it only if asked. Returns the CV report.
+    """
+    from model import HybridModel
+    from model_registry import ModelRegistry
+
+    if n_folds < 2:
+        raise ValueError(f"n_folds must be at least 2, got {n_folds}")
+    registry = registry or ModelRegistry()
+
+    own_dataset = dataset is None
+    if own_dataset:
+        print(f"Generating {n_samples:,} synthetic rows into shared memory...")
+        dataset = generate_dataset(n_samples)
+
+    try:
+        dataset.assign_folds(n_folds)
+        grid = {"dt": list(max_depths), "nn": [tuple(layers) for layers in hidden_layers]}
+        n_tasks = len(_tasks(grid, n_folds))
+        workers = workers or os.cpu_count()
+
+        print(f"Running {n_tasks} CV fits on {workers} workers...")
+        start = time.perf_counter()
+        summary, finals = run_parallel(dataset, grid, n_folds, workers)
+        parallel_seconds = time.perf_counter() - start
+        print(f"   parallel: {parallel_seconds:.2f}s")
+
+        timing = {"workers": workers, "parallel_seconds": round(parallel_seconds, 2)}
+        if compare_serial:
+            start = time.perf_counter()
+            run_serial(dataset, grid, n_folds)
+            serial_seconds = time.perf_counter() - start
+            timing["serial_seconds"] = round(serial_seconds, 2)
+            timing["speedup"] = round(serial_seconds / parallel_seconds, 2)
+            print(f"   serial:   {serial_seconds:.2f}s (speedup {timing['speedup']}x)")
+    finally:
+        if own_dataset:
+            dataset.close()
+
+    holdout = {}
+    with tempfile.TemporaryDirectory(prefix="hicra-training-") as work_dir:
+        hm = HybridModel(model_dir=work_dir)
+        for leg, estimator, scaler, score in finals:
+            holdout[leg] = round(score, 4) if score is not None else None
+            if leg == "dt":
+                hm.dt_model = estimator
+            else:
+                hm.nn_model, hm.scaler = estimator, scaler
+        hm.save_models()
+
+        report = {
+            "created_at": datetime.utcnow().isoformat(),
+            "model_version": hm.version,
+            "samples": int(dataset.spec["n_rows"]),
+            "folds": n_folds,
+            "dt": summary["dt"],
+            "nn": {**summary["nn"], "best": list(summary["nn"]["best"])},
+            "holdout_accuracy": holdout,
+            "timing": timing,
+        }
+        with open(os.path.join(work_dir, CV_RESULTS_FILE), "w") as f:
+            json.dump(report, f, indent=2)
+        registry.register(work_dir, activate=activate)
+
+    print(f"✅ Best max_depth={report['dt']['best']}, hidden_layer_sizes={report['nn']['best']} "
+          f"(holdout accuracy DT {holdout['dt']}, NN {holdout['nn']})")
+    return report
+
+
+def _layers(value):
+    return tuple(int(v) for v in value.split(","))
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")
+    parser = argparse.ArgumentParser(description="Cross-validated parallel training for HICRA")
+    parser.add_argument("--data", help="CSV dataset (defaults to synthetic data)")
+    parser.add_argument("--samples", type=int, default=100000, help="synthetic rows when --data is not given")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--max-depth", type=int, nargs="+", default=[3, 5, 8])
+    parser.add_argument("--hidden-layers", type=_layers, nargs="+", default=[(16, 8), (32, 16)],
+                        help="comma-separated layer sizes, e.g. 16,8 32,16")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--compare-serial", action="store_true", help="also time the serial path")
+    parser.add_argument("--activate", action="store_true", help="activate the registered version")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.data) if args.data else None
+    try:
+        train_with_search(
+            None, dataset, args.samples, args.folds, args.max_depth,
+            args.hidden_layers, args.workers, args.compare_serial, args.activate
+        )
+    finally:
+        if dataset is not None:
+            dataset.close()
@@ -0,0 +1,228 @@
+"""
+Decision Tree Compiler for HICRA
+Turns the fitted dt_model.tree_ arrays into a generated Python module with:
+  - predict_leaf(x): nested if/else comparisons for single rows
+  - predict_leaf_batch(X32): branch-free level-wise gathers for batches
+
+Run directly to compile models/dt_model.pkl and check parity:
+    python tree_compiler.py
+"""
+
+import hashlib
+import importlib.util
+import os
+import sys
+
+import numpy as np
+
+from inference import FEATURE_ORDER, TREE_LEAF
+
+COMPILED_TREE_FILE = "dt_compiled.py"
+
+
+def tree_hash(feature, threshold, children_left, children_right):
+    """Hash of the tree structure, embedded in the module to detect stale files."""
+    digest = hashlib.sha256()
+    for array in (feature, threshold, children_left, children_right):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _emit_node(lines, node, depth, feature, threshold, children_left, children_right):
+    indent = "    " * (depth + 1)
+    if children_left[node] == TREE_LEAF:
+        lines.append(f"{indent}return {node}")
+        return
+
+    f = int(feature[node])
+    # repr() round-trips the float64 threshold exactly
+    lines.append(f"{indent}if x[{f}] <= {float(threshold[node])!r}:  # {FEATURE_ORDER[f]}")
+    _emit_node(lines, int(children_left[node]), depth + 1, feature, threshold, children_left, children_right)
+    lines.append(f"{indent}else:")
+    _emit_node(lines, int(children_right[node]), depth + 1, feature, threshold, children_left, children_right)
+
+
+def generate_tree_source(feature, threshold, children_left, children_right):
+    """Return the source code of the compiled tree module."""
+    feature = np.asarray(feature)
+    threshold = np.asarray(threshold, dtype=np.float64)
+    children_left = np.asarray(children_left)
+    children_right = np.asarray(children_right)
+    n_nodes = len(feature)
+
+    # Node depths (parents always come before children in sklearn trees)
+    depth = np.zeros(n_nodes, dtype=int)
+    for node in range(n_nodes):
+        if children_left[node] != TREE_LEAF:
+            depth[children_left[node]] = depth[node] + 1
+            depth[children_right[node]] = depth[node] + 1
+    max_depth = int(depth.max())
+
+    # Flattened arrays for the batch variant: leaves point back at themselves
+    # so every row can take exactly max_depth steps without branching
+    is_leaf = children_left == TREE_LEAF
+    node_ids = np.arange(n_nodes)
+    flat_feature = np.where(is_leaf, 0, feature).tolist()
+    flat_threshold = np.where(is_leaf, 0.0, threshold).tolist()
+    flat_left = np.where(is_leaf, node_ids, children_left).tolist()
+    flat_right = np.where(is_leaf, node_ids, children_right).tolist()
+
+    lines = [
+        '"""',
+        "Compiled decision tree for HICRA.",
+        "Generated by tree_compiler.py from dt_model.tree_ - do not edit by hand.",
+        '"""',
+        "",
+        "import numpy as np",
+        "",
+        f"TREE_HASH = {tree_hash(feature, threshold, children_left, children_right)!r}",
+        f"MAX_DEPTH = {max_depth}",
+        f"FEATURE = np.array({flat_feature!r}, dtype=np.intp)",
+        f"THRESHOLD = np.array({flat_threshold!r}, dtype=np.float64)",
+        f"LEFT = np.array({flat_left!r}, dtype=np.intp)",
+        f"RIGHT = np.array({flat_right!r}, dtype=np.intp)",
+        "",
+        "",
+        "def predict_leaf(x):",
+        '    """Leaf id for one row; x holds float32-rounded features in training order."""',
+    ]
+    _emit_node(lines, 0, 0, feature, threshold, children_left, children_right)
+    lines += [
+        "",
+        "",
+        "def predict_leaf_batch(X32):",
+        '    """Leaf ids for a float32 (n, n_features) matrix, branch-free."""',
+        "    n_rows, n_features = X32.shape",
+        "    flat = np.ascontiguousarray(X32).ravel()",
+        "    offsets = np.arange(n_rows) * n_features",
+        "    node = np.zeros(n_rows, dtype=np.intp)",
+        "    for _ in range(MAX_DEPTH):",
+        "        go_left = flat[offsets + FEATURE[node]] <= THRESHOLD[node]",
+        "        node = np.where(go_left, LEFT[node], RIGHT[node])",
+        "    return node",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def load_compiled_tree(path):
+    """Import a compiled tree module from a file path."""
+    spec = importlib.util.spec_from_file_location("hicra_dt_compiled", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def compile_tree(feature, threshold, children_left, children_right, path):
+    """
+    Return the compiled module for this tree, regenerating the file at
+    `path` only when it is missing or was built from a different tree.
+    """
+    expected = tree_hash(feature, threshold, children_left, children_right)
+    if os.path.exists(path):
+        module = load_compiled_tree(path)
+        if getattr(module, "TREE_HASH", None) == expected:
+            return module
+
+    source = generate_tree_source(feature, threshold, children_left, children_right)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(source)
+    os.replace(tmp_path, path)
+    return load_compiled_tree(path)
+
+
+# ============ Parity Check ============
+
+def random_inputs(tree, n_samples=100000, seed=0):
+    """
+    Random encoded rows covering the training ranges, with a share of values
+    placed exactly on and just beside split thresholds to stress boundaries.
+    `tree` is anything with feature/threshold/children_left arrays: a fitted
+    tree's `tree_` or a NumpyInferenceEngine.
+    """
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(15, 80, n_samples),            # age
+        rng.normal(50000, 20000, n_samples),        # income
+        rng.integers(0, 25, n_samples),             # credit_history_length
+        rng.integers(0, 6, n_samples),              # existing_loans
+        rng.uniform(0.0, 1.0, n_samples),           # debt_to_income_ratio
+        rng.uniform(500, 60000, n_samples),         # loan_amount
+        rng.integers(3, 72, n_samples),             # repayment_duration
+        rng.integers(0, 3, n_samples),              # employment_type
+    ]).astype(np.float64)
+
+    split_nodes = np.flatnonzero(np.asarray(tree.children_left) != TREE_LEAF)
+    n_edge = n_samples // 4
+    nodes = rng.choice(split_nodes, n_edge)
+    nudges = rng.choice([-1.0, 0.0, 1.0], n_edge)
+    values = np.asarray(tree.threshold)[nodes]
+    values = np.where(nudges == 0, values, np.nextafter(values, values + nudges))
+    rows = rng.choice(n_samples, n_edge, replace=False)
+    X[rows, np.asarray(tree.feature)[nodes]] = values
+    return X
+
+
+def verify_parity(dt_model, compiled, n_samples=100000, seed=0):
+    """
+    Compare the compiled module against dt_model.apply / predict_proba /
+    decision_path. Returns a dict of mismatch counts (all zero on success).
+    """
+    X = random_inputs(dt_model.tree_, n_samples, seed)
+    X32 = X.astype(np.float32)
+    tree = dt_model.tree_
+
+    expected_leaf = dt_model.apply(X)
+    single_leaf = np.array([compiled.predict_leaf(row) for row in X32.tolist()])
+    batch_leaf = compiled.predict_leaf_batch(X32)
+
+    value = tree.value[:, 0, :]
+    proba = dt_model.predict_proba(X)
+
+    # Rebuild each root-to-leaf path from parent links and compare with decision_path
+    parent = np.full(tree.node_count, -1)
+    split = tree.children_left != TREE_LEAF
+    parent[tree.children_left[split]] = np.flatnonzero(split)
+    parent[tree.children_right[split]] = np.flatnonzero(split)
+    indicator = dt_model.decision_path(X)
+    path_mismatches = 0
+    for i, leaf in enumerate(batch_leaf.tolist()):
+        path = []
+        node = leaf
+        while node != -1:
+            path.append(node)
+            node = parent[node]
+        expected_path = indicator.indices[indicator.indptr[i]:indicator.indptr[i + 1]]
+        if sorted(path) != sorted(expected_path.tolist()):
+            path_mismatches += 1
+
+    return {
+        "samples": n_samples,
+        "single_leaf_mismatches": int((single_leaf != expected_leaf).sum()),
+        "batch_leaf_mismatches": int((batch_leaf != expected_leaf).sum()),
+        "proba_mismatches": int((value[batch_leaf] != proba).any(axis=1).sum()),
+        "path_mismatches": path_mismatches,
+    }
+
+
+if __name__ == "__main__":
+    import warnings
+    import joblib
+
+    warnings.filterwarnings("ignore")
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else "models"
+    dt_model = joblib.load(os.path.join(model_dir, "dt_model.pkl"))
+    tree = dt_model.tree_
+    out_path = os.path.join(model_dir, COMPILED_TREE_FILE)
+
+    compiled = compile_tree(tree.feature, tree.threshold, tree.children_left, tree.children_right, out_path)
+    print(f"✅ Compiled tree written to {out_path} (max depth {compiled.MAX_DEPTH})")
+
+    report = verify_parity(dt_model, compiled)
+    print(f"📊 Parity check: {report}")
+    mismatches = sum(v for k, v in report.items() if k.endswith("mismatches"))
+    if mismatches:
+        print("❌ Compiled tree does not match dt_model")
+        sys.exit(1)
+    print("✅ Compiled tree matches dt_model.predict_proba / decision_path")
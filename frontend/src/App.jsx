@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { BrowserRouter as Router, Routes, Route, Navigate } from 'react-router-dom';
+import axios from 'axios';
 import Layout from './components/Layout';
 import Home from './pages/Home';
 import Predict from './pages/Predict';
@@ -10,6 +11,15 @@ import ImproveScore from './pages/ImproveScore';
 import WhatIfAnalysis from './pages/WhatIfAnalysis';
 import RequireAuth from './components/RequireAuth';
 
+// Every API call carries the signed session token issued by /login
+const setAuthToken = (token) => {
+  if (token) {
+    axios.defaults.headers.common['Authorization'] = `Bearer ${token}`;
+  } else {
+    delete axios.defaults.headers.common['Authorization'];
+  }
+};
+
 function App() {
   const [user, setUser] = useState(null);
 
@@ -17,20 +27,44 @@ function App() {
   useEffect(() => {
     const savedUser = localStorage.getItem('user');
     if (savedUser) {
-      setUser(JSON.parse(savedUser));
+      const userData = JSON.parse(savedUser);
+      setAuthToken(userData.token);
+      setUser(userData);
     }
   }, []);
 
+  // Expired or revoked token: drop the session and go back to the login page
+  useEffect(() => {
+    const interceptor = axios.interceptors.response.use(
+      (response) => response,
+      (error) => {
+        if (error.response?.status === 401) {
+          clearSession();
+        }
+        return Promise.reject(error);
+      }
+    );
+    return () => axios.interceptors.response.eject(interceptor);
+  }, []);
+
   const handleLogin = (userData) => {
+    setAuthToken(userData.token);
     setUser(userData);
     localStorage.setItem('user', JSON.stringify(userData));
   };
 
-  const handleLogout = () => {
+  const clearSession = () => {
+    setAuthToken(null);
     setUser(null);
     localStorage.removeItem('user');
   };
 
+  const handleLogout = () => {
+    // Revoke the token server-side; the local session is cleared either way
+    axios.post('http://localhost:8000/logout').catch(() => {});
+    clearSession();
+  };
+
   return (
     <Router>
       <Layout user={user} onLogout={handleLogout}>
@@ -42,7 +76,7 @@ function App() {
             <Route path="/" element={<Navigate to="/home" replace />} />
             <Route path="/dashboard" element={<Dashboard user={user} />} />
             <Route path="/home" element={<Home user={user} />} />
-            <Route path="/predict" element={<Predict />} />
+            <Route path="/predict" element={<Predict user={user} />} />
             <Route path="/methodology" element={<Methodology />} />
             <Route path="/improve-score" element={<ImproveScore user={user} />} />
             <Route path="/what-if" element={<WhatIfAnalysis user={user} />} />
@@ -32,8 +32,9 @@ const Dashboard = ({ user }) => {
 
             try {
                 if (user.role === 'admin') {
-                    const response = await axios.get('http://localhost:8000/admin/all-data');
-                    setData(response.data); // Expecting Array
+                    // Summary only; AdminView pages through /admin/all-data itself
+                    const response = await axios.get('http://localhost:8000/admin/stats');
+                    setData(response.data);
                 } else {
                     const response = await axios.get(`http://localhost:8000/user-data/${user.email}`);
                     if (response.data.error) {
@@ -78,7 +79,7 @@ const Dashboard = ({ user }) => {
     const handleRefresh = async () => {
         if (user?.role === 'admin') {
             try {
-                const response = await axios.get('http://localhost:8000/admin/all-data');
+                const response = await axios.get('http://localhost:8000/admin/stats');
                 setData(response.data);
             } catch (err) {
                 console.error("Refresh failed:", err);
@@ -88,7 +89,7 @@ const Dashboard = ({ user }) => {
 
     // Render logic based on Role
     if (user?.role === 'admin') {
-        return <AdminView data={data} onRefresh={handleRefresh} />;
+        return <AdminView summary={data} onRefresh={handleRefresh} />;
     }
 
     // For User, normalize data structure
@@ -102,34 +103,60 @@ const Dashboard = ({ user }) => {
 
 // --- Sub Components ---
 
-const AdminView = ({ data, onRefresh }) => {
+const AdminView = ({ summary, onRefresh }) => {
     const [searchTerm, setSearchTerm] = useState('');
+    const [debouncedSearch, setDebouncedSearch] = useState('');
     const [riskFilter, setRiskFilter] = useState('all');
     const [sortBy, setSortBy] = useState('name');
     const [selectedUser, setSelectedUser] = useState(null);
-    const [currentPage, setCurrentPage] = useState(1);
+    // Keyset pagination: cursors[i] is the cursor that loads page i + 1
+    const [cursors, setCursors] = useState([null]);
+    const [page, setPage] = useState({ items: [], total: 0, next_cursor: null });
+    const [pageLoading, setPageLoading] = useState(false);
     const itemsPerPage = 20;
+    const currentPage = cursors.length;
+
+    // Summary statistics come from /admin/stats (whole population, not just this page)
+    const stats = {
+        total: summary?.total_users || 0,
+        avgIncome: summary?.avg_income || 0,
+        avgLoan: summary?.avg_loan || 0,
+        riskDistribution: summary?.risk_distribution || { low: 0, medium: 0, high: 0 }
+    };
 
-    // Calculate summary statistics
-    const stats = React.useMemo(() => {
-        if (!Array.isArray(data) || data.length === 0) {
-            return { total: 0, avgIncome: 0, avgLoan: 0, riskDistribution: { low: 0, medium: 0, high: 0 } };
-        }
-
-        const total = data.length;
-        const avgIncome = data.reduce((sum, d) => sum + (d.AnnualIncome || 0), 0) / total;
-        const avgLoan = data.reduce((sum, d) => sum + (d.LoanAmount || 0), 0) / total;
-
-        const riskDistribution = { low: 0, medium: 0, high: 0 };
-        data.forEach(d => {
-            const score = d.RiskScore || 50;
-            if (score < 40) riskDistribution.low++;
-            else if (score < 70) riskDistribution.medium++;
-            else riskDistribution.high++;
-        });
+    // Any filter, sort or refresh starts again from the first page
+    const restart = () => setCursors([null]);
 
-        return { total, avgIncome, avgLoan, riskDistribution };
-    }, [data]);
+    // Don't query on every keystroke
+    useEffect(() => {
+        if (searchTerm === debouncedSearch) return;
+        const timer = setTimeout(() => {
+            setDebouncedSearch(searchTerm);
+            restart();
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
+    // Filtering, sorting and paging all happen server-side
+    useEffect(() => {
+        const fetchPage = async () => {
+            setPageLoading(true);
+            try {
+                const params = { limit: itemsPerPage, sort: sortBy };
+                if (debouncedSearch) params.search = debouncedSearch;
+                if (riskFilter !== 'all') params.risk = riskFilter;
+                const cursor = cursors[cursors.length - 1];
+                if (cursor) params.cursor = cursor;
+                const response = await axios.get('http://localhost:8000/admin/all-data', { params });
+                setPage(response.data);
+            } catch (err) {
+                console.error("Admin page fetch failed:", err);
+            } finally {
+                setPageLoading(false);
+            }
+        };
+        fetchPage();
+    }, [cursors]);
 
     // Aggregate feature importance (simulated based on common factors)
     const aggregateImportance = {
@@ -142,34 +169,7 @@ const AdminView = ({ data, onRefresh }) => {
         'Existing Loans': 0.02
     };
 
-    // Filter and sort data
-    const filteredData = React.useMemo(() => {
-        if (!Array.isArray(data)) return [];
-
-        let result = data.filter(row => {
-            const matchesSearch = !searchTerm ||
-                row.name?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                row.email?.toLowerCase().includes(searchTerm.toLowerCase());
-
-            const score = row.RiskScore || 50;
-            let riskLevel = 'medium';
-            if (score < 40) riskLevel = 'low';
-            else if (score >= 70) riskLevel = 'high';
-
-            const matchesRisk = riskFilter === 'all' || riskLevel === riskFilter;
-
-            return matchesSearch && matchesRisk;
-        });
-
-        result.sort((a, b) => {
-            if (sortBy === 'name') return (a.name || '').localeCompare(b.name || '');
-            if (sortBy === 'income') return (b.AnnualIncome || 0) - (a.AnnualIncome || 0);
-            if (sortBy === 'loan') return (b.LoanAmount || 0) - (a.LoanAmount || 0);
-            return 0;
-        });
-
-        return result;
-    }, [data, searchTerm, riskFilter, sortBy]);
+    const paginatedData = page.items;
 
     const getRiskBadge = (score) => {
         if (score < 40) return <span className="px-2 py-1 text-xs font-semibold rounded-full bg-green-100 text-green-700">Low</span>;
@@ -183,32 +183,27 @@ const AdminView = ({ data, onRefresh }) => {
         return 'High';
     };
 
-    // CSV Export function
-    const exportToCSV = () => {
-        if (!filteredData.length) return;
-
-        const headers = ['Name', 'Email', 'Income', 'Loan Amount', 'Credit History', 'Risk Score'];
-        const rows = filteredData.map(row => [
-            row.name,
-            row.email,
-            row.AnnualIncome,
-            row.LoanAmount,
-            row.LengthOfCreditHistory,
-            row.RiskScore || 50
-        ]);
-
-        const csvContent = [headers, ...rows].map(row => row.join(',')).join('\n');
-        const blob = new Blob([csvContent], { type: 'text/csv' });
-        const url = URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = `users_export_${new Date().toISOString().split('T')[0]}.csv`;
-        a.click();
+    // CSV Export: the server streams every row matching the current filters
+    const exportToCSV = async () => {
+        try {
+            const params = { format: 'csv', sort: sortBy };
+            if (debouncedSearch) params.search = debouncedSearch;
+            if (riskFilter !== 'all') params.risk = riskFilter;
+            const response = await axios.get('http://localhost:8000/admin/export', { params, responseType: 'blob' });
+            const url = URL.createObjectURL(response.data);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `users_export_${new Date().toISOString().split('T')[0]}.csv`;
+            a.click();
+            URL.revokeObjectURL(url);
+        } catch (err) {
+            console.error("Export failed:", err);
+            toast.error('Export failed.');
+        }
     };
 
     // Pagination calculations
-    const totalPages = Math.ceil(filteredData.length / itemsPerPage);
-    const paginatedData = filteredData.slice((currentPage - 1) * itemsPerPage, currentPage * itemsPerPage);
+    const totalPages = Math.max(1, Math.ceil(page.total / itemsPerPage));
 
     // Simple Donut Chart component
     const DonutChart = ({ low, medium, high }) => {
@@ -343,7 +338,7 @@ const AdminView = ({ data, onRefresh }) => {
             <div className="flex gap-3">
                 {onRefresh && (
                     <button
-                        onClick={onRefresh}
+                        onClick={() => { onRefresh(); restart(); }}
                         className="flex items-center gap-2 px-4 py-2 bg-white border border-gray-200 rounded-lg text-gray-700 hover:bg-gray-50 transition-colors"
                     >
                         <RefreshCw size={16} />
@@ -394,7 +389,7 @@ const AdminView = ({ data, onRefresh }) => {
                     </div>
                     <select
                         value={riskFilter}
-                        onChange={(e) => setRiskFilter(e.target.value)}
+                        onChange={(e) => { setRiskFilter(e.target.value); restart(); }}
                         className="bg-white border rounded-lg px-3 py-2 text-sm shadow-sm"
                     >
                         <option value="all">All Risks</option>
@@ -404,7 +399,7 @@ const AdminView = ({ data, onRefresh }) => {
                     </select>
                     <select
                         value={sortBy}
-                        onChange={(e) => setSortBy(e.target.value)}
+                        onChange={(e) => { setSortBy(e.target.value); restart(); }}
                         className="bg-white border rounded-lg px-3 py-2 text-sm shadow-sm"
                     >
                         <option value="name">Sort: Name</option>
@@ -415,7 +410,7 @@ const AdminView = ({ data, onRefresh }) => {
             </div>
 
             <p className="text-sm text-gray-500">
-                Showing {paginatedData.length} of {filteredData.length} users (Page {currentPage} of {totalPages}) • Click a row for details
+                Showing {paginatedData.length} of {page.total} users (Page {currentPage} of {totalPages}){pageLoading && ' • Loading...'} • Click a row for details
             </p>
 
             {/* User Table */}
@@ -475,31 +470,19 @@ const AdminView = ({ data, onRefresh }) => {
                 {totalPages > 1 && (
                     <div className="flex items-center justify-between px-6 py-4 border-t border-gray-100 bg-gray-50">
                         <button
-                            onClick={() => setCurrentPage(p => Math.max(1, p - 1))}
-                            disabled={currentPage === 1}
+                            onClick={() => setCursors(c => c.slice(0, -1))}
+                            disabled={currentPage === 1 || pageLoading}
                             className="flex items-center gap-1 px-3 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
                         >
                             <ChevronLeft size={16} />
                             Previous
                         </button>
-                        <div className="flex items-center gap-2">
-                            {[...Array(Math.min(5, totalPages))].map((_, i) => {
-                                const pageNum = currentPage <= 3 ? i + 1 : currentPage - 2 + i;
-                                if (pageNum > totalPages || pageNum < 1) return null;
-                                return (
-                                    <button
-                                        key={pageNum}
-                                        onClick={() => setCurrentPage(pageNum)}
-                                        className={`w-8 h-8 text-sm rounded-lg ${currentPage === pageNum ? 'bg-primary text-white' : 'bg-white text-gray-700 border border-gray-200 hover:bg-gray-50'}`}
-                                    >
-                                        {pageNum}
-                                    </button>
-                                );
-                            })}
-                        </div>
+                        <span className="text-sm text-gray-600">
+                            Page {currentPage} of {totalPages}
+                        </span>
                         <button
-                            onClick={() => setCurrentPage(p => Math.min(totalPages, p + 1))}
-                            disabled={currentPage === totalPages}
+                            onClick={() => setCursors(c => [...c, page.next_cursor])}
+                            disabled={!page.next_cursor || pageLoading}
                             className="flex items-center gap-1 px-3 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
                         >
                             Next
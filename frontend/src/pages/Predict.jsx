@@ -3,7 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { ArrowRight, Loader2, RotateCcw } from 'lucide-react';
 
-const Predict = () => {
+const Predict = ({ user }) => {
     const navigate = useNavigate();
     const [loading, setLoading] = useState(false);
     const [formData, setFormData] = useState({
@@ -56,12 +56,14 @@ const Predict = () => {
                 risk_score: result.risk_level === 'Low' ? 30 : result.risk_level === 'Medium' ? 55 : 80
             };
 
-            // 3. Save to backend
-            try {
-                await axios.post('http://localhost:8000/add-applicant', newApplicant);
-                console.log('Applicant saved to backend');
-            } catch (saveError) {
-                console.warn('Could not save applicant:', saveError);
+            // 3. Save to backend (admin only; the endpoint requires an admin token)
+            if (user?.role === 'admin') {
+                try {
+                    await axios.post('http://localhost:8000/add-applicant', newApplicant);
+                    console.log('Applicant saved to backend');
+                } catch (saveError) {
+                    console.warn('Could not save applicant:', saveError);
+                }
             }
 
             // 4. Navigate to dashboard